@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from models.user_model import UserCreate, UserLogin
 from db.repositories.user_repository import UserRepository
-from utils.auth_utils import hash_password, verify_password, create_access_token
+from utils.auth_utils import hash_password_async, verify_password_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -13,7 +13,7 @@ async def register(user: UserCreate):
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed = hash_password(user.password)
+    hashed = await hash_password_async(user.password)
 
     user_id = await UserRepository.create_user({
         "name": user.name,
@@ -31,10 +31,11 @@ async def login(user: UserLogin):
     if not db_user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    if not verify_password(user.password, db_user["password"]):
+    if not await verify_password_async(user.password, db_user["password"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    token = create_access_token({"sub": db_user["email"]})
+    # uid lets get_current_user look the user up by _id
+    token = create_access_token({"sub": db_user["email"], "uid": str(db_user["_id"])})
 
     return {
         "access_token": token,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from db.mongo import mongo_manager
+from db.mongo import mongo_manager, explain_repository_queries
+from services.admission_control import get_optimize_admission
 
 router = APIRouter()
 
@@ -15,4 +16,37 @@ async def db_health():
         await mongo_manager.client.admin.command("ping")
         return {"database": "connected"}
     except Exception:
-        return {"database": "disconnected"}
\ No newline at end of file
+        return {"database": "disconnected"}
+
+
+@router.get("/health/db/indexes")
+async def db_indexes():
+    """
+    Index status recorded at startup and query plans of the
+    repository queries. Any COLLSCAN / in-memory SORT is listed under
+    "regressions". Read-only: indexes are only built at startup.
+    """
+    report = mongo_manager.index_report
+
+    try:
+        plans = await explain_repository_queries()
+    except Exception as e:
+        return {"database": "disconnected", "error": str(e)}
+
+    regressions = {p["query"]: p["regressions"] for p in plans if p["regressions"]}
+
+    return {
+        "status": "degraded" if regressions else "healthy",
+        "indexes": report,
+        "query_plans": plans,
+        "regressions": regressions
+    }
+
+
+@router.get("/health/admission")
+async def admission_metrics():
+    """
+    Live /optimize admission metrics for this worker: in-flight,
+    queue depth, wait-time percentiles and rejection counters.
+    """
+    return {"optimize": get_optimize_admission().metrics()}
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends
-from services.pipeline_service import PipelineService
-from models.request_models import OptimizeRequest
-from models.response_models import OptimizeResponse
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from core.config import get_settings
+from services.pipeline_service import PipelineService, TokenBudgetExceeded
+from services.admission_control import AdmissionRejected, get_optimize_admission
+from services.job_queue import get_job_queue
+from services.batch_pipeline_service import BatchPipelineService
+from models.request_models import OptimizeRequest, BatchOptimizeRequest
+from models.response_models import OptimizeResponse, RunListResponse
 from db.repositories.run_repository import RunRepository
 from utils.dependencies import get_current_user
 
@@ -18,20 +26,104 @@ async def optimize(
     current_user: dict = Depends(get_current_user)
 ):
 
-    result = await PipelineService.run_pipeline(
-        request.prompt,
-        user_id=str(current_user["_id"])
+    try:
+        async with get_optimize_admission().slot():
+            result = await PipelineService.run_pipeline(
+                request.prompt,
+                user_id=str(current_user["_id"])
+            )
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.reason,
+            headers={"Retry-After": str(exc.retry_after)}
+        )
+    except TokenBudgetExceeded as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+
+    return PipelineService.build_response(result)
+
+
+# ============================================================
+# BATCH OPTIMIZATION (PROTECTED)
+# ============================================================
+
+@router.post("/optimize/batch")
+async def optimize_batch(
+    request: BatchOptimizeRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Optimizes many prompts in one call, streamed as NDJSON:
+
+    - one {"type": "item", "index", "status": "ok" | "error", ...}
+      line per prompt, in completion order; "ok" items carry the
+      same fields as /optimize and are sent once their run is stored
+      (readable from /runs/{run_id})
+    - a final {"type": "summary", ...} line
+    """
+
+    max_prompts = get_settings().batch_max_prompts
+    if len(request.prompts) > max_prompts:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.prompts)} prompts, max {max_prompts}"
+        )
+
+    async def ndjson():
+        async for line in BatchPipelineService.stream(
+            request.prompts,
+            user_id=str(current_user["_id"]),
+            concurrency=request.concurrency
+        ):
+            yield json.dumps(jsonable_encoder(line)) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+# ============================================================
+# ASYNC OPTIMIZATION JOBS (PROTECTED)
+# ============================================================
+
+@router.post("/optimize/jobs", status_code=202)
+async def submit_optimize_job(
+    request: OptimizeRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Queues the pipeline and returns immediately; poll
+    /optimize/jobs/{job_id} for status and partial results.
+    """
+
+    job_id = await get_job_queue().enqueue(
+        user_id=str(current_user["_id"]),
+        payload={"prompt": request.prompt}
     )
 
-    iteration = result["iterations"][-1]
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/optimize/jobs/{job_id}")
+async def get_optimize_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+
+    job = await get_job_queue().get(job_id, user_id=str(current_user["_id"]))
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
     return {
-        "run_id": result["_id"],
-        "final_score": iteration["evaluation"]["final_score"],
-        "should_iterate": iteration["evaluation"]["should_iterate"],
-        "optimized_prompt": iteration["optimized_prompt"],
-        "optimized_response": iteration["optimized_response"],
-        "evaluation": iteration["evaluation"]
+        "job_id": job["_id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "partial": job["partial"],
+        "result": job["result"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
     }
 
 
@@ -45,7 +137,13 @@ async def generate(
     current_user: dict = Depends(get_current_user)
 ):
 
-    result = await PipelineService.generate_only(request.prompt)
+    try:
+        result = await PipelineService.generate_only(
+            request.prompt,
+            user_id=str(current_user["_id"])
+        )
+    except TokenBudgetExceeded as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
 
     return {
         "response": result["response"],
@@ -58,14 +156,25 @@ async def generate(
 # RUN HISTORY
 # ============================================================
 
-@router.get("/runs")
+@router.get("/runs", response_model=RunListResponse, response_model_by_alias=True)
 async def list_runs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-
-    return await RunRepository.list_runs(
-        user_id=str(current_user["_id"])
-    )
+    """
+    Run summaries, newest first. Pass `next_cursor` from the previous
+    page as `cursor`; full iteration detail is on /runs/{run_id}.
+    """
+
+    try:
+        return await RunRepository.list_runs(
+            user_id=str(current_user["_id"]),
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get("/runs/{run_id}")
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict
 
 
 class Settings(BaseSettings):
@@ -8,6 +9,50 @@ class Settings(BaseSettings):
     mongo_url: str
     groq_api_key: str
 
+    # Per-user token quota (prompt + completion, all calls, UTC day)
+    daily_token_budget: int = 200_000
+
+    # LLM judge: fraction of runs judged (overall / per task_type)
+    # and size of the in-process verdict cache
+    judge_sample_rate: float = 1.0
+    judge_task_sample_rates: Dict[str, float] = {}
+    judge_cache_size: int = 10_000
+
+    # Run persistence: batch run inserts in a write-behind buffer
+    # (runs become readable once their batch is flushed)
+    run_write_behind: bool = False
+    run_write_batch_size: int = 100
+    run_write_flush_ms: int = 50
+
+    # Authenticated-user cache (per process); the TTL bounds how long a
+    # user deleted on another worker keeps access
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: int = 300
+
+    # /optimize admission control (per worker): concurrent pipelines,
+    # FIFO wait queue length and max seconds a request may wait.
+    # Batch items and job workers share the in-flight slots
+    optimize_max_in_flight: int = 4
+    optimize_max_queue: int = 32
+    optimize_queue_timeout_s: float = 15.0
+
+    # Async optimization jobs: queue backend ("mongo", shared by all
+    # workers and restart-safe, or "memory" for a single process),
+    # worker tasks per process, lease length and attempts before a
+    # job is failed
+    job_queue_backend: str = "mongo"
+    job_workers: int = 2
+    job_lease_seconds: int = 120
+    job_max_attempts: int = 3
+    # How long finished jobs (and their usage ledger entries) are kept
+    job_retention_seconds: int = 7 * 24 * 3600
+
+    # /optimize/batch: max prompts per request, concurrent LLM calls
+    # per batch and prompts evaluated together per chunk
+    batch_max_prompts: int = 500
+    batch_llm_concurrency: int = 8
+    batch_eval_chunk: int = 16
+
     class Config:
         env_file = ".env"
 
@@ -1,10 +1,13 @@
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError
 from core.config import get_settings
 
 
 class MongoManager:
     client: AsyncIOMotorClient = None
     db = None
+    index_report: dict = {}
 
 
 mongo_manager = MongoManager()
@@ -20,4 +23,263 @@ async def connect_to_mongo():
 async def close_mongo_connection():
     if mongo_manager.client:
         mongo_manager.client.close()
-        print("❌ MongoDB connection closed")
\ No newline at end of file
+        print("❌ MongoDB connection closed")
+
+
+# =====================================================
+# Index Management
+# =====================================================
+
+# Indexes backing the repository queries. runs.get_run filters on
+# _id (+ user_id), which the built-in _id index already covers.
+INDEX_SPECS = {
+    "runs": [
+        # list_runs: {user_id} sorted by (created_at, _id) desc, keyset paginated
+        {"name": "user_id_created_at_id", "keys": [("user_id", 1), ("created_at", -1), ("_id", -1)]}
+    ],
+    "users": [
+        # get_by_email on every authenticated request
+        {"name": "email_unique", "keys": [("email", 1)], "unique": True}
+    ],
+    "usage": [
+        # one document per (user_id, day), upserted with $inc
+        {"name": "user_id_day_unique", "keys": [("user_id", 1), ("day", 1)], "unique": True}
+    ],
+    "jobs": [
+        # MongoJobQueue.claim: oldest queued / lease-expired job
+        {"name": "status_created_at", "keys": [("status", 1), ("created_at", 1)]},
+        # finished jobs expire (queued / running ones have no finished_at).
+        # "ttl_setting" names the Settings field holding expireAfterSeconds
+        {"name": "finished_at_ttl", "keys": [("finished_at", 1)], "ttl_setting": "job_retention_seconds"}
+    ],
+    "usage_charges": [
+        # per-job usage ledger; only needed while the job can still be retried
+        {"name": "created_at_ttl", "keys": [("created_at", 1)], "ttl_setting": "job_retention_seconds"}
+    ]
+}
+
+
+# Indexes replaced by an INDEX_SPECS entry. They still cost every
+# write on existing deployments, so ensure_indexes drops them once
+# their replacement is in place.
+SUPERSEDED_INDEXES = {
+    # replaced by user_id_created_at_id (keyset pagination tie-break on _id)
+    "runs": ["user_id_created_at"]
+}
+
+
+# create_index error when an index of that name exists with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+
+def _index_options(spec: dict) -> dict:
+    """
+    create_index options of a spec, with its TTL setting resolved.
+    """
+
+    options = {k: v for k, v in spec.items() if k not in {"name", "keys", "ttl_setting"}}
+
+    if "ttl_setting" in spec:
+        options["expireAfterSeconds"] = getattr(get_settings(), spec["ttl_setting"])
+
+    return options
+
+
+async def _set_ttl(collection_name: str, name: str, seconds: int):
+    """
+    Applies a changed expireAfterSeconds to an existing TTL index in
+    place; create_index refuses to change it.
+    """
+
+    await mongo_manager.db.command(
+        "collMod",
+        collection_name,
+        index={"name": name, "expireAfterSeconds": seconds}
+    )
+
+    print(f"🔁 Updated TTL of {collection_name}.{name} to {seconds}s")
+
+
+async def ensure_indexes() -> dict:
+    """
+    Creates every index in INDEX_SPECS (idempotent: create_index is a
+    no-op when an identical index exists), verifies it is present with
+    the expected options and drops the SUPERSEDED_INDEXES it replaces.
+
+    A TTL index whose setting changed since it was built is updated
+    with collMod.
+
+    Failures (e.g. duplicate emails blocking the unique index) are
+    reported, not raised, so the API still starts.
+    """
+
+    report = {}
+
+    for collection_name, specs in INDEX_SPECS.items():
+
+        collection = mongo_manager.db[collection_name]
+        report[collection_name] = {}
+
+        for spec in specs:
+
+            options = _index_options(spec)
+
+            try:
+                await collection.create_index(spec["keys"], name=spec["name"], **options)
+            except OperationFailure as e:
+                if e.code != INDEX_OPTIONS_CONFLICT or "expireAfterSeconds" not in options:
+                    report[collection_name][spec["name"]] = f"error: {e}"
+                    continue
+
+                try:
+                    await _set_ttl(collection_name, spec["name"], options["expireAfterSeconds"])
+                except PyMongoError as e:
+                    report[collection_name][spec["name"]] = f"error: {e}"
+                    continue
+            except PyMongoError as e:
+                report[collection_name][spec["name"]] = f"error: {e}"
+                continue
+
+            report[collection_name][spec["name"]] = "missing"
+
+        try:
+            existing = await collection.index_information()
+        except PyMongoError as e:
+            existing = {}
+            print(f"⚠️ Could not list indexes on {collection_name}: {e}")
+
+        for spec in specs:
+            if report[collection_name][spec["name"]] != "missing":
+                continue
+
+            info = existing.get(spec["name"])
+            matches = (
+                info is not None
+                and [tuple(k) for k in info["key"]] == spec["keys"]
+                and bool(info.get("unique")) == bool(spec.get("unique"))
+                and info.get("expireAfterSeconds") == _index_options(spec).get("expireAfterSeconds")
+            )
+
+            report[collection_name][spec["name"]] = "ok" if matches else "missing"
+
+        # Only once every replacement is verified, so queries never lose their index
+        replaced = all(status == "ok" for status in report[collection_name].values())
+
+        for name in SUPERSEDED_INDEXES.get(collection_name, []):
+            if name not in existing or not replaced:
+                continue
+
+            try:
+                await collection.drop_index(name)
+                print(f"🧹 Dropped superseded index {collection_name}.{name}")
+            except PyMongoError as e:
+                print(f"⚠️ Could not drop superseded index {collection_name}.{name}: {e}")
+
+    mongo_manager.index_report = report
+
+    problems = [
+        f"{c}.{name} ({status})"
+        for c, indexes in report.items()
+        for name, status in indexes.items()
+        if status != "ok"
+    ]
+
+    if problems:
+        print("⚠️ Index problems: " + ", ".join(problems))
+    else:
+        print("✅ MongoDB indexes verified")
+
+    return report
+
+
+# =====================================================
+# Query Plan Diagnostics
+# =====================================================
+
+# Representative shapes of the repository queries. Values are
+# placeholders; only the plan matters.
+QUERY_SHAPES = [
+    {
+        "name": "RunRepository.list_runs",
+        "collection": "runs",
+        "filter": {"user_id": "000000000000000000000000"},
+        "sort": [("created_at", -1), ("_id", -1)]
+    },
+    {
+        "name": "RunRepository.get_run",
+        "collection": "runs",
+        "filter": {"_id": ObjectId("000000000000000000000000"), "user_id": "000000000000000000000000"}
+    },
+    {
+        "name": "UserRepository.get_by_email",
+        "collection": "users",
+        "filter": {"email": "diagnostics@example.invalid"}
+    },
+    {
+        "name": "UsageRepository.get_daily_usage",
+        "collection": "usage",
+        "filter": {"user_id": "000000000000000000000000", "day": "1970-01-01"}
+    }
+]
+
+
+def _plan_stages(plan: dict) -> list:
+    """
+    Flattens a winning plan into its stage names (handles the
+    inputStage / inputStages / queryPlan nesting of classic and SBE
+    explain output).
+    """
+
+    stages = []
+
+    if not isinstance(plan, dict):
+        return stages
+
+    if "stage" in plan:
+        stages.append(plan["stage"])
+
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+
+    return stages
+
+
+async def explain_repository_queries() -> list:
+    """
+    Explains each query in QUERY_SHAPES and flags regressions:
+
+    - COLLSCAN   full collection scan (missing / unused index)
+    - SORT       in-memory sort instead of an index-ordered scan
+    """
+
+    results = []
+
+    for shape in QUERY_SHAPES:
+
+        cursor = mongo_manager.db[shape["collection"]].find(shape["filter"])
+        if "sort" in shape:
+            cursor = cursor.sort(shape["sort"])
+
+        try:
+            explain = await cursor.explain()
+        except PyMongoError as e:
+            results.append({"query": shape["name"], "error": str(e), "regressions": []})
+            continue
+
+        planner = explain.get("queryPlanner", {})
+        stages = _plan_stages(planner.get("winningPlan", {}))
+
+        regressions = [stage for stage in ("COLLSCAN", "SORT") if stage in stages]
+
+        results.append({
+            "query": shape["name"],
+            "collection": shape["collection"],
+            "stages": stages,
+            "regressions": regressions
+        })
+
+    return results
@@ -1,10 +1,115 @@
+import base64
+import hashlib
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from db.mongo import mongo_manager
+from db.run_write_buffer import RunWriteBuffer
 
 
 class RunRepository:
 
+    # Set by start_write_behind(); None means direct inserts
+    _write_buffer: RunWriteBuffer = None
+
+    # -------------------------------------------------
+    # Single-write persistence
+    # -------------------------------------------------
+    @staticmethod
+    def build_run(
+        user_id: str,
+        original_prompt: str,
+        model_used: str,
+        iterations: list,
+        final_prompt: str = None,
+        final_response: str = None,
+        run_id: ObjectId = None
+    ) -> dict:
+        """
+        The complete run document, built in memory. Same fields (and
+        field order) as create_run + add_iteration + finalize_run.
+        """
+
+        now = datetime.utcnow()
+
+        return {
+            # Client-side id: the response does not wait for the insert
+            "_id": run_id or ObjectId(),
+            "user_id": user_id,
+            "original_prompt": original_prompt,
+            "final_prompt": final_prompt,
+            "final_response": final_response,
+            "iterations": iterations,
+            "model_used": model_used,
+            # Mongo stores milliseconds; truncate so the returned
+            # document matches what a later read gives back
+            "created_at": now.replace(microsecond=now.microsecond // 1000 * 1000)
+        }
+
+    @staticmethod
+    def run_id_for_job(job_id: str) -> ObjectId:
+        """
+        Deterministic run _id for a queued job, so every attempt of
+        the job writes the same run.
+        """
+        return ObjectId(hashlib.sha256(f"job:{job_id}".encode()).digest()[:12])
+
+    @staticmethod
+    async def save_run(doc: dict) -> str:
+        """
+        Persists a document from build_run with one insert (or hands
+        it to the write-behind buffer when enabled). Saving a run whose
+        _id already exists (a retried job) is a no-op.
+        """
+
+        if RunRepository._write_buffer is not None:
+            await RunRepository._write_buffer.submit(doc)
+        else:
+            try:
+                await mongo_manager.db.runs.insert_one(doc)
+            except DuplicateKeyError:
+                pass  # written by an earlier attempt
+
+        return str(doc["_id"])
+
+    @staticmethod
+    async def save_runs(docs: list) -> int:
+        """
+        Persists many build_run documents with one unordered insert_many.
+        """
+
+        if not docs:
+            return 0
+
+        result = await mongo_manager.db.runs.insert_many(docs, ordered=False)
+
+        return len(result.inserted_ids)
+
+    @staticmethod
+    def start_write_behind(max_batch: int = 100, flush_interval: float = 0.05, max_pending: int = 10_000):
+
+        if RunRepository._write_buffer is None:
+            RunRepository._write_buffer = RunWriteBuffer(
+                lambda: mongo_manager.db.runs,
+                max_batch=max_batch,
+                flush_interval=flush_interval,
+                max_pending=max_pending
+            )
+            RunRepository._write_buffer.start()
+
+    @staticmethod
+    async def stop_write_behind():
+
+        buffer = RunRepository._write_buffer
+        RunRepository._write_buffer = None
+
+        if buffer is not None:
+            await buffer.stop()
+
+    # -------------------------------------------------
+    # Incremental persistence
+    # -------------------------------------------------
     @staticmethod
     async def create_run(user_id: str, original_prompt: str, model_used: str):
 
@@ -58,17 +163,116 @@ class RunRepository:
 
         return doc
 
+    # -------------------------------------------------
+    # Run History (keyset pagination)
+    # -------------------------------------------------
+    PROMPT_PREVIEW_CHARS = 200
+
+    # Summary projection: no iterations, responses or evaluation bundle
+    SUMMARY_PROJECTION = {
+        "created_at": 1,
+        "model_used": 1,
+        "prompt_preview": {
+            "$substrCP": [{"$ifNull": ["$original_prompt", ""]}, 0, PROMPT_PREVIEW_CHARS]
+        },
+        "final_score": {
+            "$arrayElemAt": ["$iterations.evaluation.final_score", -1]
+        }
+    }
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, run_id: ObjectId) -> str:
+        raw = f"{created_at.isoformat()}|{run_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """
+        Returns (created_at, ObjectId). Raises ValueError on a
+        malformed cursor.
+        """
+        try:
+            created_at, run_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), ObjectId(run_id)
+        except Exception as e:
+            raise ValueError("Invalid cursor") from e
+
     @staticmethod
-    async def list_runs(user_id: str):
+    async def list_runs(user_id: str, limit: int = 20, cursor: str = None):
+        """
+        One page of run summaries, newest first.
+
+        Keyset pagination on (created_at, _id): the next page starts
+        strictly after the last row of this one, so pages stay stable
+        while new runs are inserted and cost O(limit) regardless of
+        depth. Backed by the (user_id, created_at, _id) index.
+        """
+
+        query = {"user_id": user_id}
+
+        if cursor:
+            created_at, run_id = RunRepository.decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": run_id}}
+            ]
+
+        # One extra row tells us whether another page exists
+        docs = await mongo_manager.db.runs.find(
+            query,
+            RunRepository.SUMMARY_PROJECTION
+        ).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = RunRepository.encode_cursor(last["created_at"], last["_id"])
 
         runs = []
+        for doc in docs:
+            doc["_id"] = str(doc["_id"])
+            runs.append(doc)
+
+        return {"runs": runs, "next_cursor": next_cursor}
+
+    # -------------------------------------------------
+    # Bulk Re-scoring
+    # -------------------------------------------------
+    @staticmethod
+    async def iter_stored_scores(batch_size: int = 10_000):
+        """
+        Streams runs with only the fields needed to re-score them.
+        """
 
         cursor = mongo_manager.db.runs.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1)
+            {"iterations.evaluation.aggregation.component_scores": {"$exists": True}},
+            {
+                "iterations.evaluation.aggregation.component_scores": 1,
+                "iterations.evaluation.aggregation.judge_missing": 1,
+                "iterations.evaluation.quality_threshold": 1
+            },
+            batch_size=batch_size
+        )
 
         async for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            runs.append(doc)
+            yield doc
+
+    @staticmethod
+    async def bulk_set_fields(updates: dict) -> int:
+        """
+        updates: {run _id: {dotted.field.path: value, ...}}
+        Sent as one unordered bulk_write.
+        """
+
+        if not updates:
+            return 0
+
+        result = await mongo_manager.db.runs.bulk_write(
+            [UpdateOne({"_id": run_id}, {"$set": fields}) for run_id, fields in updates.items()],
+            ordered=False
+        )
 
-        return runs
\ No newline at end of file
+        return result.modified_count
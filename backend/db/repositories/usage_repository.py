@@ -0,0 +1,183 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from db.mongo import mongo_manager
+
+
+class UsageRepository:
+    """
+    Per-user daily token usage.
+    One document per (user_id, day), updated with atomic $inc.
+
+    Requests reserve their estimated tokens before calling the LLM
+    (reserve), then correct the reservation to the actual usage
+    (settle) or give it back on failure (release). The reservation
+    is a conditional $inc, so concurrent requests cannot together
+    spend past the budget.
+
+    A reservation made with a `charge_id` (queued jobs) is recorded in
+    the `usage_charges` ledger: a retried attempt reuses it, and it is
+    settled or released at most once, so a job is billed once however
+    many times it runs.
+    """
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+    @staticmethod
+    async def get_daily_usage(user_id: str, day: str = None) -> int:
+
+        doc = await mongo_manager.db.usage.find_one(
+            {"user_id": user_id, "day": day or UsageRepository._today()},
+            {"tokens": 1}
+        )
+
+        return doc["tokens"] if doc else 0
+
+    @staticmethod
+    async def add_usage(user_id: str, tokens: int, day: str = None):
+
+        await mongo_manager.db.usage.update_one(
+            {"user_id": user_id, "day": day or UsageRepository._today()},
+            {
+                "$inc": {"tokens": tokens, "requests": 1},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+    # -----------------------------
+    # Reservations
+    # -----------------------------
+
+    @staticmethod
+    async def reserve(user_id: str, tokens: int, budget: int, charge_id: str = None) -> Optional[Dict]:
+        """
+        Adds `tokens` to today's usage only if the total stays within
+        `budget`. Returns the reservation, or None when it does not fit.
+        With a `charge_id` already in the ledger, returns that
+        reservation (flagged "reused") instead of reserving again.
+        """
+
+        if charge_id is not None:
+            existing = await UsageRepository._charge(charge_id)
+            if existing is not None:
+                return existing
+
+        if tokens > budget:
+            return None
+
+        day = UsageRepository._today()
+        key = {"user_id": user_id, "day": day}
+
+        # Make sure the day's document exists, so the conditional
+        # update below never has to upsert
+        try:
+            await mongo_manager.db.usage.update_one(
+                key,
+                {"$setOnInsert": {"tokens": 0, "requests": 0}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # created concurrently
+
+        doc = await mongo_manager.db.usage.find_one_and_update(
+            {**key, "tokens": {"$lte": budget - tokens}},
+            {
+                "$inc": {"tokens": tokens},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            projection={"tokens": 1},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if doc is None:
+            return None
+
+        reservation = {"day": day, "tokens": tokens, "total": doc["tokens"]}
+
+        if charge_id is None:
+            return reservation
+
+        try:
+            await mongo_manager.db.usage_charges.insert_one({
+                "_id": charge_id,
+                "user_id": user_id,
+                "day": day,
+                "tokens": tokens,
+                "status": "reserved",
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            # A concurrent attempt of the same job reserved first: undo ours
+            await UsageRepository._inc(user_id, day, {"tokens": -tokens})
+            return await UsageRepository._charge(charge_id)
+
+        return {**reservation, "charge_id": charge_id}
+
+    @staticmethod
+    async def settle(user_id: str, reservation: Dict, actual: int):
+        """
+        Replaces the reserved tokens with the actual usage and counts
+        the request.
+        """
+
+        if reservation.get("charge_id") is not None:
+            settled = await mongo_manager.db.usage_charges.find_one_and_update(
+                {"_id": reservation["charge_id"], "status": "reserved"},
+                {"$set": {"status": "settled", "tokens_charged": actual, "settled_at": datetime.utcnow()}}
+            )
+            if settled is None:
+                return  # settled or released by another attempt
+
+        await UsageRepository._inc(
+            user_id, reservation["day"],
+            {"tokens": actual - reservation["tokens"], "requests": 1}
+        )
+
+    @staticmethod
+    async def release(user_id: str, reservation: Dict):
+
+        if reservation.get("charge_id") is not None:
+            result = await mongo_manager.db.usage_charges.delete_one(
+                {"_id": reservation["charge_id"], "status": "reserved"}
+            )
+            if result.deleted_count == 0:
+                return
+
+        await UsageRepository._inc(user_id, reservation["day"], {"tokens": -reservation["tokens"]})
+
+    # -----------------------------
+    # Internal
+    # -----------------------------
+
+    @staticmethod
+    async def _inc(user_id: str, day: str, inc: Dict):
+
+        await mongo_manager.db.usage.update_one(
+            {"user_id": user_id, "day": day},
+            {
+                "$inc": inc,
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+
+    @staticmethod
+    async def _charge(charge_id: str) -> Optional[Dict]:
+
+        doc = await mongo_manager.db.usage_charges.find_one({"_id": charge_id})
+
+        if doc is None:
+            return None
+
+        return {
+            "day": doc["day"],
+            "tokens": doc["tokens"],
+            "total": None,
+            "charge_id": charge_id,
+            "reused": True
+        }
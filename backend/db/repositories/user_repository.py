@@ -1,8 +1,13 @@
 from bson import ObjectId
 from db.mongo import mongo_manager
+from utils.user_cache import claims_subject, get_user_cache
 
 
 class UserRepository:
+    """
+    User documents. Every write goes through here and invalidates
+    the authenticated-user cache for that email.
+    """
 
     @staticmethod
     async def get_by_email(email: str):
@@ -11,8 +16,43 @@ class UserRepository:
     @staticmethod
     async def create_user(user_data: dict):
         result = await mongo_manager.db.users.insert_one(user_data)
+
+        # A deleted email may register again
+        get_user_cache().invalidate(user_data["email"])
+        get_user_cache().unrevoke(user_data["email"])
+
         return str(result.inserted_id)
 
     @staticmethod
     async def get_by_id(user_id: str):
-        return await mongo_manager.db.users.find_one({"_id": ObjectId(user_id)})
\ No newline at end of file
+        return await mongo_manager.db.users.find_one({"_id": ObjectId(user_id)})
+
+    @staticmethod
+    async def update_user(user_id: str, fields: dict):
+
+        user = await mongo_manager.db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": fields},
+            projection={"email": 1}
+        )
+
+        # Old email (before the update) and, if changed, the new one
+        if user:
+            get_user_cache().invalidate(user["email"])
+        if "email" in fields:
+            get_user_cache().invalidate(fields["email"])
+
+    @staticmethod
+    async def delete_user(user_id: str):
+
+        user = await mongo_manager.db.users.find_one_and_delete(
+            {"_id": ObjectId(user_id)},
+            projection={"email": 1}
+        )
+
+        # Drop it here at once; other workers see the delete when
+        # their cache entry expires. The account's own tokens stay
+        # revoked even if the email registers again
+        if user:
+            get_user_cache().revoke(user["email"])
+            get_user_cache().revoke(claims_subject(user["email"], user_id))
@@ -0,0 +1,143 @@
+import asyncio
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+
+class RunWriteBuffer:
+    """
+    Write-behind buffer for run documents.
+
+    submit() queues a fully built document (with a client-side _id)
+    and returns immediately; a background task drains the queue with
+    unordered insert_many batches of up to `max_batch` documents,
+    waiting at most `flush_interval` seconds to fill a batch.
+
+    The queue is bounded: when `max_pending` documents are waiting,
+    submit() blocks until the writer catches up (backpressure rather
+    than unbounded memory). stop() drains everything still queued.
+
+    A run is readable from Mongo only once its batch is flushed.
+    """
+
+    def __init__(
+        self,
+        collection_getter,
+        max_batch: int = 100,
+        flush_interval: float = 0.05,
+        max_pending: int = 10_000
+    ):
+        self._collection_getter = collection_getter
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._task = None
+
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "failed": 0
+        }
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Flushes everything still queued, then stops the writer.
+        """
+
+        if self._task is None:
+            return
+
+        await self._queue.join()
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+
+    # ---------------------------
+    # Producer
+    # ---------------------------
+
+    async def submit(self, doc: dict):
+        await self._queue.put(doc)
+        self.stats["submitted"] += 1
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ---------------------------
+    # Writer
+    # ---------------------------
+
+    async def _run(self):
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list):
+
+        collection = self._collection_getter()
+
+        try:
+            await collection.insert_many(batch, ordered=False)
+            self.stats["written"] += len(batch)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported errors was written
+            errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for err in errors if err.get("code") == 11000)
+            self.stats["written"] += len(batch) - len(errors) + duplicates
+            self.stats["failed"] += len(errors) - duplicates
+            if len(errors) > duplicates:
+                print(f"⚠️ Run write-behind: {len(errors) - duplicates} documents failed")
+        except PyMongoError as e:
+            # Whole batch rejected (e.g. connection drop): retry one by one
+            print(f"⚠️ Run write-behind batch failed ({e}); retrying individually")
+            await self._flush_individually(batch)
+
+        self.stats["batches"] += 1
+
+    async def _flush_individually(self, batch: list):
+
+        collection = self._collection_getter()
+
+        for doc in batch:
+            try:
+                await collection.insert_one(doc)
+                self.stats["written"] += 1
+            except DuplicateKeyError:
+                # Already written before the batch error surfaced
+                self.stats["written"] += 1
+            except PyMongoError as e:
+                self.stats["failed"] += 1
+                print(f"⚠️ Run write-behind dropped run {doc.get('_id')}: {e}")
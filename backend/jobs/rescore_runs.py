@@ -0,0 +1,65 @@
+"""
+Re-score stored runs with new aggregation weights.
+
+Usage (from the repository root):
+    python backend/jobs/rescore_runs.py --weights '{"prompt": 0.2, "primitive": 0.1, "response": 0.25, "semantic": 0.2, "judge": 0.25}'
+    python backend/jobs/rescore_runs.py --from-feedback
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(BASE_DIR))
+
+from db.mongo import connect_to_mongo, close_mongo_connection
+from services.rescoring_service import RescoringService
+from logic_layer.evaluation.metrics.aggregation import AggregationEngine
+from logic_layer.evaluation.policy_updater import PolicyUpdater
+
+
+def resolve_weights(args) -> dict:
+
+    if args.from_feedback:
+        engine = AggregationEngine()
+        return PolicyUpdater(engine).update_weights_from_feedback()
+
+    weights = json.loads(args.weights)
+
+    missing = set(AggregationEngine.COMPONENTS) - set(weights)
+    if missing:
+        raise SystemExit(f"Missing weights: {sorted(missing)}")
+
+    return weights
+
+
+async def main(args):
+
+    weights = resolve_weights(args)
+
+    await connect_to_mongo()
+
+    try:
+        summary = await RescoringService.rescore_all(weights, batch_size=args.batch_size)
+    finally:
+        await close_mongo_connection()
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Re-score stored runs with new aggregation weights.")
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--weights", help="JSON object of component weights")
+    source.add_argument("--from-feedback", action="store_true",
+                        help="Use PolicyUpdater's feedback-adjusted weights")
+
+    parser.add_argument("--batch-size", type=int, default=50_000)
+
+    asyncio.run(main(parser.parse_args()))
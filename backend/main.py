@@ -6,10 +6,15 @@ sys.path.append(BASE_DIR)
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware   # 🔥 ADD THIS
-from db.mongo import connect_to_mongo, close_mongo_connection
+from db.mongo import connect_to_mongo, close_mongo_connection, ensure_indexes
 from api.optimize import router as optimize_router
 from api.health import router as health_router
 from api.auth import router as auth_router
+from logic_layer.evaluation.metrics.aggregation import AggregationEngine
+from db.repositories.run_repository import RunRepository
+from core.config import get_settings
+from services.job_queue import get_job_queue
+from services.job_worker import JobWorkerPool
 
 
 app = FastAPI(title="SRPP Studio Backend")
@@ -27,10 +32,28 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    await ensure_indexes()
+    AggregationEngine.reload_weights()
+
+    settings = get_settings()
+    if settings.run_write_behind:
+        RunRepository.start_write_behind(
+            max_batch=settings.run_write_batch_size,
+            flush_interval=settings.run_write_flush_ms / 1000
+        )
+
+    if settings.job_workers > 0:
+        app.state.job_workers = JobWorkerPool(get_job_queue(), settings.job_workers)
+        app.state.job_workers.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if getattr(app.state, "job_workers", None):
+        await app.state.job_workers.stop()
+
+    # Drain queued run writes before the connection goes away
+    await RunRepository.stop_write_behind()
     await close_mongo_connection()
 
 
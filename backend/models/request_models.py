@@ -1,5 +1,12 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 
 class OptimizeRequest(BaseModel):
-    prompt: str
\ No newline at end of file
+    prompt: str
+
+
+class BatchOptimizeRequest(BaseModel):
+    prompts: List[str] = Field(..., min_length=1)
+    # Max concurrent LLM calls for this batch (capped by server settings)
+    concurrency: Optional[int] = Field(None, ge=1)
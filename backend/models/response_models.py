@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 
 
 class OptimizeResponse(BaseModel):
@@ -8,4 +9,20 @@ class OptimizeResponse(BaseModel):
     should_iterate: bool
     optimized_prompt: str
     optimized_response: str
-    evaluation: Dict[str, Any]
\ No newline at end of file
+    evaluation: Dict[str, Any]
+
+
+class RunSummary(BaseModel):
+    id: str = Field(alias="_id")
+    prompt_preview: str
+    final_score: Optional[float] = None
+    model_used: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        populate_by_name = True
+
+
+class RunListResponse(BaseModel):
+    runs: List[RunSummary]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,259 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from core.config import get_settings
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted. Carries the HTTP status
+    (429 queue full, 503 queue deadline exceeded) and a Retry-After hint.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{reason}; retry after {retry_after}s")
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for expensive endpoints.
+
+    - at most `max_in_flight` requests run at once
+    - up to `max_queue` more wait in strict FIFO order, each for at
+      most `queue_timeout` seconds
+    - beyond that, requests are rejected immediately (429), and
+      requests whose wait deadline passes are rejected (503), both
+      with a Retry-After estimated from recent service times
+
+    A finishing request hands its slot straight to the oldest waiter,
+    so newcomers cannot overtake the queue.
+
+    Background work (batch items, queued jobs) takes the same slots
+    through background_slot(): it waits without a deadline and outside
+    the request queue, and only gets a slot no queued request wants.
+    """
+
+    # Rolling window for wait-time percentiles
+    WAIT_WINDOW = 1024
+
+    # Smoothing for the service-time estimate behind Retry-After
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._in_flight = 0
+        self._waiters = deque()
+        self._background_waiters = deque()
+
+        self._wait_times = deque(maxlen=self.WAIT_WINDOW)
+        self._service_ewma = None
+
+        self.counters = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "completed": 0,
+            "background_admitted": 0
+        }
+
+    # ---------------------------
+    # Acquire / Release
+    # ---------------------------
+
+    async def acquire(self):
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._admitted(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(429, "Server busy: request queue is full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        start = time.monotonic()
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+
+            # Granted a slot in the same tick we gave up: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+
+            self.counters["rejected_timeout"] += 1
+            raise AdmissionRejected(
+                503,
+                f"Server busy: not admitted within {self.queue_timeout:g}s",
+                self.retry_after()
+            )
+
+        # The slot was transferred by the releasing request (in-flight
+        # count unchanged)
+        self._admitted(time.monotonic() - start)
+
+    def release(self, service_seconds: float = None):
+
+        if service_seconds is not None:
+            self._record_service(service_seconds)
+
+        self.counters["completed"] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+
+        # Hand the slot to the oldest live waiter, requests first
+        for waiters in (self._waiters, self._background_waiters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+
+        self._in_flight -= 1
+
+    async def acquire_background(self):
+        """
+        Waits for a slot as long as it takes. Never rejected, never
+        ahead of a queued request.
+        """
+
+        if self._in_flight < self.max_in_flight and not self._waiters and not self._background_waiters:
+            self._in_flight += 1
+            self.counters["background_admitted"] += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._background_waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            try:
+                self._background_waiters.remove(waiter)
+            except ValueError:
+                pass
+            raise
+
+        self.counters["background_admitted"] += 1
+
+    @asynccontextmanager
+    async def slot(self):
+
+        await self.acquire()
+        start = time.monotonic()
+
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def background_slot(self):
+
+        await self.acquire_background()
+
+        try:
+            yield
+        finally:
+            # Not counted as a completed request nor in the service-time
+            # estimate behind Retry-After
+            self._release_slot()
+
+    # ---------------------------
+    # Estimates
+    # ---------------------------
+
+    def _admitted(self, waited: float):
+        self.counters["admitted"] += 1
+        self._wait_times.append(waited)
+
+    def _record_service(self, seconds: float):
+        if self._service_ewma is None:
+            self._service_ewma = seconds
+        else:
+            self._service_ewma += self.EWMA_ALPHA * (seconds - self._service_ewma)
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the current queue is expected to drain.
+        """
+
+        service = self._service_ewma or 1.0
+        backlog = len(self._waiters) + 1
+
+        return max(1, min(60, math.ceil(service * backlog / self.max_in_flight)))
+
+    # ---------------------------
+    # Metrics
+    # ---------------------------
+
+    def metrics(self) -> Dict:
+
+        waits = sorted(self._wait_times)
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0.0
+
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "background_waiting": len(self._background_waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout,
+            "wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(waits[-1] * 1000, 2) if waits else 0.0
+            },
+            "service_time_ewma_s": round(self._service_ewma, 3) if self._service_ewma else None,
+            **self.counters
+        }
+
+
+_optimize_admission = None
+
+
+def get_optimize_admission() -> AdmissionController:
+
+    global _optimize_admission
+
+    if _optimize_admission is None:
+        settings = get_settings()
+        _optimize_admission = AdmissionController(
+            max_in_flight=settings.optimize_max_in_flight,
+            max_queue=settings.optimize_max_queue,
+            queue_timeout=settings.optimize_queue_timeout_s
+        )
+
+    return _optimize_admission
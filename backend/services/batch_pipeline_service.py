@@ -0,0 +1,347 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from core.config import get_settings
+from db.repositories.run_repository import RunRepository
+from db.repositories.usage_repository import UsageRepository
+from logic_layer.refiner.single_pass_refiner import SinglePassRefiner
+from logic_layer.controller.output_budget import OutputBudgetPlanner
+from logic_layer.evaluation.evaluator import Evaluator
+from services.admission_control import get_optimize_admission
+from services.llm_service import LLMService
+from services.pipeline_service import PipelineService, TokenBudgetExceeded
+from services.token_service import TokenEstimator
+
+
+class BatchPipelineService:
+    """
+    Optimizes many prompts in one request.
+
+    Compared to calling /optimize in a loop:
+    - models are built once and every prompt is parsed in one
+      nlp.pipe pass (abstraction and intent analysis batched)
+    - LLM and judge calls fan out concurrently, at most `concurrency`
+      items at a time, each holding a background /optimize admission
+      slot so batches and single requests share the worker's limit
+    - evaluation runs in chunks (one embedding call per chunk)
+    - each chunk's runs are stored with one insert_many
+
+    Each item reserves its tokens like /optimize does just before it
+    generates, and is charged only once its run is stored (released
+    if it fails or is not stored).
+
+    Results are yielded per item as soon as their chunk is stored,
+    followed by one summary line.
+    """
+
+    # Background batches keep running when the client disconnects
+    _running = set()
+
+    @staticmethod
+    async def stream(prompts: List[str], user_id: str, concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+
+        lines = asyncio.Queue()
+
+        task = asyncio.create_task(
+            BatchPipelineService._run(prompts, user_id, concurrency, lines.put)
+        )
+        BatchPipelineService._running.add(task)
+        task.add_done_callback(BatchPipelineService._running.discard)
+        task.add_done_callback(lambda _: lines.put_nowait(None))
+
+        while True:
+            line = await lines.get()
+            if line is None:
+                break
+            yield line
+
+        # Surface unexpected failures of the batch itself
+        if not task.cancelled() and task.exception() is not None:
+            yield {"type": "error", "error": f"{type(task.exception()).__name__}: {task.exception()}"}
+
+    # ============================================================
+    # BATCH EXECUTION
+    # ============================================================
+
+    @staticmethod
+    async def _run(prompts: List[str], user_id: str, concurrency: Optional[int], emit):
+
+        settings = get_settings()
+        concurrency = min(concurrency or settings.batch_llm_concurrency, settings.batch_llm_concurrency)
+
+        llm_service = LLMService()
+        planner = OutputBudgetPlanner()
+        estimator = TokenEstimator(llm_service.llm)
+
+        summary = {
+            "type": "summary", "total": len(prompts), "succeeded": 0, "failed": 0,
+            "tokens_charged": 0, "persisted": 0
+        }
+
+        async def item_error(index: int, error: str):
+            summary["failed"] += 1
+            await emit({"type": "item", "index": index, "status": "error", "error": error})
+
+        # -----------------------------
+        # 1️⃣ Optimize Prompts (batched NLP)
+        # -----------------------------
+        refined = await asyncio.to_thread(BatchPipelineService._refine, prompts)
+
+        items = []
+        for index, (prompt, (outcome, error)) in enumerate(zip(prompts, refined)):
+
+            if error:
+                await item_error(index, error)
+                continue
+
+            optimized_prompt, metadata = outcome
+            output_budget = planner.plan(optimized_prompt, metadata)
+
+            items.append({
+                "index": index,
+                "prompt": prompt,
+                "optimized_prompt": optimized_prompt,
+                "metadata": metadata,
+                "output_budget": output_budget,
+                "estimates": PipelineService._estimate(
+                    estimator, planner, prompt, optimized_prompt, metadata, output_budget
+                )
+            })
+
+        # -----------------------------
+        # 2️⃣ Reserve, Generate (concurrent, capped)
+        # -----------------------------
+        # At most `concurrency` items generate at once, and each
+        # reserves its budget only when it starts, so only those (plus
+        # the chunk being evaluated) hold reservations at any time
+        admission = get_optimize_admission()
+
+        async def release(item):
+            reservation, item["reservation"] = item.get("reservation"), None
+            if reservation is not None:
+                await UsageRepository.release(user_id, reservation)
+
+        async def generate(item):
+            try:
+                item["reservation"], item["enable_judge"] = (
+                    await PipelineService._reserve_budget(user_id, item["estimates"])
+                )
+
+                async with admission.background_slot():
+                    item["original_llm_result"], item["optimized_llm_result"] = await asyncio.gather(
+                        asyncio.to_thread(
+                            llm_service.generate,
+                            item["prompt"],
+                            max_tokens=item["estimates"]["original"]["completion_tokens"]
+                        ),
+                        asyncio.to_thread(
+                            llm_service.generate,
+                            item["optimized_prompt"],
+                            max_tokens=item["output_budget"]["max_tokens"],
+                            stop=item["output_budget"]["stop"] or None
+                        )
+                    )
+            except TokenBudgetExceeded as exc:
+                item["error"] = str(exc)
+            except Exception as exc:
+                item["error"] = f"{type(exc).__name__}: {exc}"
+            return item
+
+        # -----------------------------
+        # 3️⃣ Evaluate in chunks as generations finish
+        # -----------------------------
+        judge_cache, judge_sampler = PipelineService._judge_policy()
+        evaluators = {}
+
+        def evaluator_for(enable_judge: bool) -> Evaluator:
+            if enable_judge not in evaluators:
+                evaluators[enable_judge] = Evaluator(
+                    llm=llm_service.llm,
+                    enable_judge=enable_judge,
+                    judge_cache=judge_cache,
+                    judge_sampler=judge_sampler
+                )
+            return evaluators[enable_judge]
+
+        # Judge calls count against the same limits as generation
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def evaluate(item, embeddings):
+            async with semaphore, admission.background_slot():
+                return await asyncio.to_thread(
+                    evaluator_for(item["enable_judge"]).evaluate,
+                    embeddings=embeddings,
+                    **BatchPipelineService._record(item)
+                )
+
+        async def fail(items, error):
+            for item in items:
+                await release(item)
+                await item_error(item["index"], error)
+
+        ready = []
+
+        async def flush():
+
+            chunk = ready[:]
+            ready.clear()
+
+            try:
+                # One embedding call per chunk, then the items in parallel
+                embeddings = await asyncio.to_thread(
+                    evaluator_for(False).embed_many,
+                    [BatchPipelineService._record(item) for item in chunk]
+                )
+                results = await asyncio.gather(*[evaluate(item, embeddings) for item in chunk])
+            except Exception as exc:
+                await fail(chunk, f"{type(exc).__name__}: {exc}")
+                return
+
+            runs = []
+
+            for item, evaluation_result in zip(chunk, results):
+
+                item["tokens_charged"] = PipelineService._tokens_charged(
+                    estimator, item["estimates"],
+                    item["original_llm_result"], item["optimized_llm_result"],
+                    evaluation_result
+                )
+
+                runs.append(PipelineService._build_run(
+                    user_id=user_id,
+                    prompt=item["prompt"],
+                    optimized_prompt=item["optimized_prompt"],
+                    metadata=item["metadata"],
+                    output_budget=item["output_budget"],
+                    estimates=item["estimates"],
+                    estimate_exact=estimator.exact,
+                    enable_judge=item["enable_judge"],
+                    original_llm_result=item["original_llm_result"],
+                    optimized_llm_result=item["optimized_llm_result"],
+                    evaluation_result=evaluation_result,
+                    tokens_charged=item["tokens_charged"]
+                ))
+
+            # -----------------------------
+            # 4️⃣ Persist the chunk, then charge and report it
+            # -----------------------------
+            # Only runs that are stored are charged and returned
+            unsaved = {}
+
+            try:
+                await RunRepository.save_runs(runs)
+            except BulkWriteError as exc:
+                # Unordered: everything but the reported errors was
+                # written (a duplicate _id means it already was)
+                unsaved = {
+                    err["index"]: err.get("errmsg", "write failed")
+                    for err in exc.details.get("writeErrors", [])
+                    if err.get("code") != 11000
+                }
+            except Exception as exc:
+                unsaved = {i: f"{type(exc).__name__}: {exc}" for i in range(len(runs))}
+
+            for position, (item, run) in enumerate(zip(chunk, runs)):
+
+                if position in unsaved:
+                    await fail([item], f"Run not saved: {unsaved[position]}")
+                    continue
+
+                reservation, item["reservation"] = item["reservation"], None
+                await UsageRepository.settle(user_id, reservation, item["tokens_charged"])
+
+                summary["tokens_charged"] += item["tokens_charged"]
+                summary["succeeded"] += 1
+                summary["persisted"] += 1
+
+                await emit({
+                    "type": "item",
+                    "index": item["index"],
+                    "status": "ok",
+                    **PipelineService.build_response({**run, "_id": str(run["_id"])})
+                })
+
+        waiting = iter(items)
+        running = {asyncio.create_task(generate(item)) for item in itertools.islice(waiting, concurrency)}
+
+        try:
+            while running:
+
+                finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in finished:
+
+                    # Keep `concurrency` items generating
+                    for item in itertools.islice(waiting, 1):
+                        running.add(asyncio.create_task(generate(item)))
+
+                    item = task.result()
+
+                    if "error" in item:
+                        await fail([item], item["error"])
+                        continue
+
+                    ready.append(item)
+
+                    if len(ready) >= settings.batch_eval_chunk:
+                        await flush()
+
+            if ready:
+                await flush()
+
+        finally:
+            # Cancelled or crashed mid-batch: stop generating and give
+            # back what was not settled
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+            for item in items:
+                await release(item)
+
+        await emit(summary)
+
+    # ============================================================
+    # THREAD-SIDE HELPERS
+    # ============================================================
+
+    @staticmethod
+    def _refine(prompts: List[str]) -> List:
+        """
+        [((optimized_prompt, metadata), None) | (None, error)] per prompt.
+        Falls back to one prompt at a time if the batch pass fails, so
+        a single bad prompt only fails its own item.
+        """
+
+        refiner = SinglePassRefiner()
+
+        try:
+            return [(outcome, None) for outcome in refiner.refine_many(prompts)]
+        except Exception:
+            pass
+
+        results = []
+        for prompt in prompts:
+            try:
+                results.append((refiner.refine(prompt), None))
+            except Exception as exc:
+                results.append((None, f"{type(exc).__name__}: {exc}"))
+
+        return results
+
+    @staticmethod
+    def _record(item: Dict) -> Dict:
+        """
+        The Evaluator.evaluate arguments for a generated item.
+        """
+
+        return {
+            "original_prompt": item["prompt"],
+            "optimized_prompt": item["optimized_prompt"],
+            "original_response": item["original_llm_result"]["output"],
+            "optimized_response": item["optimized_llm_result"]["output"],
+            "metadata": item["metadata"]
+        }
@@ -0,0 +1,398 @@
+import asyncio
+import os
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from core.config import get_settings
+from db.mongo import mongo_manager
+
+
+# Job lifecycle: queued -> running -> succeeded | failed
+# A running job whose lease expires (worker crashed or restarted)
+# goes back to being claimable until max_attempts is used up.
+# Finished jobs are kept for retention_seconds, then dropped.
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Pluggable queue backend for optimization jobs.
+
+    Workers claim a job with a lease, renew it while running, and
+    finish it with complete() / fail(). Only the current lease owner
+    can report progress or finish a job.
+    """
+
+    def __init__(self, lease_seconds: int = 60, max_attempts: int = 3, retention_seconds: int = 7 * 24 * 3600):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+
+    async def enqueue(self, user_id: str, payload: Dict) -> str:
+        raise NotImplementedError
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def wait_for_work(self, timeout: float):
+        """
+        Blocks until work may be available or `timeout` passes.
+        """
+        await asyncio.sleep(timeout)
+
+    async def renew(self, job_id: str, worker_id: str) -> bool:
+        raise NotImplementedError
+
+    async def progress(self, job_id: str, worker_id: str, stage: str, partial: Dict):
+        raise NotImplementedError
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict):
+        raise NotImplementedError
+
+    async def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False):
+        raise NotImplementedError
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _new_job(user_id: str, payload: Dict) -> Dict:
+        now = datetime.utcnow()
+        return {
+            "user_id": user_id,
+            "payload": payload,
+            "status": QUEUED,
+            "stage": None,
+            "partial": {},
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+
+
+# ============================================================
+# IN-PROCESS BACKEND
+# ============================================================
+
+class InMemoryJobQueue(JobQueue):
+    """
+    Single-process queue. Fast and dependency-free, but jobs live only
+    as long as the process and are visible only to it: use the Mongo
+    backend when running several workers or when jobs must survive a
+    restart.
+    """
+
+    def __init__(self, lease_seconds: int = 60, max_attempts: int = 3, retention_seconds: int = 7 * 24 * 3600):
+        super().__init__(lease_seconds, max_attempts, retention_seconds)
+        self._jobs = {}
+        self._pending = deque()
+        # Running jobs (checked for expired leases) and finished job
+        # ids in finishing order (evicted after retention_seconds)
+        self._running = {}
+        self._finished = deque()
+        self._work = asyncio.Event()
+
+    async def enqueue(self, user_id: str, payload: Dict) -> str:
+        self._evict_finished()
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {"_id": job_id, **self._new_job(user_id, payload)}
+        self._push(job_id)
+        return job_id
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+
+        self._evict_finished()
+
+        # Expired leases (a worker task died mid-job) become claimable again
+        now = datetime.utcnow()
+        for job in list(self._running.values()):
+            if job["lease_expires_at"] <= now:
+                self._requeue_or_fail(job)
+
+        while self._pending:
+            job = self._jobs.get(self._pending.popleft())
+            if job is None or job["status"] != QUEUED:
+                continue
+
+            job.update({
+                "status": RUNNING,
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now
+            })
+            job["attempts"] += 1
+            self._running[job["_id"]] = job
+
+            return dict(job)
+
+        return None
+
+    async def wait_for_work(self, timeout: float):
+        if not self._pending:
+            self._work.clear()
+            try:
+                await asyncio.wait_for(self._work.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _push(self, job_id: str):
+        self._pending.append(job_id)
+        self._work.set()
+
+    def _requeue_or_fail(self, job: Dict):
+        if job["attempts"] >= self.max_attempts:
+            self._finish(job, status=FAILED, error=job["error"] or "Lease expired too many times")
+        else:
+            self._running.pop(job["_id"], None)
+            job.update({"status": QUEUED, "lease_owner": None, "lease_expires_at": None,
+                        "updated_at": datetime.utcnow()})
+            self._push(job["_id"])
+
+    def _finish(self, job: Dict, **fields):
+        now = datetime.utcnow()
+        job.update({**fields, "lease_owner": None, "lease_expires_at": None,
+                    "updated_at": now, "finished_at": now})
+        self._running.pop(job["_id"], None)
+        self._finished.append(job["_id"])
+
+    def _evict_finished(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        while self._finished:
+            job = self._jobs.get(self._finished[0])
+            if job is not None and job["finished_at"] > cutoff:
+                break
+            self._finished.popleft()
+            if job is not None:
+                del self._jobs[job["_id"]]
+
+    def _owned(self, job_id: str, worker_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != RUNNING or job["lease_owner"] != worker_id:
+            return None
+        return job
+
+    async def renew(self, job_id: str, worker_id: str) -> bool:
+        job = self._owned(job_id, worker_id)
+        if job is None:
+            return False
+        job["lease_expires_at"] = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+        return True
+
+    async def progress(self, job_id: str, worker_id: str, stage: str, partial: Dict):
+        job = self._owned(job_id, worker_id)
+        if job is not None:
+            job["stage"] = stage
+            job["partial"].update(partial)
+            job["updated_at"] = datetime.utcnow()
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict):
+        job = self._owned(job_id, worker_id)
+        if job is not None:
+            self._finish(job, status=SUCCEEDED, stage="done", result=result, error=None)
+
+    async def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False):
+        job = self._owned(job_id, worker_id)
+        if job is None:
+            return
+        job["error"] = error
+        if retry:
+            self._requeue_or_fail(job)
+        else:
+            self._finish(job, status=FAILED)
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        if job is None or job["user_id"] != user_id:
+            return None
+        return dict(job)
+
+
+# ============================================================
+# MONGO BACKEND
+# ============================================================
+
+class MongoJobQueue(JobQueue):
+    """
+    Jobs stored in the `jobs` collection; any number of API workers
+    share the queue. Claims are atomic find_one_and_update calls, so
+    each job runs on exactly one worker at a time. If that worker
+    dies, its lease expires and another worker picks the job up.
+    Finished jobs are removed by the TTL index on finished_at.
+    """
+
+    POLL_SECONDS = 1.0
+
+    @staticmethod
+    def _collection():
+        return mongo_manager.db.jobs
+
+    @staticmethod
+    def _object_id(job_id: str) -> Optional[ObjectId]:
+        try:
+            return ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+
+    async def enqueue(self, user_id: str, payload: Dict) -> str:
+        result = await self._collection().insert_one(self._new_job(user_id, payload))
+        return str(result.inserted_id)
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+
+        now = datetime.utcnow()
+
+        # Expired leases that used up their attempts are failed for good
+        await self._collection().update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lte": now}, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {
+                "status": FAILED, "error": "Lease expired too many times",
+                "lease_owner": None, "updated_at": now, "finished_at": now
+            }}
+        )
+
+        job = await self._collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": QUEUED},
+                    {"status": RUNNING, "lease_expires_at": {"$lte": now}}
+                ],
+                "attempts": {"$lt": self.max_attempts}
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+        if job:
+            job["_id"] = str(job["_id"])
+
+        return job
+
+    async def wait_for_work(self, timeout: float):
+        await asyncio.sleep(min(timeout, self.POLL_SECONDS))
+
+    def _owned_filter(self, job_id: str, worker_id: str) -> Dict:
+        return {"_id": self._object_id(job_id), "status": RUNNING, "lease_owner": worker_id}
+
+    async def renew(self, job_id: str, worker_id: str) -> bool:
+        result = await self._collection().update_one(
+            self._owned_filter(job_id, worker_id),
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    async def progress(self, job_id: str, worker_id: str, stage: str, partial: Dict):
+        await self._collection().update_one(
+            self._owned_filter(job_id, worker_id),
+            {"$set": {
+                "stage": stage,
+                "updated_at": datetime.utcnow(),
+                **{f"partial.{k}": v for k, v in partial.items()}
+            }}
+        )
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict):
+        now = datetime.utcnow()
+        await self._collection().update_one(
+            self._owned_filter(job_id, worker_id),
+            {"$set": {
+                "status": SUCCEEDED, "stage": "done", "result": result, "error": None,
+                "lease_owner": None, "lease_expires_at": None, "updated_at": now, "finished_at": now
+            }}
+        )
+
+    async def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False):
+
+        now = datetime.utcnow()
+
+        if retry:
+            # Back to the queue unless attempts are used up
+            await self._collection().update_one(
+                {**self._owned_filter(job_id, worker_id), "attempts": {"$lt": self.max_attempts}},
+                {"$set": {"status": QUEUED, "error": error, "lease_owner": None,
+                          "lease_expires_at": None, "updated_at": now}}
+            )
+
+        await self._collection().update_one(
+            self._owned_filter(job_id, worker_id),
+            {"$set": {"status": FAILED, "error": error, "lease_owner": None,
+                      "lease_expires_at": None, "updated_at": now, "finished_at": now}}
+        )
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict]:
+
+        object_id = self._object_id(job_id)
+        if object_id is None:
+            return None
+
+        job = await self._collection().find_one({"_id": object_id, "user_id": user_id})
+
+        if job:
+            job["_id"] = str(job["_id"])
+
+        return job
+
+
+# ============================================================
+# FACTORY
+# ============================================================
+
+JOB_QUEUES = {
+    "memory": InMemoryJobQueue,
+    "mongo": MongoJobQueue,
+}
+
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+
+    global _job_queue
+
+    if _job_queue is None:
+        settings = get_settings()
+
+        if settings.job_queue_backend not in JOB_QUEUES:
+            raise ValueError(
+                f"Unknown job queue backend: {settings.job_queue_backend}. "
+                f"Choose from {sorted(JOB_QUEUES)}"
+            )
+
+        # Each process would hold its own queue: a job submitted to one
+        # worker 404s on the others and is lost on restart
+        web_workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+        if settings.job_queue_backend == "memory" and web_workers > 1:
+            raise ValueError(
+                f"The memory job queue is per process; use JOB_QUEUE_BACKEND=mongo "
+                f"with {web_workers} workers (WEB_CONCURRENCY)"
+            )
+
+        _job_queue = JOB_QUEUES[settings.job_queue_backend](
+            lease_seconds=settings.job_lease_seconds,
+            max_attempts=settings.job_max_attempts,
+            retention_seconds=settings.job_retention_seconds
+        )
+
+    return _job_queue
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import socket
+import traceback
+
+from services.admission_control import get_optimize_admission
+from services.job_queue import JobQueue
+from services.pipeline_service import PipelineService, TokenBudgetExceeded
+
+
+class JobWorkerPool:
+    """
+    Runs queued optimization jobs with `concurrency` worker tasks in
+    this process.
+
+    Each job holds a lease that a heartbeat renews every third of the
+    lease while the pipeline runs. If the process dies, the lease
+    lapses and (with the Mongo backend) another worker re-runs the job.
+    Token-budget rejections fail the job at once; other errors are
+    retried until the queue's max_attempts. Re-runs are idempotent:
+    run_pipeline charges and saves each job once.
+    """
+
+    IDLE_WAIT_SECONDS = 5.0
+
+    def __init__(self, queue: JobQueue, concurrency: int = 2):
+        self.queue = queue
+        self.concurrency = concurrency
+        self._tasks = []
+
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(f"{self.worker_prefix}:{n}"))
+                for n in range(self.concurrency)
+            ]
+
+    async def stop(self):
+        """
+        Cancels the workers. Jobs they were running keep their lease
+        until it expires and are then picked up again.
+        """
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---------------------------
+    # Worker loop
+    # ---------------------------
+
+    async def _worker(self, worker_id: str):
+
+        while True:
+            try:
+                job = await self.queue.claim(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job claim failed on {worker_id}: {e}")
+                job = None
+
+            if job is None:
+                await self.queue.wait_for_work(self.IDLE_WAIT_SECONDS)
+                continue
+
+            await self._run_job(job, worker_id)
+
+    async def _run_job(self, job: dict, worker_id: str):
+
+        job_id = job["_id"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id))
+
+        async def progress(stage: str, partial: dict):
+            await self.queue.progress(job_id, worker_id, stage, partial)
+
+        try:
+            # Shares the per-worker /optimize slots, behind queued requests
+            async with get_optimize_admission().background_slot():
+                result = await PipelineService.run_pipeline(
+                    job["payload"]["prompt"],
+                    user_id=job["user_id"],
+                    progress=progress,
+                    job_id=job_id
+                )
+            await self.queue.complete(job_id, worker_id, PipelineService.build_response(result))
+
+        except TokenBudgetExceeded as exc:
+            await self.queue.fail(job_id, worker_id, str(exc), retry=False)
+
+        except asyncio.CancelledError:
+            # Shutting down: leave the lease to expire so the job is re-run
+            raise
+
+        except Exception as exc:
+            traceback.print_exc()
+            await self.queue.fail(job_id, worker_id, f"{type(exc).__name__}: {exc}", retry=True)
+
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str, worker_id: str):
+
+        interval = max(1.0, self.queue.lease_seconds / 3)
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.renew(job_id, worker_id):
+                    print(f"⚠️ Lost lease on job {job_id} ({worker_id})")
+                    return
+            except Exception as e:
+                print(f"⚠️ Lease renewal failed for job {job_id}: {e}")
@@ -19,5 +19,5 @@ class LLMService:
             }
         )
 
-    def generate(self, prompt: str):
-        return self.llm.generate(prompt)
\ No newline at end of file
+    def generate(self, prompt: str, **kwargs):
+        return self.llm.generate(prompt, **kwargs)
\ No newline at end of file
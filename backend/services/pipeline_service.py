@@ -1,81 +1,340 @@
+import asyncio
+from core.config import get_settings
 from db.repositories.run_repository import RunRepository
+from db.repositories.usage_repository import UsageRepository
 from logic_layer.refiner.single_pass_refiner import SinglePassRefiner
+from logic_layer.controller.output_budget import OutputBudgetPlanner
 from logic_layer.evaluation.evaluator import Evaluator
+from logic_layer.evaluation.judge_cache import JudgeCache
+from logic_layer.evaluation.judge_sampling import JudgeSampler
 from services.llm_service import LLMService
+from services.token_service import TokenEstimator
+
+
+class TokenBudgetExceeded(Exception):
+
+    def __init__(self, used: int, budget: int, estimated: int):
+        self.used = used
+        self.budget = budget
+        self.estimated = estimated
+        super().__init__(
+            f"Daily token budget exceeded: {used} used, "
+            f"{estimated} estimated, budget {budget}"
+        )
 
 
 class PipelineService:
 
+    _judge_cache = None
+    _judge_sampler = None
+
     @staticmethod
-    async def run_pipeline(prompt: str, user_id: str):
+    def _judge_policy():
 
-        # -----------------------------
-        # 1️⃣ Create Run Entry
-        # -----------------------------
-        run_id = await RunRepository.create_run(
-            user_id=user_id,
-            original_prompt=prompt,
-            model_used="groq"
-        )
+        # Shared across requests so repeated pairs hit the cache
+        if PipelineService._judge_cache is None:
+            settings = get_settings()
+            PipelineService._judge_cache = JudgeCache(settings.judge_cache_size)
+            PipelineService._judge_sampler = JudgeSampler(
+                default_rate=settings.judge_sample_rate,
+                task_rates=settings.judge_task_sample_rates
+            )
+
+        return PipelineService._judge_cache, PipelineService._judge_sampler
+
+    @staticmethod
+    async def run_pipeline(prompt: str, user_id: str, progress=None, job_id: str = None):
+        """
+        progress: optional `async (stage, partial) -> None` callback,
+        called after each stage with the results so far (used by the
+        job API to expose partial results).
+
+        job_id: set for queued jobs. A retried or re-leased job is
+        charged once and writes one run: the usage reservation is
+        keyed by the job and the run _id derived from it, and an
+        attempt after the run was saved just returns it.
+        """
+
+        run_id = charge_id = None
+
+        if job_id is not None:
+            run_id = RunRepository.run_id_for_job(job_id)
+            charge_id = f"job:{job_id}"
+
+            existing = await RunRepository.get_run(str(run_id), user_id)
+            if existing is not None:
+                return existing
+
+        async def report(stage: str, partial: dict):
+            if progress is not None:
+                await progress(stage, partial)
 
         llm_service = LLMService()
         refiner = SinglePassRefiner()
+        planner = OutputBudgetPlanner()
+        estimator = TokenEstimator(llm_service.llm)
 
         # -----------------------------
-        # 2️⃣ Generate Original Response
+        # 1️⃣ Optimize Prompt (local, no token cost)
         # -----------------------------
-        original_llm_result = llm_service.generate(prompt)
-        original_response = original_llm_result["output"]
+        # CPU-bound NLP and blocking LLM calls run in worker threads so
+        # the event loop keeps serving other requests meanwhile
+        optimized_prompt, metadata = await asyncio.to_thread(refiner.refine, prompt)
+
+        output_budget = planner.plan(optimized_prompt, metadata)
+
+        await report("refined", {"optimized_prompt": optimized_prompt})
 
         # -----------------------------
-        # 3️⃣ Optimize Prompt
+        # 2️⃣ Estimate Cost & Enforce Budget
         # -----------------------------
-        optimized_prompt, metadata = refiner.refine(prompt)
+        estimates = PipelineService._estimate(
+            estimator, planner, prompt, optimized_prompt, metadata, output_budget
+        )
+
+        reservation, enable_judge = await PipelineService._reserve_budget(user_id, estimates, charge_id)
+
+        try:
+            tokens_charged, original_llm_result, optimized_llm_result, evaluation_result = (
+                await PipelineService._generate_and_evaluate(
+                    llm_service, estimator, prompt, optimized_prompt, metadata,
+                    output_budget, estimates, enable_judge, report
+                )
+            )
+        except BaseException:
+            # Failed or cancelled: give the reserved tokens back
+            await UsageRepository.release(user_id, reservation)
+            raise
 
         # -----------------------------
-        # 4️⃣ Generate Optimized Response
+        # 5️⃣ Charge Actual Usage
         # -----------------------------
-        optimized_llm_result = llm_service.generate(optimized_prompt)
-        optimized_response = optimized_llm_result["output"]
+        await UsageRepository.settle(user_id, reservation, tokens_charged)
 
         # -----------------------------
-        # 5️⃣ Evaluate
+        # 6️⃣ Persist Run (single write)
         # -----------------------------
-        evaluator = Evaluator(llm=llm_service.llm)
-
-        evaluation_result = evaluator.evaluate(
-            original_prompt=prompt,
+        run = PipelineService._build_run(
+            user_id=user_id,
+            prompt=prompt,
             optimized_prompt=optimized_prompt,
-            original_response=original_response,
-            optimized_response=optimized_response,
-            metadata=metadata
+            metadata=metadata,
+            output_budget=output_budget,
+            estimates=estimates,
+            estimate_exact=estimator.exact,
+            enable_judge=enable_judge,
+            original_llm_result=original_llm_result,
+            optimized_llm_result=optimized_llm_result,
+            evaluation_result=evaluation_result,
+            tokens_charged=tokens_charged,
+            run_id=run_id
         )
 
+        saved_id = await RunRepository.save_run(run)
+
+        # Respond from the in-memory document, no read-back
+        return {**run, "_id": saved_id}
+
+    @staticmethod
+    async def _generate_and_evaluate(
+        llm_service, estimator, prompt, optimized_prompt, metadata,
+        output_budget, estimates, enable_judge, report
+    ):
+
         # -----------------------------
-        # 6️⃣ Log Iteration
+        # 3️⃣ Generate Original & Optimized Responses (concurrently)
         # -----------------------------
-        await RunRepository.add_iteration(run_id, {
-            "iteration": 1,
-            "optimized_prompt": optimized_prompt,
+        # Both calls are capped at the completion budget they were estimated with
+        original_llm_result, optimized_llm_result = await asyncio.gather(
+            asyncio.to_thread(
+                llm_service.generate,
+                prompt,
+                max_tokens=estimates["original"]["completion_tokens"]
+            ),
+            asyncio.to_thread(
+                llm_service.generate,
+                optimized_prompt,
+                max_tokens=output_budget["max_tokens"],
+                stop=output_budget["stop"] or None
+            )
+        )
+        original_response = original_llm_result["output"]
+        optimized_response = optimized_llm_result["output"]
+
+        await report("generated", {
             "original_response": original_response,
-            "optimized_response": optimized_response,
-            "evaluation": evaluation_result,
-            "latency_original": original_llm_result["latency"],
-            "latency_optimized": optimized_llm_result["latency"],
-            "tokens_original": original_llm_result["tokens_used"],
-            "tokens_optimized": optimized_llm_result["tokens_used"],
+            "optimized_response": optimized_response
         })
 
         # -----------------------------
-        # 7️⃣ Finalize Run
+        # 4️⃣ Evaluate
         # -----------------------------
-        await RunRepository.finalize_run(
-            run_id,
+        judge_cache, judge_sampler = PipelineService._judge_policy()
+
+        def evaluate():
+            evaluator = Evaluator(
+                llm=llm_service.llm,
+                enable_judge=enable_judge,
+                judge_cache=judge_cache,
+                judge_sampler=judge_sampler
+            )
+
+            return evaluator.evaluate(
+                original_prompt=prompt,
+                optimized_prompt=optimized_prompt,
+                original_response=original_response,
+                optimized_response=optimized_response,
+                metadata=metadata,
+                # Prompt embedding from intent analysis, not re-encoded
+                embeddings=metadata.get("embeddings")
+            )
+
+        evaluation_result = await asyncio.to_thread(evaluate)
+
+        await report("evaluated", {"final_score": evaluation_result["final_score"]})
+
+        tokens_charged = PipelineService._tokens_charged(
+            estimator, estimates, original_llm_result, optimized_llm_result, evaluation_result
+        )
+
+        return tokens_charged, original_llm_result, optimized_llm_result, evaluation_result
+
+
+    # ============================================================
+    # SHARED STEPS (single run and batch)
+    # ============================================================
+
+    @staticmethod
+    def _estimate(estimator, planner, prompt, optimized_prompt, metadata, output_budget) -> dict:
+
+        estimates = {
+            "original": estimator.estimate_call(
+                prompt,
+                planner.plan(prompt, metadata)["max_tokens"]
+            ),
+            "optimized": estimator.estimate_call(
+                optimized_prompt,
+                output_budget["max_tokens"]
+            ),
+        }
+        estimates["judge"] = estimator.estimate_judge_call(
+            optimized_prompt,
+            output_budget["max_tokens"]
+        )
+
+        return estimates
+
+    @staticmethod
+    def _tokens_charged(estimator, estimates, original_llm_result, optimized_llm_result, evaluation_result) -> int:
+
+        # Every judge call that reached the LLM, parse retries included
+        # (a cached verdict made none); the estimate stands in where the
+        # backend does not report tokens_used
+        judge_usage = evaluation_result["metrics"]["judge_metrics"].get("usage") or {}
+
+        judge_tokens = sum(
+            estimator.actual_or_estimate({"tokens_used": tokens}, estimates["judge"])
+            for tokens in judge_usage.get("tokens", [])
+        )
+
+        return (
+            estimator.actual_or_estimate(original_llm_result, estimates["original"])
+            + estimator.actual_or_estimate(optimized_llm_result, estimates["optimized"])
+            + judge_tokens
+        )
+
+    @staticmethod
+    def _build_run(
+        user_id, prompt, optimized_prompt, metadata, output_budget, estimates, estimate_exact,
+        enable_judge, original_llm_result, optimized_llm_result, evaluation_result, tokens_charged,
+        run_id=None
+    ) -> dict:
+
+        return RunRepository.build_run(
+            user_id=user_id,
+            original_prompt=prompt,
+            model_used="groq",
+            iterations=[{
+                "iteration": 1,
+                "optimized_prompt": optimized_prompt,
+                # What the evaluator scored against (offline re-scoring reads it back);
+                # embeddings are a cache, not stored
+                "metadata": {k: v for k, v in metadata.items() if k != "embeddings"},
+                "original_response": original_llm_result["output"],
+                "optimized_response": optimized_llm_result["output"],
+                "evaluation": evaluation_result,
+                "latency_original": original_llm_result["latency"],
+                "latency_optimized": optimized_llm_result["latency"],
+                "tokens_original": original_llm_result["tokens_used"],
+                "tokens_optimized": optimized_llm_result["tokens_used"],
+                "output_budget": {
+                    **output_budget,
+                    "completion_tokens": optimized_llm_result.get("completion_tokens"),
+                    "finish_reason": optimized_llm_result.get("finish_reason"),
+                },
+                "token_usage": {
+                    "estimates": estimates,
+                    "estimate_exact": estimate_exact,
+                    "judge_skipped": not enable_judge,
+                    "tokens_charged": tokens_charged,
+                },
+            }],
             final_prompt=optimized_prompt,
-            final_response=optimized_response
+            final_response=optimized_llm_result["output"],
+            run_id=run_id
         )
 
-        return await RunRepository.get_run(run_id, user_id)
+    @staticmethod
+    def build_response(result: dict) -> dict:
+        """
+        The /optimize response body for a finished run.
+        """
+
+        iteration = result["iterations"][-1]
+
+        return {
+            "run_id": result["_id"],
+            "final_score": iteration["evaluation"]["final_score"],
+            "should_iterate": iteration["evaluation"]["should_iterate"],
+            "optimized_prompt": iteration["optimized_prompt"],
+            "optimized_response": iteration["optimized_response"],
+            "evaluation": iteration["evaluation"]
+        }
+
+
+    # ============================================================
+    # TOKEN BUDGET
+    # ============================================================
+
+    @staticmethod
+    async def _reserve_budget(user_id: str, estimates: dict, charge_id: str = None):
+        """
+        Reserves the estimated tokens against today's budget and
+        returns (reservation, enable_judge). The judge is dropped when
+        only the two target calls fit; TokenBudgetExceeded is raised
+        when even those do not. An earlier attempt's reservation under
+        `charge_id` is reused as is.
+        """
+
+        budget = get_settings().daily_token_budget
+
+        required = (
+            estimates["original"]["total_tokens"]
+            + estimates["optimized"]["total_tokens"]
+        )
+        judge = estimates["judge"]["total_tokens"]
+
+        reservation = await UsageRepository.reserve(user_id, required + judge, budget, charge_id)
+        if reservation is not None:
+            return reservation, reservation["tokens"] >= required + judge
+
+        # Downgrade: skip the judge rather than reject the request
+        reservation = await UsageRepository.reserve(user_id, required, budget, charge_id)
+        if reservation is not None:
+            return reservation, False
+
+        used = await UsageRepository.get_daily_usage(user_id)
+        raise TokenBudgetExceeded(used, budget, required)
 
 
     # ============================================================
@@ -83,14 +342,40 @@ class PipelineService:
     # ============================================================
 
     @staticmethod
-    async def generate_only(prompt: str):
+    async def generate_only(prompt: str, user_id: str = None):
 
         llm_service = LLMService()
 
-        llm_result = llm_service.generate(prompt)
+        if user_id is not None:
+            estimator = TokenEstimator(llm_service.llm)
+            estimate = estimator.estimate_call(
+                prompt,
+                OutputBudgetPlanner.DEFAULT_BUDGET
+            )
+
+            budget = get_settings().daily_token_budget
+            reservation = await UsageRepository.reserve(user_id, estimate["total_tokens"], budget)
+
+            if reservation is None:
+                used = await UsageRepository.get_daily_usage(user_id)
+                raise TokenBudgetExceeded(used, budget, estimate["total_tokens"])
+
+        try:
+            llm_result = llm_service.generate(prompt, max_tokens=OutputBudgetPlanner.DEFAULT_BUDGET)
+        except BaseException:
+            if user_id is not None:
+                await UsageRepository.release(user_id, reservation)
+            raise
+
+        if user_id is not None:
+            await UsageRepository.settle(
+                user_id,
+                reservation,
+                estimator.actual_or_estimate(llm_result, estimate)
+            )
 
         return {
             "response": llm_result["output"],
             "latency": llm_result["latency"],
             "tokens": llm_result["tokens_used"]
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,96 @@
+import math
+import time
+from typing import Dict
+
+import numpy as np
+
+from db.repositories.run_repository import RunRepository
+from logic_layer.evaluation.metrics.aggregation import AggregationEngine
+
+
+class RescoringService:
+    """
+    Recomputes stored final scores after the aggregation weights change.
+
+    Component scores already stored under
+    iterations[i].evaluation.aggregation.component_scores are loaded
+    batch by batch into an (n, 5) matrix, re-weighted with one
+    matrix-vector product, and written back with unordered bulk updates.
+    No metric or judge is re-run.
+    """
+
+    DEFAULT_THRESHOLD = 0.65
+
+    @staticmethod
+    async def rescore_all(weights: Dict[str, float], batch_size: int = 50_000) -> Dict:
+
+        engine = AggregationEngine(weights=dict(weights))
+
+        start = time.perf_counter()
+
+        summary = {"iterations_rescored": 0, "runs_updated": 0}
+
+        rows, thresholds, targets = [], [], []
+
+        # The cursor fetches as many runs per round trip as a flush holds iterations
+        async for run in RunRepository.iter_stored_scores(batch_size=batch_size):
+
+            for index, iteration in enumerate(run.get("iterations", [])):
+
+                evaluation = iteration.get("evaluation") or {}
+                aggregation = evaluation.get("aggregation") or {}
+                components = aggregation.get("component_scores")
+
+                if not components:
+                    continue
+
+                judge_score = components.get("judge_score")
+                if judge_score is None or aggregation.get("judge_missing"):
+                    judge_score = math.nan
+
+                rows.append([
+                    components.get("prompt_score", 0.0),
+                    components.get("primitive_score", 0.0),
+                    components.get("response_score", 0.0),
+                    components.get("semantic_score", 0.0),
+                    judge_score
+                ])
+                thresholds.append(evaluation.get("quality_threshold", RescoringService.DEFAULT_THRESHOLD))
+                targets.append((run["_id"], index))
+
+            if len(rows) >= batch_size:
+                await RescoringService._flush(engine, rows, thresholds, targets, summary)
+                rows, thresholds, targets = [], [], []
+
+        await RescoringService._flush(engine, rows, thresholds, targets, summary)
+
+        summary["weights"] = engine.weights
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+
+        return summary
+
+    @staticmethod
+    async def _flush(engine, rows, thresholds, targets, summary):
+
+        if not rows:
+            return
+
+        scores = engine.rescore_matrix(np.array(rows, dtype=np.float64))
+        should_iterate = scores < np.array(thresholds, dtype=np.float64)
+
+        # One $set per run, covering all of its iterations
+        updates = {}
+
+        for (run_id, index), score, iterate in zip(targets, scores.tolist(), should_iterate.tolist()):
+
+            prefix = f"iterations.{index}.evaluation"
+
+            updates.setdefault(run_id, {}).update({
+                f"{prefix}.final_score": score,
+                f"{prefix}.aggregation.final_composite_score": score,
+                f"{prefix}.should_iterate": iterate,
+                f"{prefix}.aggregation.weights": engine.weights
+            })
+
+        summary["runs_updated"] += await RunRepository.bulk_set_fields(updates)
+        summary["iterations_rescored"] += len(rows)
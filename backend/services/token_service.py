@@ -0,0 +1,78 @@
+import math
+from typing import Dict, Optional
+from logic_layer.evaluation.llm_judge import LLMJudge
+
+
+class TokenEstimator:
+    """
+    Pre-call token estimation.
+
+    Uses the model's own tokenizer when it is available locally
+    (e.g. HFLocalLLM). Remote models fall back to an approximation
+    based on character and word counts.
+    """
+
+    # Per-request chat formatting overhead (role markers, separators)
+    MESSAGE_OVERHEAD = 8
+
+    # Typical size of a judge verdict (scores + brief feedback)
+    JUDGE_COMPLETION_TOKENS = 150
+
+    def __init__(self, llm=None):
+        self.tokenizer = getattr(llm, "tokenizer", None)
+        self.exact = self.tokenizer is not None
+
+    # -------------------------------------------------
+    # Counting
+    # -------------------------------------------------
+    def count(self, text: str) -> int:
+
+        if not text:
+            return 0
+
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+        # ~4 characters per token for English; word count guards
+        # against short-word-heavy text being under-counted
+        return max(
+            math.ceil(len(text) / 4),
+            math.ceil(len(text.split()) * 1.3)
+        )
+
+    # -------------------------------------------------
+    # Call Estimates
+    # -------------------------------------------------
+    def estimate_call(self, prompt: str, completion_tokens: int) -> Dict:
+
+        prompt_tokens = self.count(prompt) + self.MESSAGE_OVERHEAD
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    def estimate_judge_call(self, prompt: str, response_tokens: int) -> Dict:
+
+        # The judge prompt embeds the evaluated prompt and response
+        template = LLMJudge(llm=None)._build_judge_prompt(prompt, "")
+
+        prompt_tokens = self.count(template) + response_tokens + self.MESSAGE_OVERHEAD
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.JUDGE_COMPLETION_TOKENS,
+            "total_tokens": prompt_tokens + self.JUDGE_COMPLETION_TOKENS
+        }
+
+    @staticmethod
+    def actual_or_estimate(llm_result: Dict, estimate: Dict) -> int:
+        """
+        Tokens to charge for a finished call. Some backends
+        (HFOnlineLLM) report None, in which case the estimate is used.
+        """
+
+        tokens_used: Optional[int] = llm_result.get("tokens_used")
+
+        return int(tokens_used) if tokens_used is not None else estimate["total_tokens"]
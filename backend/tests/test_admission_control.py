@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from services.admission_control import AdmissionController, AdmissionRejected
+
+
+async def fake_pipeline(controller, name, seconds, order, outcomes):
+    try:
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(seconds)
+        outcomes[name] = 200
+    except AdmissionRejected as exc:
+        outcomes[name] = (exc.status_code, exc.retry_after)
+
+
+async def fake_background(controller, name, seconds, order):
+    async with controller.background_slot():
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+async def run_admission_checks():
+
+    print("\n" + "=" * 100)
+    print("ADMISSION CONTROL")
+    print("=" * 100)
+
+    # -------------------------
+    # FIFO order, queue-full 429, deadline 503
+    # -------------------------
+    controller = AdmissionController(max_in_flight=2, max_queue=3, queue_timeout=0.25)
+    order, outcomes = [], {}
+
+    tasks = []
+    for i in range(7):
+        tasks.append(asyncio.create_task(fake_pipeline(controller, f"r{i}", 0.1, order, outcomes)))
+        await asyncio.sleep(0)  # arrive in order
+
+    await asyncio.sleep(0.01)
+    print("While saturated:", controller.metrics())
+
+    await asyncio.gather(*tasks)
+
+    print("Start order:", order)
+    print("Outcomes:", outcomes)
+
+    # r0, r1 run; r2-r4 queue; r5, r6 find the queue full
+    assert order == ["r0", "r1", "r2", "r3", "r4"]
+    assert outcomes["r5"][0] == 429 and outcomes["r6"][0] == 429
+    assert outcomes["r2"] == 200 and outcomes["r3"] == 200
+
+    # r4 waits ~0.2s (two service rounds) -> still admitted within 0.25s
+    assert outcomes["r4"] == 200
+
+    slow = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.05)
+    outcomes = {}
+    await asyncio.gather(
+        fake_pipeline(slow, "long", 0.2, [], outcomes),
+        fake_pipeline(slow, "late", 0.01, [], outcomes)
+    )
+    print("Deadline:", outcomes)
+    assert outcomes["late"][0] == 503
+
+    # -------------------------
+    # Cancelled waiter frees its place and leaks no slot
+    # -------------------------
+    controller = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=5)
+    outcomes = {}
+    holder = asyncio.create_task(fake_pipeline(controller, "holder", 0.05, [], outcomes))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(fake_pipeline(controller, "gone", 0.01, [], outcomes))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.gather(holder, waiter, return_exceptions=True)
+
+    metrics = controller.metrics()
+    print("After cancel:", metrics)
+    assert metrics["in_flight"] == 0 and metrics["queue_depth"] == 0
+
+    # -------------------------
+    # Background work shares the slots, behind queued requests,
+    # and never fills the request queue
+    # -------------------------
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+    order, outcomes = [], {}
+
+    tasks = [asyncio.create_task(fake_background(controller, f"b{i}", 0.02, order)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(fake_pipeline(controller, "request", 0.02, order, outcomes)))
+    await asyncio.sleep(0.01)
+
+    metrics = controller.metrics()
+    assert metrics["queue_depth"] == 1 and metrics["background_waiting"] == 2
+
+    await asyncio.gather(*tasks)
+
+    print("Background start order:", order)
+    assert order == ["b0", "request", "b1", "b2"] and outcomes["request"] == 200
+    assert controller.metrics()["in_flight"] == 0
+
+
+def run_admission_tests():
+    asyncio.run(run_admission_checks())
+
+
+if __name__ == "__main__":
+    run_admission_tests()
@@ -0,0 +1,330 @@
+import asyncio
+import copy
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from pymongo.errors import BulkWriteError
+
+from core.config import get_settings
+from db.mongo import mongo_manager
+from services import admission_control, batch_pipeline_service
+from services.admission_control import AdmissionController
+from services.batch_pipeline_service import BatchPipelineService
+from services.pipeline_service import PipelineService
+
+
+# ============================================================
+# In-memory stand-ins for Mongo and the pipeline stages
+# ============================================================
+
+class InMemoryUsage:
+    """
+    Just enough of the usage collection for UsageRepository. Each call
+    yields to the event loop first, so concurrent batches interleave
+    between round trips as they would against Mongo.
+    """
+
+    def __init__(self):
+        self.docs = {}
+
+    @staticmethod
+    def _key(query):
+        return query["user_id"], query["day"]
+
+    @staticmethod
+    def _apply(doc, update):
+        for field, value in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + value
+        for field, value in update.get("$set", {}).items():
+            doc[field] = value
+
+    async def find_one(self, query, projection=None):
+        await asyncio.sleep(0)
+        return copy.deepcopy(self.docs.get(self._key(query)))
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = self.docs.get(self._key(query))
+        if doc is None:
+            if not upsert:
+                return
+            doc = self.docs[self._key(query)] = {"user_id": query["user_id"], "day": query["day"]}
+            doc.update(update.get("$setOnInsert", {}))
+        self._apply(doc, update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        await asyncio.sleep(0)
+        doc = self.docs.get(self._key(query))
+        if doc is None or doc["tokens"] > query["tokens"]["$lte"]:
+            return None
+        self._apply(doc, update)
+        return copy.deepcopy(doc)
+
+
+class InMemoryRuns:
+    """
+    insert_many that can be told to reject some documents, the way
+    an unordered insert reports a partial failure.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.reject = 0
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(0)
+
+        rejected, self.reject = self.reject, 0
+        self.docs.extend(docs[rejected:])
+
+        if rejected:
+            raise BulkWriteError({
+                "nInserted": len(docs) - rejected,
+                "writeErrors": [{"index": i, "code": 2, "errmsg": "rejected"} for i in range(rejected)]
+            })
+
+        class Result:
+            inserted_ids = [doc["_id"] for doc in docs]
+
+        return Result()
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.usage = InMemoryUsage()
+        self.runs = InMemoryRuns()
+
+
+class Gauge:
+    """
+    Peak number of threads inside a block at once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+
+
+class FakeLLMService:
+    """
+    10 tokens per call; prompts containing "fail" raise. Records the
+    user's reserved tokens and the max_tokens of each call.
+    """
+
+    calls = Gauge()
+    reserved_seen = []
+    max_tokens_seen = {}
+
+    def __init__(self):
+        self.llm = None
+
+    def generate(self, prompt, max_tokens=None, stop=None):
+        FakeLLMService.reserved_seen.append(sum(d["tokens"] for d in mongo_manager.db.usage.docs.values()))
+        FakeLLMService.max_tokens_seen[prompt] = max_tokens
+        with FakeLLMService.calls:
+            time.sleep(0.01)
+            if "fail" in prompt:
+                raise RuntimeError("upstream timeout")
+            return {"output": f"answer: {prompt}", "latency": 0.01, "tokens_used": 10}
+
+
+class FakeRefiner:
+
+    def refine(self, prompt):
+        if prompt == "boom":
+            raise ValueError("cannot parse prompt")
+        return f"{prompt}, improved", {"task_type": "explanation"}
+
+    def refine_many(self, prompts):
+        return [self.refine(prompt) for prompt in prompts]
+
+
+class FakeEvaluator:
+    """
+    Evaluation "judges" for 10ms; tracks how many run at once.
+    """
+
+    calls = Gauge()
+    embedded = []
+
+    def __init__(self, enable_judge=True, **kwargs):
+        self.enable_judge = enable_judge
+
+    def embed_many(self, records):
+        FakeEvaluator.embedded.append(len(records))
+        return {}
+
+    def evaluate(self, embeddings=None, **record):
+        with FakeEvaluator.calls:
+            time.sleep(0.01)
+        return {
+            "final_score": 0.7,
+            "should_iterate": False,
+            "metrics": {"judge_metrics": {"enabled": self.enable_judge}}
+        }
+
+
+def fixed_estimates(estimator, planner, prompt, optimized_prompt, metadata, output_budget):
+    # 40 tokens for the two target calls, 60 with the judge
+    return {
+        "original": {"total_tokens": 20, "completion_tokens": 12},
+        "optimized": {"total_tokens": 20, "completion_tokens": 12},
+        "judge": {"total_tokens": 20}
+    }
+
+
+async def collect(prompts, user_id, concurrency=None):
+    return [line async for line in BatchPipelineService.stream(prompts, user_id, concurrency)]
+
+
+def usage(db, user_id):
+    docs = [d for d in db.usage.docs.values() if d["user_id"] == user_id]
+    return sum(d["tokens"] for d in docs), sum(d["requests"] for d in docs)
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def run_batch_checks():
+
+    print("\n" + "=" * 100)
+    print("BATCH PIPELINE")
+    print("=" * 100)
+
+    db = mongo_manager.db = InMemoryDB()
+    settings = get_settings()
+
+    batch_pipeline_service.LLMService = FakeLLMService
+    batch_pipeline_service.SinglePassRefiner = FakeRefiner
+    batch_pipeline_service.Evaluator = FakeEvaluator
+    PipelineService._estimate = staticmethod(fixed_estimates)
+
+    # -------------------------
+    # Item lines, judge downgrade, budget rejection, summary
+    # -------------------------
+    # p0 and p1 reserve 60 each, p2 only fits without the judge, the
+    # rest are rejected; p1 then fails at the LLM and is released
+    settings.daily_token_budget = 160
+
+    lines = await collect(["p0", "p1 fail", "p2", "p3", "boom", "p5"], "user-1")
+
+    items = {line["index"]: line for line in lines if line["type"] == "item"}
+    summary = lines[-1]
+
+    assert items[0]["status"] == "ok" and items[0]["evaluation"]["metrics"]["judge_metrics"]["enabled"]
+    assert items[2]["status"] == "ok" and not items[2]["evaluation"]["metrics"]["judge_metrics"]["enabled"]
+    assert items[1]["error"] == "RuntimeError: upstream timeout"
+    assert items[4]["error"] == "ValueError: cannot parse prompt"
+    assert items[3]["error"].startswith("Daily token budget exceeded")
+    assert items[5]["error"].startswith("Daily token budget exceeded")
+
+    assert summary == {
+        "type": "summary", "total": 6, "succeeded": 2, "failed": 4,
+        "tokens_charged": 40, "persisted": 2
+    }
+    assert {str(run["_id"]) for run in db.runs.docs} == {items[0]["run_id"], items[2]["run_id"]}
+
+    # Only the two finished items stay charged, at their actual usage
+    assert usage(db, "user-1") == (40, 2)
+
+    # The original prompt is capped at the completion budget it was estimated with
+    assert FakeLLMService.max_tokens_seen["p0"] == 12
+    print("Summary:", summary)
+
+    # -------------------------
+    # Concurrent batches share one atomic budget
+    # -------------------------
+    settings.daily_token_budget = 120
+
+    results = await asyncio.gather(
+        collect(["a0", "a1"], "user-2"),
+        collect(["b0", "b1"], "user-2")
+    )
+
+    succeeded = sum(lines[-1]["succeeded"] for lines in results)
+    assert succeeded == 2 and usage(db, "user-2") == (40, 2)
+    print("Two concurrent batches against a 120-token budget:", succeeded, "items admitted")
+
+    # -------------------------
+    # Judging runs in parallel within a chunk, one embedding call each
+    # -------------------------
+    settings.daily_token_budget = 100_000
+    FakeEvaluator.embedded.clear()
+
+    await collect([f"j{i}" for i in range(4)], "user-3")
+
+    assert FakeEvaluator.embedded == [4] and FakeEvaluator.calls.peak == 4
+    print("Peak concurrent evaluations in one chunk:", FakeEvaluator.calls.peak)
+
+    # -------------------------
+    # Generation and judging hold the worker's admission slots
+    # -------------------------
+    admission_control._optimize_admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+    FakeLLMService.calls.peak = FakeEvaluator.calls.peak = 0
+
+    await asyncio.gather(
+        collect([f"c{i}" for i in range(4)], "user-3"),
+        collect([f"d{i}" for i in range(4)], "user-3")
+    )
+
+    # One item (its original + optimized calls) or one evaluation at a
+    # time across both batches
+    assert FakeLLMService.calls.peak == 2 and FakeEvaluator.calls.peak == 1
+    assert admission_control._optimize_admission.metrics()["background_admitted"] == 16
+    print("Peak concurrent LLM calls with one admission slot:", FakeLLMService.calls.peak)
+
+    admission_control._optimize_admission = None
+
+    # -------------------------
+    # Budget is reserved as items start, not all upfront
+    # -------------------------
+    db.usage.docs.clear()
+    FakeLLMService.reserved_seen.clear()
+    settings.batch_eval_chunk = 2
+
+    await collect([f"r{i}" for i in range(6)], "user-5", concurrency=1)
+
+    settings.batch_eval_chunk = 16
+
+    # Upfront reservation would hold 6 x 60 = 360 before the first
+    # call. Here it peaks at 2 settled items (20 each), a chunk of 2
+    # being evaluated and 1 item generating (60 each)
+    assert FakeLLMService.reserved_seen[0] == 60 and max(FakeLLMService.reserved_seen) <= 220
+    print("Reserved tokens seen at each LLM call:", FakeLLMService.reserved_seen[::2])
+
+    # -------------------------
+    # A run that is not stored is neither returned nor charged
+    # -------------------------
+    db.runs.reject = 1
+
+    lines = await collect(["e0", "e1", "e2"], "user-4")
+    summary = lines[-1]
+
+    assert summary["succeeded"] == 2 and summary["persisted"] == 2 and summary["failed"] == 1
+    assert [line["error"] for line in lines if line.get("status") == "error"] == ["Run not saved: rejected"]
+    assert usage(db, "user-4") == (40, 2)
+    print("Partial insert:", {k: summary[k] for k in ["succeeded", "failed", "persisted", "tokens_charged"]})
+
+
+def run_batch_pipeline_tests():
+    asyncio.run(run_batch_checks())
+
+
+if __name__ == "__main__":
+    run_batch_pipeline_tests()
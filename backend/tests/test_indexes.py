@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from pymongo.errors import OperationFailure
+
+from core.config import get_settings
+from db.mongo import INDEX_SPECS, ensure_indexes, mongo_manager
+
+
+# ============================================================
+# In-memory stand-in for index management
+# ============================================================
+
+class InMemoryCollection:
+    """
+    create_index behaves like the server: a no-op for an identical
+    index, IndexOptionsConflict (85) for the same name with other
+    options.
+    """
+
+    def __init__(self):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    async def create_index(self, keys, name, **options):
+        await asyncio.sleep(0)
+
+        info = {"key": list(keys), **options}
+
+        if name in self.indexes and self.indexes[name] != info:
+            raise OperationFailure(f"An existing index has the same name as the requested index: {name}", code=85)
+
+        self.indexes[name] = info
+
+    async def index_information(self):
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+
+class InMemoryDB:
+
+    def __init__(self):
+        self.collections = {}
+        self.commands = []
+        self.fail_commands = False
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, InMemoryCollection())
+
+    async def command(self, name, collection, index=None):
+        self.commands.append((name, collection, index))
+
+        if self.fail_commands:
+            raise OperationFailure("not authorized on srpp_db to execute command { collMod }", code=13)
+
+        info = self.collections[collection].indexes[index["name"]]
+        info["expireAfterSeconds"] = index["expireAfterSeconds"]
+
+
+def ttl_indexes(db):
+    return {
+        (c, spec["name"]): db[c].indexes[spec["name"]]["expireAfterSeconds"]
+        for c, specs in INDEX_SPECS.items()
+        for spec in specs if "ttl_setting" in spec
+    }
+
+
+def all_ok(report):
+    return all(status == "ok" for indexes in report.values() for status in indexes.values())
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def run_index_checks():
+
+    print("\n" + "=" * 100)
+    print("ENSURE INDEXES: TTL CHANGES")
+    print("=" * 100)
+
+    db = mongo_manager.db = InMemoryDB()
+    settings = get_settings()
+    retention = settings.job_retention_seconds
+
+    try:
+        # -------------------------
+        # Fresh deployment
+        # -------------------------
+        assert all_ok(await ensure_indexes()) and not db.commands
+        assert set(ttl_indexes(db).values()) == {retention}
+
+        # -------------------------
+        # Retention changed: collMod in place, then verified
+        # -------------------------
+        settings.job_retention_seconds = retention * 2
+
+        report = await ensure_indexes()
+
+        assert all_ok(report)
+        assert set(ttl_indexes(db).values()) == {retention * 2}
+        assert sorted((c, index["name"]) for _, c, index in db.commands) == [
+            ("jobs", "finished_at_ttl"), ("usage_charges", "created_at_ttl")
+        ]
+        print("collMod sent:", [(c, index) for _, c, index in db.commands])
+
+        # Unchanged on the next start
+        db.commands.clear()
+        assert all_ok(await ensure_indexes()) and not db.commands
+
+        # -------------------------
+        # collMod refused: reported, startup continues
+        # -------------------------
+        settings.job_retention_seconds = retention
+        db.fail_commands = True
+
+        report = await ensure_indexes()
+
+        assert report["jobs"]["finished_at_ttl"].startswith("error: not authorized")
+        assert report["jobs"]["status_created_at"] == "ok"
+        print("collMod refused:", report["jobs"]["finished_at_ttl"])
+
+        # -------------------------
+        # Options are part of verification
+        # -------------------------
+        db.fail_commands = False
+        db["jobs"].indexes["finished_at_ttl"].pop("expireAfterSeconds")
+
+        async def accept(keys, name, **options):
+            pass
+
+        # A server that accepts the call but keeps the old index
+        db["jobs"].create_index = accept
+
+        report = await ensure_indexes()
+
+        assert report["jobs"]["finished_at_ttl"] == "missing"
+        print("Index without its TTL:", report["jobs"]["finished_at_ttl"])
+
+        # Other option conflicts are still reported as errors
+        db["users"].indexes["email_unique"]["unique"] = False
+        report = await ensure_indexes()
+
+        assert report["users"]["email_unique"].startswith("error: An existing index")
+    finally:
+        settings.job_retention_seconds = retention
+
+
+def run_index_tests():
+    asyncio.run(run_index_checks())
+
+
+if __name__ == "__main__":
+    run_index_tests()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from core.config import get_settings
+from services import job_queue
+from services.job_queue import InMemoryJobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+async def run_job_queue_checks():
+
+    print("\n" + "=" * 100)
+    print("JOB QUEUE (in-process backend)")
+    print("=" * 100)
+
+    queue = InMemoryJobQueue(lease_seconds=0.05, max_attempts=2)
+
+    # -------------------------
+    # FIFO claim, progress, completion
+    # -------------------------
+    first = await queue.enqueue("user-1", {"prompt": "first"})
+    second = await queue.enqueue("user-1", {"prompt": "second"})
+
+    job = await queue.claim("w1")
+    assert job["_id"] == first and job["status"] == RUNNING and job["attempts"] == 1
+
+    await queue.progress(first, "w1", "refined", {"optimized_prompt": "First, improved"})
+    await queue.progress(first, "w2", "generated", {"optimized_response": "not the owner"})
+
+    state = await queue.get(first, "user-1")
+    assert state["stage"] == "refined" and "optimized_response" not in state["partial"]
+
+    await queue.complete(first, "w1", {"final_score": 0.8})
+    state = await queue.get(first, "user-1")
+    assert state["status"] == SUCCEEDED and state["result"] == {"final_score": 0.8}
+    print("Completed:", {k: state[k] for k in ["status", "stage", "partial", "result", "attempts"]})
+
+    # Other users cannot see the job
+    assert await queue.get(first, "user-2") is None
+
+    # -------------------------
+    # Lease expiry -> re-run, then give up after max_attempts
+    # -------------------------
+    job = await queue.claim("w1")
+    assert job["_id"] == second
+
+    await asyncio.sleep(0.06)  # w1 "crashed": lease lapses
+
+    job = await queue.claim("w2")
+    assert job["_id"] == second and job["attempts"] == 2
+
+    # The crashed worker can no longer finish it
+    await queue.complete(second, "w1", {"final_score": 0.1})
+    assert (await queue.get(second, "user-1"))["status"] == RUNNING
+
+    await asyncio.sleep(0.06)
+    assert await queue.claim("w3") is None
+
+    state = await queue.get(second, "user-1")
+    assert state["status"] == FAILED
+    print("Lease expired twice:", {k: state[k] for k in ["status", "error", "attempts"]})
+
+    # -------------------------
+    # Retryable failure goes back to the queue
+    # -------------------------
+    third = await queue.enqueue("user-1", {"prompt": "third"})
+    await queue.claim("w1")
+    await queue.fail(third, "w1", "RuntimeError: upstream timeout", retry=True)
+
+    state = await queue.get(third, "user-1")
+    assert state["status"] == QUEUED and state["error"].startswith("RuntimeError")
+
+    # Idle workers wake as soon as work arrives
+    waiter = asyncio.create_task(InMemoryJobQueue().wait_for_work(5))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    waiter.cancel()
+
+    print("Retry re-queued:", {k: state[k] for k in ["status", "error", "attempts"]})
+
+    # -------------------------
+    # Finished jobs are evicted after the retention period
+    # -------------------------
+    queue = InMemoryJobQueue(lease_seconds=60, retention_seconds=0.05)
+
+    done = await queue.enqueue("user-1", {"prompt": "done"})
+    await queue.claim("w1")
+    await queue.complete(done, "w1", {"final_score": 0.5})
+
+    running = await queue.enqueue("user-1", {"prompt": "running"})
+    await queue.claim("w1")
+
+    assert (await queue.get(done, "user-1"))["finished_at"] is not None
+    assert list(queue._running) == [running]
+
+    await asyncio.sleep(0.06)
+    await queue.enqueue("user-1", {"prompt": "later"})
+
+    assert await queue.get(done, "user-1") is None
+    assert (await queue.get(running, "user-1"))["status"] == RUNNING
+    print("Retained jobs after eviction:", len(queue._jobs))
+
+    # -------------------------
+    # The per-process backend is refused with several web workers
+    # -------------------------
+    settings = get_settings()
+    settings.job_queue_backend = "memory"
+    os.environ["WEB_CONCURRENCY"] = "4"
+    job_queue._job_queue = None
+
+    try:
+        job_queue.get_job_queue()
+        raise AssertionError("expected ValueError")
+    except ValueError as exc:
+        print("Refused:", exc)
+    finally:
+        del os.environ["WEB_CONCURRENCY"]
+
+    assert isinstance(job_queue.get_job_queue(), InMemoryJobQueue)
+    job_queue._job_queue = None
+
+
+def run_job_queue_tests():
+    asyncio.run(run_job_queue_checks())
+
+
+if __name__ == "__main__":
+    run_job_queue_tests()
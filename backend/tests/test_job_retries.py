@@ -0,0 +1,233 @@
+import asyncio
+import copy
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from pymongo.errors import DuplicateKeyError
+
+from db.mongo import mongo_manager
+from logic_layer.controller.output_budget import OutputBudgetPlanner
+from db.repositories.usage_repository import UsageRepository
+from services import pipeline_service
+from services.job_queue import InMemoryJobQueue, QUEUED, SUCCEEDED
+from services.job_worker import JobWorkerPool
+from services.pipeline_service import PipelineService
+
+
+# ============================================================
+# In-memory stand-ins for the collections and the pipeline stages
+# ============================================================
+
+class InMemoryCollection:
+    """
+    Just enough of a Motor collection for UsageRepository and
+    RunRepository. Each call yields to the event loop first, so
+    concurrent attempts interleave between round trips.
+    """
+
+    def __init__(self, key_fields=("_id",)):
+        self.key_fields = key_fields
+        self.docs = {}
+
+    def _key(self, query):
+        return tuple(query[f] for f in self.key_fields)
+
+    def _match(self, query):
+        doc = self.docs.get(self._key(query))
+        if doc is None:
+            return None
+        for field, value in query.items():
+            if isinstance(value, dict):
+                if "$lte" in value and not doc.get(field, 0) <= value["$lte"]:
+                    return None
+            elif doc.get(field) != value:
+                return None
+        return doc
+
+    @staticmethod
+    def _apply(doc, update):
+        for field, value in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + value
+        for field, value in update.get("$set", {}).items():
+            doc[field] = value
+
+    async def find_one(self, query, projection=None):
+        await asyncio.sleep(0)
+        return copy.deepcopy(self._match(query))
+
+    async def insert_one(self, doc):
+        await asyncio.sleep(0)
+        if self._key(doc) in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[self._key(doc)] = copy.deepcopy(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = self._match(query)
+        if doc is None:
+            if not upsert:
+                return
+            doc = self.docs[self._key(query)] = dict(query)
+            doc.update(update.get("$setOnInsert", {}))
+        self._apply(doc, update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        await asyncio.sleep(0)
+        doc = self._match(query)
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        self._apply(doc, update)
+        return copy.deepcopy(doc) if return_document else before
+
+    async def delete_one(self, query):
+        await asyncio.sleep(0)
+        doc = self._match(query)
+        if doc is not None:
+            del self.docs[self._key(query)]
+
+        class Result:
+            deleted_count = int(doc is not None)
+
+        return Result()
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.usage = InMemoryCollection(("user_id", "day"))
+        self.usage_charges = InMemoryCollection()
+        self.runs = InMemoryCollection()
+
+
+class FakeLLMService:
+    """
+    Counts generate() calls; the next `failures` calls raise.
+    """
+
+    calls = 0
+    failures = 0
+    max_tokens_seen = {}
+
+    def __init__(self):
+        self.llm = None
+
+    def generate(self, prompt, max_tokens=None, stop=None):
+        FakeLLMService.calls += 1
+        FakeLLMService.max_tokens_seen[prompt] = max_tokens
+        if FakeLLMService.failures > 0:
+            FakeLLMService.failures -= 1
+            raise RuntimeError("upstream timeout")
+        return {"output": f"answer: {prompt}", "latency": 0.01, "tokens_used": 25}
+
+
+class FakeRefiner:
+    def refine(self, prompt):
+        return f"{prompt} Answer in 50-80 words.", {"task_type": "explanation"}
+
+
+class FakeEvaluator:
+    def __init__(self, **kwargs):
+        pass
+
+    def evaluate(self, **kwargs):
+        return {"final_score": 0.8, "should_iterate": False, "metrics": {"judge_metrics": {}}}
+
+
+def usage_state(db, user_id):
+    docs = [d for d in db.usage.docs.values() if d["user_id"] == user_id]
+    return sum(d["tokens"] for d in docs), sum(d["requests"] for d in docs)
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def run_job_retry_checks():
+
+    print("\n" + "=" * 100)
+    print("JOB RETRIES: ONE CHARGE, ONE RUN")
+    print("=" * 100)
+
+    db = mongo_manager.db = InMemoryDB()
+
+    pipeline_service.LLMService = FakeLLMService
+    pipeline_service.SinglePassRefiner = FakeRefiner
+    pipeline_service.Evaluator = FakeEvaluator
+
+    # -------------------------
+    # Failed attempt releases its reservation, the retry charges once
+    # -------------------------
+    queue = InMemoryJobQueue(lease_seconds=60, max_attempts=3)
+    pool = JobWorkerPool(queue)
+
+    job_id = await queue.enqueue("user-1", {"prompt": "Explain caching"})
+
+    FakeLLMService.failures = 1
+    await pool._run_job(await queue.claim("w1"), "w1")
+
+    assert (await queue.get(job_id, "user-1"))["status"] == QUEUED
+    assert usage_state(db, "user-1") == (0, 0) and not db.usage_charges.docs
+
+    await pool._run_job(await queue.claim("w1"), "w1")
+
+    job = await queue.get(job_id, "user-1")
+    assert job["status"] == SUCCEEDED and len(db.runs.docs) == 1
+    assert usage_state(db, "user-1") == (50, 1)
+    print("Failed then retried:", {"runs": len(db.runs.docs), "tokens, requests": usage_state(db, "user-1")})
+
+    # -------------------------
+    # Re-leased after the run was saved: returns the saved run
+    # -------------------------
+    calls = FakeLLMService.calls
+    result = await PipelineService.run_pipeline("Explain caching", "user-1", job_id=job_id)
+
+    assert result["_id"] == job["result"]["run_id"]
+    assert FakeLLMService.calls == calls and usage_state(db, "user-1") == (50, 1)
+
+    # -------------------------
+    # Crash between charging and saving: re-run, not re-charged
+    # -------------------------
+    db.runs.docs.clear()
+    await PipelineService.run_pipeline("Explain caching", "user-1", job_id=job_id)
+
+    assert len(db.runs.docs) == 1 and usage_state(db, "user-1") == (50, 1)
+    print("Re-leased twice:", {"runs": len(db.runs.docs), "tokens, requests": usage_state(db, "user-1")})
+
+    # -------------------------
+    # Two attempts of one job running at once (lease lapsed mid-run)
+    # -------------------------
+    results = await asyncio.gather(*[
+        PipelineService.run_pipeline("Compare queues", "user-2", job_id="job-2")
+        for _ in range(2)
+    ])
+
+    assert results[0]["_id"] == results[1]["_id"] and len(db.runs.docs) == 2
+    assert usage_state(db, "user-2") == (50, 1)
+    print("Concurrent attempts:", {"runs": 1, "tokens, requests": usage_state(db, "user-2")})
+
+    # -------------------------
+    # Without a job id every call is its own charge
+    # -------------------------
+    await PipelineService.run_pipeline("Explain caching", "user-3")
+    await PipelineService.run_pipeline("Explain caching", "user-3")
+
+    assert usage_state(db, "user-3") == (100, 2) and len(db.runs.docs) == 4
+
+    # Both target calls are capped at the budget they were estimated with
+    budget = OutputBudgetPlanner().plan("Explain caching", {"task_type": "explanation"})["max_tokens"]
+    assert FakeLLMService.max_tokens_seen["Explain caching"] == budget
+    assert FakeLLMService.max_tokens_seen["Explain caching Answer in 50-80 words."] is not None
+
+    reservation = await UsageRepository.reserve("user-3", 10, budget=1_000)
+    assert "charge_id" not in reservation
+
+
+def run_job_retry_tests():
+    asyncio.run(run_job_retry_checks())
+
+
+if __name__ == "__main__":
+    run_job_retry_tests()
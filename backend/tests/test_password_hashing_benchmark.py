@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from utils.auth_utils import hash_password, verify_password, verify_password_async
+
+
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, samples: list):
+    """
+    Stand-in for in-flight /optimize requests: wakes every 5 ms and
+    records how late the event loop let it run.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    while not stop.is_set():
+        expected = loop.time() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def login_storm(verify, hashed: str, logins: int) -> dict:
+
+    stop = asyncio.Event()
+    samples = []
+
+    ticker = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[verify("correct horse battery staple", hashed) for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+
+    samples.sort()
+
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": samples[len(samples) // 2] * 1000 if samples else 0.0,
+        "lag_p99_ms": samples[int(len(samples) * 0.99)] * 1000 if samples else 0.0,
+        "lag_max_ms": samples[-1] * 1000 if samples else 0.0,
+        "ticks": len(samples)
+    }
+
+
+async def verify_inline(password, hashed):
+    # Previous behaviour: bcrypt directly inside the async handler
+    return verify_password(password, hashed)
+
+
+def run_password_hashing_benchmark():
+
+    hashed = hash_password("correct horse battery staple")
+
+    print("\n" + "=" * 100)
+    print("EVENT-LOOP LAG DURING A CONCURRENT LOGIN STORM")
+    print("=" * 100)
+
+    for logins in [8, 32]:
+
+        inline = asyncio.run(login_storm(verify_inline, hashed, logins))
+        offloaded = asyncio.run(login_storm(verify_password_async, hashed, logins))
+
+        print(f"\n{logins} concurrent logins")
+        for name, result in [("inline", inline), ("executor", offloaded)]:
+            print(
+                f"  {name:<9} total {result['elapsed_s']:6.2f} s | "
+                f"loop lag p50 {result['lag_p50_ms']:8.2f} ms  "
+                f"p99 {result['lag_p99_ms']:8.2f} ms  max {result['lag_max_ms']:8.2f} ms "
+                f"({result['ticks']} ticks)"
+            )
+
+
+if __name__ == "__main__":
+    run_password_hashing_benchmark()
@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import os
+import random
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+import numpy as np
+
+from db.mongo import mongo_manager
+from logic_layer.evaluation.metrics.aggregation import AggregationEngine
+from services.rescoring_service import RescoringService
+
+
+WEIGHTS = {"prompt": 0.1, "primitive": 0.1, "response": 0.3, "semantic": 0.2, "judge": 0.3}
+
+
+# ============================================================
+# Component rows and the metric bundles that produce them
+# ============================================================
+
+def random_row(rng):
+    """
+    Component scores; roughly a third of the rows have no verdict.
+    """
+
+    judge = None if rng.random() < 0.35 else round(rng.random(), 1)
+    return [round(rng.random(), 4) for _ in range(4)] + [judge]
+
+
+def bundle_for(row):
+    """
+    A metrics bundle for which compute_final_score yields exactly
+    these component scores.
+    """
+
+    prompt, primitive, response, semantic, judge = row
+
+    return {
+        "prompt_metrics": {"structural_metrics": {"structural_change_score": prompt}},
+        "primitive_metrics": {"diversity_metrics": {"diversity_score": primitive}},
+        "response_metrics": {"relevance_metrics": {"keyword_overlap_score": response * 2}},
+        "semantic_metrics": {"prompt_semantic_similarity": semantic, "prompt_response_alignment": semantic},
+        "judge_metrics": {} if judge is None else {"overall_quality": judge * 10}
+    }
+
+
+# ============================================================
+# In-memory stand-in for the runs collection
+# ============================================================
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            await asyncio.sleep(0)
+            yield copy.deepcopy(doc)
+
+
+class InMemoryRuns:
+    """
+    find() and bulk_write() of UpdateOne($set) with dotted paths.
+    """
+
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.bulk_writes = 0
+
+    def find(self, query, projection=None, batch_size=None):
+        return Cursor(list(self.docs.values()))
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+
+        for op in operations:
+            doc = self.docs[op._filter["_id"]]
+            for path, value in op._doc["$set"].items():
+                *parents, leaf = path.split(".")
+                target = doc
+                for key in parents:
+                    target = target[int(key)] if isinstance(target, list) else target[key]
+                target[leaf] = value
+
+        class Result:
+            modified_count = len(operations)
+
+        return Result()
+
+
+class InMemoryDB:
+    def __init__(self, runs):
+        self.runs = InMemoryRuns(runs)
+
+
+def stored_run(run_id, rows, engine, rng):
+
+    iterations = []
+
+    for row in rows:
+        result = engine.compute_final_score(bundle_for(row))
+        iterations.append({
+            "evaluation": {
+                "final_score": result["final_composite_score"],
+                "quality_threshold": rng.choice([0.5, 0.65]),
+                "aggregation": result
+            }
+        })
+
+    return {"_id": run_id, "iterations": iterations}
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+def run_matrix_parity(rows):
+
+    print("\n" + "=" * 100)
+    print("RESCORING: MATRIX vs compute_final_score")
+    print("=" * 100)
+
+    for weights in [AggregationEngine.DEFAULT_WEIGHTS, WEIGHTS]:
+
+        engine = AggregationEngine(weights=dict(weights))
+
+        expected = [engine.compute_final_score(bundle_for(row))["final_composite_score"] for row in rows]
+
+        matrix = np.array([row[:4] + [np.nan if row[4] is None else row[4]] for row in rows])
+        scores = engine.rescore_matrix(matrix)
+
+        # Both round to 4 places; float noise may flip the last digit
+        diffs = np.abs(scores - np.array(expected))
+        assert diffs.max() <= 1e-4 + 1e-12, diffs.max()
+
+        missing = [i for i, row in enumerate(rows) if row[4] is None]
+        print(
+            f"{len(rows)} rows ({len(missing)} judge-missing) | "
+            f"exact: {int((diffs < 1e-12).sum())} | max diff: {diffs.max():.1e}"
+        )
+
+
+async def run_service_parity(rows, rng):
+
+    print("\n" + "=" * 100)
+    print("RESCORING SERVICE: STORED RUNS RE-WEIGHTED")
+    print("=" * 100)
+
+    engine = AggregationEngine(weights=dict(AggregationEngine.DEFAULT_WEIGHTS))
+    target = AggregationEngine(weights=dict(WEIGHTS))
+
+    runs = [stored_run(i, rows[i * 4:(i + 1) * 4], engine, rng) for i in range(len(rows) // 4)]
+    db = mongo_manager.db = InMemoryDB(runs)
+
+    # Small batches so several flushes happen
+    summary = await RescoringService.rescore_all(WEIGHTS, batch_size=64)
+
+    assert summary["iterations_rescored"] == len(runs) * 4
+    assert summary["runs_updated"] == len(runs) and db.runs.bulk_writes > 1
+
+    for run_id, run in db.runs.docs.items():
+        for row, iteration in zip(rows[run_id * 4:(run_id + 1) * 4], run["iterations"]):
+
+            evaluation = iteration["evaluation"]
+            expected = target.compute_final_score(bundle_for(row))["final_composite_score"]
+
+            assert abs(evaluation["final_score"] - expected) <= 1e-4 + 1e-12
+            assert evaluation["aggregation"]["final_composite_score"] == evaluation["final_score"]
+            assert evaluation["should_iterate"] == (evaluation["final_score"] < evaluation["quality_threshold"])
+            assert evaluation["aggregation"]["weights"] == WEIGHTS
+
+    print({k: summary[k] for k in ["iterations_rescored", "runs_updated"]}, "| bulk writes:", db.runs.bulk_writes)
+
+
+def run_rescoring_tests():
+
+    rng = random.Random(7)
+    rows = [random_row(rng) for _ in range(2_000)]
+
+    run_matrix_parity(rows)
+    asyncio.run(run_service_parity(rows[:400], rng))
+
+
+if __name__ == "__main__":
+    run_rescoring_tests()
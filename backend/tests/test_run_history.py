@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import os
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from db.mongo import mongo_manager
+from db.repositories.run_repository import RunRepository
+
+
+# ============================================================
+# In-memory stand-in for the runs collection
+# ============================================================
+
+def matches(doc, query):
+    """
+    The subset of Mongo queries list_runs sends: equality, $lt and $or.
+    """
+
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not doc[field] < condition["$lt"]:
+                return False
+        elif doc[field] != condition:
+            return False
+
+    return True
+
+
+class Cursor:
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(0)
+        return self.docs[:length]
+
+
+class InMemoryRuns:
+
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query, projection=None):
+
+        # Summary projection: only the fields list_runs returns
+        return Cursor([
+            {
+                "_id": doc["_id"],
+                "created_at": doc["created_at"],
+                "model_used": doc["model_used"],
+                "prompt_preview": doc["original_prompt"][:RunRepository.PROMPT_PREVIEW_CHARS],
+                "final_score": doc["iterations"][-1]["evaluation"]["final_score"]
+            }
+            for doc in self.docs if matches(doc, query)
+        ])
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.runs = InMemoryRuns()
+
+
+def add_run(db, user_id, created_at):
+
+    doc = {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "created_at": created_at,
+        "model_used": "groq",
+        "original_prompt": "Explain caching " * 30,
+        "iterations": [{"evaluation": {"final_score": 0.7}}]
+    }
+    db.runs.docs.append(doc)
+
+    return doc
+
+
+async def all_pages(user_id, limit, between_pages=None):
+
+    runs, cursor, pages = [], None, 0
+
+    while True:
+        page = await RunRepository.list_runs(user_id, limit=limit, cursor=cursor)
+        runs.extend(page["runs"])
+        pages += 1
+
+        assert len(page["runs"]) <= limit
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return runs, pages
+
+        if between_pages:
+            between_pages()
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def run_history_checks():
+
+    print("\n" + "=" * 100)
+    print("RUN HISTORY: KEYSET PAGINATION")
+    print("=" * 100)
+
+    db = mongo_manager.db = InMemoryDB()
+
+    # 30 runs in groups of 4 sharing a created_at (same millisecond),
+    # interleaved with another user's runs
+    base = datetime(2026, 10, 1, 12, 0, 0, 123000)
+    for i in range(30):
+        created_at = base + timedelta(seconds=i // 4)
+        add_run(db, "user-1", created_at)
+        add_run(db, "user-2", created_at)
+
+    expected = sorted(
+        (doc for doc in db.runs.docs if doc["user_id"] == "user-1"),
+        key=lambda doc: (doc["created_at"], doc["_id"]),
+        reverse=True
+    )
+
+    # -------------------------
+    # Ties on created_at: no row skipped or repeated at any page size
+    # -------------------------
+    for limit in [1, 3, 4, 7, 30, 50]:
+
+        runs, pages = await all_pages("user-1", limit)
+
+        assert [run["_id"] for run in runs] == [str(doc["_id"]) for doc in expected], limit
+        # The extra row fetched per page means no trailing empty page
+        assert pages == -(-30 // limit), (limit, pages)
+
+    print("Pages of 1, 3, 4, 7, 30 and 50 each return all 30 runs in (created_at, _id) order")
+
+    # Summary rows only
+    assert set(runs[0]) == {"_id", "created_at", "model_used", "prompt_preview", "final_score"}
+    assert len(runs[0]["prompt_preview"]) == RunRepository.PROMPT_PREVIEW_CHARS
+
+    # -------------------------
+    # Runs inserted while paging do not shift later pages
+    # -------------------------
+    newest = base + timedelta(hours=1)
+
+    runs, _ = await all_pages("user-1", 4, between_pages=lambda: add_run(db, "user-1", newest))
+
+    assert [run["_id"] for run in runs] == [str(doc["_id"]) for doc in expected]
+    print("Stable under concurrent inserts:", len(runs), "runs,", len(db.runs.docs) - 60, "inserted meanwhile")
+
+    # -------------------------
+    # Cursor encoding
+    # -------------------------
+    run_id = ObjectId()
+    cursor = RunRepository.encode_cursor(base, run_id)
+
+    assert RunRepository.decode_cursor(cursor) == (base, run_id)
+    assert "/" not in cursor and "+" not in cursor
+
+    malformed = [
+        "not-a-cursor",
+        base64.urlsafe_b64encode(b"2026-10-01T12:00:00").decode(),
+        base64.urlsafe_b64encode(f"yesterday|{run_id}".encode()).decode(),
+        base64.urlsafe_b64encode(f"{base.isoformat()}|not-an-id".encode()).decode(),
+        base64.urlsafe_b64encode(f"{base.isoformat()}|{run_id}|extra".encode()).decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        cursor[:-4]
+    ]
+
+    for bad in malformed:
+        try:
+            RunRepository.decode_cursor(bad)
+            raise AssertionError(f"accepted {bad!r}")
+        except ValueError as e:
+            assert str(e) == "Invalid cursor"
+
+    # The endpoint turns a bad cursor into a 400
+    from api.optimize import list_runs
+
+    try:
+        await list_runs(limit=10, cursor="not-a-cursor", current_user={"_id": "user-1"})
+        raise AssertionError("bad cursor accepted")
+    except HTTPException as e:
+        assert e.status_code == 400 and e.detail == "Invalid cursor"
+
+    print("Malformed cursors rejected:", len(malformed))
+
+
+def run_history_tests():
+    asyncio.run(run_history_checks())
+
+
+if __name__ == "__main__":
+    run_history_tests()
@@ -0,0 +1,171 @@
+import asyncio
+import copy
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from bson import ObjectId
+from db.mongo import mongo_manager
+from db.repositories.run_repository import RunRepository
+
+
+# ============================================================
+# In-memory stand-in for the runs collection
+# ============================================================
+
+class InMemoryRuns:
+    """
+    Just enough of a Motor collection for the run repository,
+    counting round trips per operation.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.calls = {"insert_one": 0, "insert_many": 0, "update_one": 0, "find_one": 0}
+
+    async def insert_one(self, doc):
+        self.calls["insert_one"] += 1
+        doc.setdefault("_id", ObjectId())
+        # Mongo returns _id first
+        self.docs[doc["_id"]] = copy.deepcopy({"_id": doc["_id"], **doc})
+
+        class Result:
+            inserted_id = doc["_id"]
+
+        return Result()
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls["insert_many"] += 1
+        for doc in docs:
+            self.docs[doc["_id"]] = copy.deepcopy({"_id": doc["_id"], **doc})
+
+    async def update_one(self, query, update):
+        self.calls["update_one"] += 1
+        doc = self.docs[query["_id"]]
+        for field, value in update.get("$push", {}).items():
+            doc[field].append(copy.deepcopy(value))
+        for field, value in update.get("$set", {}).items():
+            doc[field] = copy.deepcopy(value)
+
+    async def find_one(self, query):
+        self.calls["find_one"] += 1
+        doc = self.docs.get(query["_id"])
+        if doc and doc["user_id"] == query["user_id"]:
+            return copy.deepcopy(doc)
+        return None
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.runs = InMemoryRuns()
+
+
+ITERATION = {
+    "iteration": 1,
+    "optimized_prompt": "Explain transformers in NLP. Use bullet points.",
+    "original_response": "Transformers are...",
+    "optimized_response": "- Attention...\n- Positional encoding...",
+    "evaluation": {"final_score": 0.78, "should_iterate": False},
+    "latency_original": 0.8,
+    "latency_optimized": 0.6,
+    "tokens_original": 120,
+    "tokens_optimized": 95,
+    "output_budget": {"max_tokens": 400, "stop": [], "completion_tokens": 90, "finish_reason": "stop"},
+    "token_usage": {"tokens_charged": 215}
+}
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def legacy_run(user_id):
+    """
+    The previous four-round-trip path.
+    """
+
+    run_id = await RunRepository.create_run(user_id, "Explain transformers", "groq")
+    await RunRepository.add_iteration(run_id, ITERATION)
+    await RunRepository.finalize_run(run_id, ITERATION["optimized_prompt"], ITERATION["optimized_response"])
+    return await RunRepository.get_run(run_id, user_id)
+
+
+async def single_write_run(user_id):
+
+    run = RunRepository.build_run(
+        user_id=user_id,
+        original_prompt="Explain transformers",
+        model_used="groq",
+        iterations=[ITERATION],
+        final_prompt=ITERATION["optimized_prompt"],
+        final_response=ITERATION["optimized_response"]
+    )
+
+    run_id = await RunRepository.save_run(run)
+
+    return {**run, "_id": run_id}
+
+
+async def run_persistence_checks():
+
+    mongo_manager.db = InMemoryDB()
+    runs = mongo_manager.db.runs
+
+    print("\n" + "=" * 100)
+    print("RUN PERSISTENCE")
+    print("=" * 100)
+
+    # -------------------------
+    # Stored shape unchanged
+    # -------------------------
+    legacy = await legacy_run("user-1")
+    legacy_calls = dict(runs.calls)
+
+    runs.calls = {k: 0 for k in runs.calls}
+
+    returned = await single_write_run("user-1")
+    new_calls = dict(runs.calls)
+
+    stored = await RunRepository.get_run(returned["_id"], "user-1")
+
+    assert list(stored.keys()) == list(legacy.keys()), (list(stored.keys()), list(legacy.keys()))
+
+    for field in legacy:
+        if field in {"_id", "created_at"}:
+            continue
+        assert stored[field] == legacy[field], field
+
+    # Response from memory equals what a read-back would return
+    assert returned == stored
+
+    print("Stored fields:", list(stored.keys()))
+    print("Legacy round trips:", legacy_calls)
+    print("Single-write round trips (excluding verification read):",
+          {k: v for k, v in new_calls.items() if v})
+
+    # -------------------------
+    # Write-behind buffer
+    # -------------------------
+    runs.calls = {k: 0 for k in runs.calls}
+    before = len(runs.docs)
+
+    RunRepository.start_write_behind(max_batch=25, flush_interval=0.01)
+
+    returned_runs = await asyncio.gather(*[single_write_run(f"user-{i}") for i in range(100)])
+
+    await RunRepository.stop_write_behind()
+
+    assert len(runs.docs) == before + 100
+    assert all(ObjectId(run["_id"]) in runs.docs for run in returned_runs)
+
+    print("Write-behind: 100 runs in", runs.calls["insert_many"], "insert_many batches")
+
+
+def run_persistence_tests():
+    asyncio.run(run_persistence_checks())
+
+
+if __name__ == "__main__":
+    run_persistence_tests()
@@ -0,0 +1,156 @@
+import asyncio
+import copy
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from core.config import get_settings
+from db.mongo import mongo_manager
+from db.repositories.usage_repository import UsageRepository
+from services.pipeline_service import PipelineService, TokenBudgetExceeded
+from services.token_service import TokenEstimator
+
+
+# ============================================================
+# In-memory stand-in for the usage collection
+# ============================================================
+
+class InMemoryUsage:
+    """
+    Just enough of a Motor collection for UsageRepository. Each call
+    yields to the event loop first, so concurrent requests interleave
+    between round trips as they would against Mongo.
+    """
+
+    def __init__(self):
+        self.docs = {}
+
+    @staticmethod
+    def _key(query):
+        return query["user_id"], query["day"]
+
+    @staticmethod
+    def _apply(doc, update):
+        for field, value in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + value
+        for field, value in update.get("$set", {}).items():
+            doc[field] = value
+
+    async def find_one(self, query, projection=None):
+        await asyncio.sleep(0)
+        doc = self.docs.get(self._key(query))
+        return copy.deepcopy(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = self.docs.get(self._key(query))
+        if doc is None:
+            if not upsert:
+                return
+            doc = self.docs[self._key(query)] = {"user_id": query["user_id"], "day": query["day"]}
+            doc.update(update.get("$setOnInsert", {}))
+        self._apply(doc, update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        await asyncio.sleep(0)
+        doc = self.docs.get(self._key(query))
+        if doc is None or doc["tokens"] > query["tokens"]["$lte"]:
+            return None
+        self._apply(doc, update)
+        return copy.deepcopy(doc)
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.usage = InMemoryUsage()
+
+
+def estimates(original, optimized, judge):
+    return {
+        "original": {"total_tokens": original},
+        "optimized": {"total_tokens": optimized},
+        "judge": {"total_tokens": judge}
+    }
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+async def run_token_budget_checks():
+
+    mongo_manager.db = InMemoryDB()
+
+    print("\n" + "=" * 100)
+    print("TOKEN BUDGET RESERVATIONS")
+    print("=" * 100)
+
+    # -------------------------
+    # Concurrent reservations never overspend
+    # -------------------------
+    reservations = await asyncio.gather(*[
+        UsageRepository.reserve("user-1", 30, budget=100) for _ in range(10)
+    ])
+
+    granted = [r for r in reservations if r is not None]
+    used = await UsageRepository.get_daily_usage("user-1")
+
+    assert len(granted) == 3 and used == 90
+    print(f"10 concurrent reservations of 30 against 100: {len(granted)} granted, {used} reserved")
+
+    # -------------------------
+    # Settle to actual usage, release on failure
+    # -------------------------
+    await UsageRepository.settle("user-1", granted[0], actual=12)
+    await UsageRepository.release("user-1", granted[1])
+
+    assert await UsageRepository.get_daily_usage("user-1") == 42
+    assert mongo_manager.db.usage.docs[("user-1", granted[0]["day"])]["requests"] == 1
+
+    # -------------------------
+    # Judge downgrade, then rejection
+    # -------------------------
+    get_settings().daily_token_budget = 100
+
+    reservation, enable_judge = await PipelineService._reserve_budget("user-1", estimates(20, 20, 20))
+    assert enable_judge is False and reservation["tokens"] == 40
+
+    try:
+        await PipelineService._reserve_budget("user-1", estimates(20, 20, 20))
+        raise AssertionError("expected TokenBudgetExceeded")
+    except TokenBudgetExceeded as exc:
+        assert exc.used == 82
+        print("Rejected:", exc)
+
+    # -------------------------
+    # Judge charged per call, parse retries included
+    # -------------------------
+    estimator = TokenEstimator()
+    evaluation = {"metrics": {"judge_metrics": {"usage": {"attempts": 3, "tokens": [300, None, 280]}}}}
+
+    charged = PipelineService._tokens_charged(
+        estimator, estimates(50, 40, 200), {"tokens_used": 45}, {"tokens_used": None}, evaluation
+    )
+
+    # 45 actual + 40 estimated + (300 + 200 estimated + 280) judge
+    assert charged == 45 + 40 + 780
+
+    cached = {"metrics": {"judge_metrics": {"cached": True, "usage": {"attempts": 0, "tokens": []}}}}
+    unjudged = {"metrics": {"judge_metrics": {}}}
+
+    for evaluation in (cached, unjudged):
+        assert PipelineService._tokens_charged(
+            estimator, estimates(50, 40, 200), {"tokens_used": 45}, {"tokens_used": 30}, evaluation
+        ) == 75
+
+    print("Judge with two parse retries charged:", charged - 85, "tokens")
+
+
+def run_token_budget_tests():
+    asyncio.run(run_token_budget_checks())
+
+
+if __name__ == "__main__":
+    run_token_budget_tests()
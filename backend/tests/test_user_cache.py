@@ -0,0 +1,250 @@
+import asyncio
+import copy
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from db.mongo import mongo_manager
+from db.repositories.user_repository import UserRepository
+from utils import user_cache
+from utils.auth_utils import create_access_token
+from utils.dependencies import get_current_user
+from utils.user_cache import UserCache
+
+
+# ============================================================
+# In-memory stand-in for the users collection
+# ============================================================
+
+class InMemoryUsers:
+    """
+    Just enough of a Motor collection for UserRepository, counting
+    lookups so cache hits are visible.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.lookups = 0
+
+    def _match(self, query):
+        for doc in self.docs.values():
+            if all(doc.get(k) == v for k, v in query.items()):
+                return doc
+        return None
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+        class Result:
+            inserted_id = doc["_id"]
+
+        return Result()
+
+    async def find_one(self, query):
+        self.lookups += 1
+        return copy.deepcopy(self._match(query))
+
+    async def find_one_and_update(self, query, update, projection=None):
+        doc = self._match(query)
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        doc.update(update["$set"])
+        return before
+
+    async def find_one_and_delete(self, query, projection=None):
+        doc = self._match(query)
+        if doc is None:
+            return None
+        return self.docs.pop(doc["_id"])
+
+
+class InMemoryDB:
+    def __init__(self):
+        self.users = InMemoryUsers()
+
+
+async def settle():
+    # Let background claim checks finish
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def authenticate(token: str):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    try:
+        return await get_current_user(credentials)
+    except HTTPException as exc:
+        return exc.status_code
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+def run_cache_unit_checks():
+
+    print("\n" + "=" * 100)
+    print("USER CACHE")
+    print("=" * 100)
+
+    # -------------------------
+    # LRU eviction, password never cached
+    # -------------------------
+    cache = UserCache(max_entries=2, ttl_seconds=60, revoke_ttl=60)
+
+    cache.put("a@x.io", {"email": "a@x.io", "password": "hash"})
+    cache.put("b@x.io", {"email": "b@x.io"})
+    cache.get("a@x.io")                     # a becomes most recent
+    cache.put("c@x.io", {"email": "c@x.io"})
+
+    assert cache.get("b@x.io") is None
+    assert cache.get("a@x.io") == {"email": "a@x.io"}
+    assert cache.get("c@x.io") is not None
+
+    # -------------------------
+    # TTL expiry
+    # -------------------------
+    short = UserCache(ttl_seconds=0.05, revoke_ttl=0.05)
+    short.put("a@x.io", {"email": "a@x.io"})
+    assert short.get("a@x.io") is not None
+    time.sleep(0.06)
+    assert short.get("a@x.io") is None
+
+    # -------------------------
+    # Invalidate, revoke, unrevoke
+    # -------------------------
+    cache.invalidate("a@x.io")
+    assert cache.get("a@x.io") is None and not cache.is_revoked("a@x.io")
+
+    cache.revoke("c@x.io")
+    assert cache.get("c@x.io") is None and cache.is_revoked("c@x.io")
+
+    cache.unrevoke("c@x.io")
+    assert not cache.is_revoked("c@x.io")
+
+    short.revoke("a@x.io")
+    time.sleep(0.06)
+    assert not short.is_revoked("a@x.io")
+
+    print("Stats:", cache.stats())
+
+
+async def run_authentication_checks():
+
+    print("\n" + "=" * 100)
+    print("AUTHENTICATION WITH USER CACHE")
+    print("=" * 100)
+
+    mongo_manager.db = InMemoryDB()
+    users = mongo_manager.db.users
+
+    # Two workers: each process has its own cache (A keeps revocations
+    # long enough for the re-register check below)
+    worker_a = UserCache(ttl_seconds=0.1, revoke_ttl=60)
+    worker_b = UserCache(ttl_seconds=0.1, revoke_ttl=0.1)
+
+    def on(worker):
+        user_cache._user_cache = worker
+
+    on(worker_a)
+    user_id = await UserRepository.create_user({"name": "Ana", "email": "ana@x.io", "password": "hash"})
+    token = create_access_token({"sub": "ana@x.io", "uid": user_id})
+
+    # -------------------------
+    # No lookup on the request path; one background check per TTL window
+    # -------------------------
+    for worker in (worker_a, worker_b):
+        on(worker)
+        for _ in range(5):
+            user = await authenticate(token)
+            assert str(user["_id"]) == user_id and "password" not in user
+            assert users.lookups == 0
+
+    await settle()
+
+    assert users.lookups == 2
+    # The confirmed document replaces the claims in the cache
+    assert worker_a.get("ana@x.io")["name"] == "Ana"
+    print("10 requests on 2 workers ->", users.lookups, "background database lookups")
+
+    # -------------------------
+    # Delete on worker A: blocked there at once, on B after its TTL
+    # -------------------------
+    on(worker_a)
+    await UserRepository.delete_user(user_id)
+    assert await authenticate(token) == 401
+
+    on(worker_b)
+    assert (await authenticate(token))["email"] == "ana@x.io"   # still cached
+    await asyncio.sleep(0.11)
+
+    # First miss after the TTL is served from the claims; its check
+    # finds the user gone and revokes the token on this worker
+    assert (await authenticate(token))["email"] == "ana@x.io"
+    await settle()
+    assert await authenticate(token) == 401
+    print("Deleted user rejected on the other worker after its cache TTL and one check")
+
+    # -------------------------
+    # The deleted email registers again and can sign in at once
+    # -------------------------
+    on(worker_a)
+    assert worker_a.is_revoked("ana@x.io")
+
+    new_id = await UserRepository.create_user({"email": "ana@x.io", "password": "hash"})
+    new_token = create_access_token({"sub": "ana@x.io", "uid": new_id})
+
+    assert str((await authenticate(new_token))["_id"]) == new_id
+
+    # The old token names the deleted _id: rejected even with the new
+    # account cached under the same email
+    assert await authenticate(token) == 401
+
+    print("Re-registered email accepted; token of the deleted account rejected")
+
+    # -------------------------
+    # Email changed on another worker: old token rejected after its check
+    # -------------------------
+    on(worker_b)
+    worker_b.clear()
+    assert str((await authenticate(new_token))["_id"]) == new_id
+    await settle()
+
+    await UserRepository.update_user(new_id, {"email": "ana@y.io"})
+    worker_b.invalidate("ana@x.io")     # as the entry would expire
+
+    await authenticate(new_token)
+    await settle()
+    assert await authenticate(new_token) == 401
+
+    renamed_token = create_access_token({"sub": "ana@y.io", "uid": new_id})
+    assert str((await authenticate(renamed_token))["_id"]) == new_id
+    print("Token of the old email rejected; the account's new token accepted")
+
+    # -------------------------
+    # Tokens without a uid claim are still looked up by email
+    # -------------------------
+    lookups = users.lookups
+    legacy_token = create_access_token({"sub": "ana@y.io"})
+
+    worker_b.clear()
+    assert (await authenticate(legacy_token))["email"] == "ana@y.io"
+    assert users.lookups == lookups + 1
+
+
+def run_user_cache_tests():
+    run_cache_unit_checks()
+    asyncio.run(run_authentication_checks())
+
+
+if __name__ == "__main__":
+    run_user_cache_tests()
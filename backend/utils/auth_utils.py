@@ -1,3 +1,7 @@
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -8,6 +12,21 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow CPU work (tens to hundreds of ms). It runs
+# on its own small pool (bcrypt releases the GIL) so a login burst
+# cannot stall the event loop or starve the default executor.
+PASSWORD_HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+# Hashes queued or running at once; further callers wait on the
+# semaphore in the event loop instead of piling into the pool queue
+PASSWORD_HASH_MAX_PENDING = PASSWORD_HASH_WORKERS * 8
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_hash_semaphores = weakref.WeakKeyDictionary()
+
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -17,6 +36,28 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _hash_semaphore() -> asyncio.Semaphore:
+    # One semaphore per event loop
+    loop = asyncio.get_running_loop()
+    if loop not in _hash_semaphores:
+        _hash_semaphores[loop] = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+    return _hash_semaphores[loop]
+
+
+async def hash_password_async(password: str):
+    async with _hash_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(
+            _hash_executor, hash_password, password
+        )
+
+
+async def verify_password_async(plain_password, hashed_password):
+    async with _hash_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(
+            _hash_executor, verify_password, plain_password, hashed_password
+        )
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
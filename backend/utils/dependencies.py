@@ -1,15 +1,59 @@
+import asyncio
+
+from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from pymongo.errors import PyMongoError
 from utils.auth_utils import SECRET_KEY, ALGORITHM
+from utils.user_cache import claims_subject, get_user_cache
 from db.repositories.user_repository import UserRepository
 
 security = HTTPBearer()
 
+# Claim checks running in the background, referenced until they finish
+_claim_checks = set()
+
+
+async def _verify_claims(cache, email: str, uid: str):
+    """
+    Confirms a user built from token claims still exists under that
+    email. The full document then replaces the claims in the cache;
+    otherwise the (email, uid) pair is revoked on this worker.
+    """
+
+    try:
+        user = await UserRepository.get_by_id(uid)
+    except PyMongoError as e:
+        print(f"⚠️ Could not verify user {uid}: {e}")
+        return
+
+    if user and user.get("email") == email:
+        cache.put(email, user)
+        return
+
+    cache.revoke(claims_subject(email, uid))
+    cache.invalidate(email)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
+    """
+    Resolves the user without a database round trip on the request
+    path for tokens carrying a `uid` claim:
+
+    1. cached user for the subject (TTL cache)
+    2. otherwise the user is built from the signed claims and cached;
+       a background lookup then confirms it, at most once per subject
+       per cache TTL
+    3. older tokens without `uid` are looked up by email, then cached
+
+    The database stays the source of truth: a user deleted on another
+    worker is revoked there by the check that follows the first miss
+    after its cache entry expires.
+    """
     token = credentials.credentials
 
     try:
@@ -22,9 +66,44 @@ async def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    cache = get_user_cache()
+
+    uid = payload.get("uid")
+
+    if cache.is_revoked(email) or (uid and cache.is_revoked(claims_subject(email, uid))):
+        raise HTTPException(status_code=401, detail="User not found")
+
+    user = cache.get(email)
+
+    if user:
+        if not uid or str(user["_id"]) == uid:
+            return user
+
+        # Emails are unique: the cached account holding this email is
+        # another one (deleted and registered again), so this token's
+        # account no longer owns it
+        raise HTTPException(status_code=401, detail="User not found")
+
+    if uid:
+        try:
+            user = {"_id": ObjectId(uid), "email": email}
+        except InvalidId:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        cache.put(email, user)
+
+        check = asyncio.create_task(_verify_claims(cache, email, uid))
+        _claim_checks.add(check)
+        check.add_done_callback(_claim_checks.discard)
+
+        return dict(user)
+
     user = await UserRepository.get_by_email(email)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
\ No newline at end of file
+    cache.put(email, user)
+
+    # Same shape as a cache hit: the password hash never leaves here
+    return {k: v for k, v in user.items() if k != "password"}
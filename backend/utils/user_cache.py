@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class UserCache:
+    """
+    Bounded TTL cache of resolved users, keyed by token subject (email).
+
+    - get/put      LRU with per-entry expiry; the password hash is
+                   never cached
+    - invalidate   drop an entry after the user document changes
+    - revoke       also reject the subject for `revoke_ttl` seconds, so
+                   a lookup that was in flight during a delete cannot
+                   put the user back into this worker's cache
+    - unrevoke     lift a revocation (the email registered again)
+
+    Per process: with several workers, each holds its own cache, so
+    changes made elsewhere (including deletes) are picked up after
+    `ttl_seconds`, when the entry expires and the next request's
+    claims are checked against the database again.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300, revoke_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revoke_ttl = revoke_ttl
+
+        self._entries = OrderedDict()
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------------------------------
+    # Lookup / Store
+    # -------------------------------------------------
+    def get(self, subject: str) -> Optional[Dict]:
+
+        now = time.monotonic()
+
+        with self._lock:
+            item = self._entries.get(subject)
+
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(subject)
+            self.hits += 1
+
+            return dict(item[1])
+
+    def put(self, subject: str, user: Dict):
+
+        user = {k: v for k, v in user.items() if k != "password"}
+
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(subject)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # -------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------
+    def invalidate(self, subject: str):
+
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def revoke(self, subject: str):
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._entries.pop(subject, None)
+            self._revoked[subject] = now + self.revoke_ttl
+
+            # Drop expired revocations while we hold the lock
+            for key in [k for k, until in self._revoked.items() if until <= now]:
+                del self._revoked[key]
+
+    def unrevoke(self, subject: str):
+
+        with self._lock:
+            self._revoked.pop(subject, None)
+
+    def is_revoked(self, subject: str) -> bool:
+
+        with self._lock:
+            until = self._revoked.get(subject)
+
+            if until is None:
+                return False
+
+            if until <= time.monotonic():
+                del self._revoked[subject]
+                return False
+
+            return True
+
+    def stats(self) -> Dict:
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def claims_subject(email: str, uid: str) -> str:
+    """
+    Revocation key for tokens of one account under one email; revoking
+    it leaves the account's tokens for another email untouched.
+    """
+    return f"{email}|{uid}"
+
+
+_user_cache = None
+
+
+def get_user_cache() -> UserCache:
+
+    global _user_cache
+
+    if _user_cache is None:
+        from core.config import get_settings
+
+        settings = get_settings()
+        _user_cache = UserCache(
+            max_entries=settings.user_cache_size,
+            ttl_seconds=settings.user_cache_ttl_seconds,
+            # Long enough to outlive any entry cached before the delete
+            revoke_ttl=settings.user_cache_ttl_seconds
+        )
+
+    return _user_cache
@@ -2,6 +2,7 @@ import re
 import spacy
 import torch
 from dataclasses import dataclass
+from typing import List
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from sentence_transformers import SentenceTransformer, util
 
@@ -38,8 +39,8 @@ class SemanticAbstraction:
     # -------------------------------------------------
     # Prompt State Computation
     # -------------------------------------------------
-    def _compute_prompt_state(self, prompt: str) -> PromptState:
-        doc = nlp(prompt)
+    def _compute_prompt_state(self, prompt: str, doc=None) -> PromptState:
+        doc = doc if doc is not None else nlp(prompt)
         tokens = [t for t in doc if not t.is_space]
 
         token_count = len(tokens)
@@ -137,8 +138,8 @@ class SemanticAbstraction:
     # -------------------------------------------------
     # Compression Mode
     # -------------------------------------------------
-    def _compression_mode(self, prompt: str) -> str:
-        doc = nlp(prompt)
+    def _compression_mode(self, prompt: str, doc=None) -> str:
+        doc = doc if doc is not None else nlp(prompt)
 
         # Extract noun phrases
         noun_phrases = [chunk.text for chunk in doc.noun_chunks]
@@ -181,8 +182,8 @@ class SemanticAbstraction:
     # -------------------------------------------------
     # Clarification Mode
     # -------------------------------------------------
-    def _clarification_mode(self, prompt: str) -> str:
-        doc = nlp(prompt)
+    def _clarification_mode(self, prompt: str, doc=None) -> str:
+        doc = doc if doc is not None else nlp(prompt)
         noun_phrases = [chunk.text for chunk in doc.noun_chunks]
 
         if noun_phrases:
@@ -201,15 +202,35 @@ class SemanticAbstraction:
     # -------------------------------------------------
     def abstract(self, prompt: str) -> str:
 
-        prompt = re.sub(r"\s+", " ", prompt).strip()
-        state = self._compute_prompt_state(prompt)
+        prompt = self._normalize(prompt)
+        return self._abstract(prompt, nlp(prompt))
+
+    def abstract_many(self, prompts: List[str], batch_size: int = 64) -> List[str]:
+        """
+        Same result as abstract() per prompt; every prompt is parsed
+        once, in a single nlp.pipe pass.
+        """
+
+        prompts = [self._normalize(p) for p in prompts]
+        docs = nlp.pipe(prompts, batch_size=batch_size)
+
+        return [self._abstract(p, doc) for p, doc in zip(prompts, docs)]
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        return re.sub(r"\s+", " ", prompt).strip()
+
+    def _abstract(self, prompt: str, doc) -> str:
+
+        # All modes below read the same parse of `prompt`
+        state = self._compute_prompt_state(prompt, doc)
 
         # -------------------------------------------------
         # 1️⃣ Narrative Compression Mode
         # Trigger only if BOTH narrative + non-imperative
         # -------------------------------------------------
         if state.narrative_ratio > 0.15 and state.imperative_score < 0.3:
-            compressed = self._compression_mode(prompt)
+            compressed = self._compression_mode(prompt, doc)
 
             # Only accept if meaningful change
             if compressed and compressed.strip() != prompt.strip():
@@ -223,7 +244,7 @@ class SemanticAbstraction:
             and state.ambiguity_score > 0.03
             and state.domain_specificity_score < 0.5
         ):
-            clarified = self._clarification_mode(prompt)
+            clarified = self._clarification_mode(prompt, doc)
 
             if clarified and clarified.strip() != prompt.strip():
                 return clarified
@@ -232,7 +253,6 @@ class SemanticAbstraction:
         # 3️⃣ Multi-Intent Normalization
         # -------------------------------------------------
         if state.multi_intent_score > 0.6 and state.imperative_score < 0.5:
-            doc = nlp(prompt)
             sentences = [sent.text.strip() for sent in doc.sents]
             if len(sentences) > 1:
                 return "\n".join(sentences)
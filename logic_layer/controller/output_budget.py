@@ -0,0 +1,93 @@
+import math
+import re
+from typing import Dict, List, Optional
+
+
+class OutputBudgetPlanner:
+    """
+    Output-Length Budget Planner
+    ----------------------------
+    Turns the length constraints written into an optimized prompt
+    (by ConstrainOutput / PromptSynthesizer) and the detected task type
+    into generation limits for the target call:
+
+    - max_tokens from the requested word range, with headroom
+    - task-type defaults when no explicit range is present
+    - stop sequences for decomposed "Task N:" prompts
+    """
+
+    # English prose averages ~1.3 tokens per word
+    TOKENS_PER_WORD = 1.35
+
+    # Headroom over the upper word bound (markdown, headings, lists)
+    SLACK = 0.3
+
+    TASK_DEFAULTS = {
+        "definition": 300,
+        "summarization": 450,
+        "explanation": 700,
+        "comparison": 800,
+        "procedure": 800,
+        "analysis": 1000,
+        "code_generation": 1200,
+    }
+
+    DEFAULT_BUDGET = 800
+
+    WORD_RANGE = re.compile(r"(\d+)\s*[–—-]\s*(\d+)\s*words", re.IGNORECASE)
+    WORD_LIMIT = re.compile(
+        r"(?:under|within|no more than|at most|maximum of|approximately)\s+(\d+)\s*words",
+        re.IGNORECASE
+    )
+    TASK_LINE = re.compile(r"^Task (\d+):", re.MULTILINE)
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def plan(self, prompt: str, metadata: Optional[Dict] = None) -> Dict:
+
+        metadata = metadata or {}
+        task_type = metadata.get("task_type", "")
+
+        word_limit = self._word_limit(prompt)
+
+        if word_limit is not None:
+            max_tokens = math.ceil(word_limit * self.TOKENS_PER_WORD * (1 + self.SLACK))
+            source = "constraint"
+        else:
+            max_tokens = self.TASK_DEFAULTS.get(task_type, self.DEFAULT_BUDGET)
+            source = "task_type"
+
+        return {
+            "max_tokens": max_tokens,
+            "stop": self._stop_sequences(prompt),
+            "word_limit": word_limit,
+            "task_type": task_type,
+            "source": source
+        }
+
+    # -------------------------------------------------
+    # Constraint Parsing
+    # -------------------------------------------------
+    def _word_limit(self, prompt: str) -> Optional[int]:
+        """
+        Upper word bound of the tightest length instruction, if any.
+        """
+
+        limits = [int(upper) for _, upper in self.WORD_RANGE.findall(prompt)]
+        limits += [int(n) for n in self.WORD_LIMIT.findall(prompt)]
+
+        return min(limits) if limits else None
+
+    def _stop_sequences(self, prompt: str) -> List[str]:
+        """
+        Decomposed prompts enumerate their subtasks; a model that
+        starts inventing the next one has finished the real work.
+        """
+
+        task_numbers = [int(n) for n in self.TASK_LINE.findall(prompt)]
+
+        if len(task_numbers) < 2:
+            return []
+
+        return [f"\nTask {max(task_numbers) + 1}:"]
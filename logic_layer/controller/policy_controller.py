@@ -181,9 +181,15 @@ class PolicyController:
     # -------------------------------------------------
     # Single-Pass Optimization
     # -------------------------------------------------
-    def optimize(self, prompt: str):
+    def optimize(self, prompt: str, intent: Dict = None, original_prompt: str = None):
+        """
+        original_prompt: the user's text before abstraction. Its
+        embedding is returned in metadata["embeddings"], keyed by that
+        text, for the evaluator to reuse.
+        """
 
-        intent = self.analyzer.analyze(prompt)
+        if intent is None:
+            intent = self.analyzer.analyze(prompt, original_prompt)
 
         scores = self.score_primitives(intent, prompt)
         selected = self.select_primitives(intent, prompt)
@@ -212,10 +218,28 @@ class PolicyController:
                     applied.append(name)
 
         metadata = {
+            "task_type": intent["task_type"],
             "scores": scores,
             "selected_primitives": selected,
             "applied_primitives": applied,
         }
 
+        # {text: vector} in the form Evaluator.evaluate(embeddings=) takes
+        if intent.get("embeddings"):
+            metadata["embeddings"] = intent["embeddings"]
+
         return current_prompt, metadata
 
+    def optimize_many(self, prompts: List[str], original_prompts: List[str] = None) -> List[Tuple[str, Dict]]:
+        """
+        optimize() for a list of prompts, with intent analysis batched
+        (one nlp.pipe pass, one embedding call).
+        """
+
+        intents = self.analyzer.analyze_many(prompts, original_prompts)
+
+        return [
+            self.optimize(prompt, intent)
+            for prompt, intent in zip(prompts, intents)
+        ]
+
@@ -48,4 +48,20 @@ class ABTestingEngine:
             "judge_score_A": score_a,
             "judge_score_B": score_b,
             "winner": winner
-        }
\ No newline at end of file
+        }
+
+    def compare_pairwise(self, pairwise_result: Dict) -> Dict:
+        """
+        Takes the output of LLMJudge.evaluate_pairwise, where both
+        responses were scored in a single judge call.
+        """
+
+        score_a = pairwise_result["A"].get("overall_quality", 0)
+        score_b = pairwise_result["B"].get("overall_quality", 0)
+
+        return {
+            "judge_score_A": score_a,
+            "judge_score_B": score_b,
+            "winner": pairwise_result["winner"],
+            "order_shown": pairwise_result["order"]
+        }
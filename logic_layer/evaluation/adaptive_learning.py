@@ -1,6 +1,8 @@
 import json
 import os
-from typing import Dict, List
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 
 
 class AdaptiveLearningEngine:
@@ -9,10 +11,39 @@ class AdaptiveLearningEngine:
 
     - Aggregation weights
     - Primitive priority scores
+
+    Storage is a local SQLite database (WAL mode), so concurrent
+    workers and processes can record safely:
+
+    - primitive_scores  one row per primitive, updated in place with an
+                        atomic UPSERT (O(1) per primitive, no full rewrite)
+    - history           rolling log capped at `history_limit` rows
+
+    Ranking is served from an index on avg_score. An existing
+    learning_log.json is imported on first use.
     """
 
-    def __init__(self, storage_path="logic_layer/evaluation/learning_log.json"):
+    HISTORY_LIMIT = 10_000
+
+    # Seconds a writer waits for another process's lock
+    BUSY_TIMEOUT = 30
+
+    def __init__(
+        self,
+        storage_path="logic_layer/evaluation/learning_log.db",
+        legacy_path: Optional[str] = None,
+        history_limit: Optional[int] = None
+    ):
+        # Callers still pointing at the old JSON file get a database
+        # next to it, imported from the old one
+        if storage_path.endswith(".json"):
+            legacy_path = legacy_path or storage_path
+            storage_path = f"{os.path.splitext(storage_path)[0]}.db"
+
         self.storage_path = storage_path
+        self.legacy_path = legacy_path or f"{os.path.splitext(storage_path)[0]}.json"
+        self.history_limit = history_limit or self.HISTORY_LIMIT
+
         self._initialize_storage()
 
     # ============================================================
@@ -20,20 +51,99 @@ class AdaptiveLearningEngine:
     # ============================================================
 
     def _initialize_storage(self):
-        if not os.path.exists(self.storage_path):
-            with open(self.storage_path, "w") as f:
-                json.dump({
-                    "history": [],
-                    "primitive_scores": {}
-                }, f)
 
-    def _load(self):
-        with open(self.storage_path, "r") as f:
-            return json.load(f)
+        directory = os.path.dirname(self.storage_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS primitive_scores (
+                    primitive TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    score_sum REAL NOT NULL,
+                    avg_score REAL NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_primitive_scores_avg
+                    ON primitive_scores (avg_score DESC);
+
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    primitives TEXT NOT NULL,
+                    final_score REAL NOT NULL,
+                    user_rating INTEGER
+                );
+            """)
+
+        if os.path.exists(self.legacy_path):
+            self._migrate_legacy()
+
+    @contextmanager
+    def _connect(self):
+        """
+        Short-lived connection per operation; commits on success,
+        rolls back on error.
+        """
+
+        conn = sqlite3.connect(self.storage_path, timeout=self.BUSY_TIMEOUT)
+
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # ============================================================
+    # MIGRATION (learning_log.json -> SQLite)
+    # ============================================================
+
+    def _migrate_legacy(self):
+
+        with open(self.legacy_path, "r") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                data = {}
+
+        history = data.get("history", [])[-self.history_limit:]
+
+        with self._connect() as conn:
+
+            conn.execute("BEGIN IMMEDIATE")
 
-    def _save(self, data):
-        with open(self.storage_path, "w") as f:
-            json.dump(data, f, indent=4)
+            # Another process may have migrated while we waited for the lock
+            if not os.path.exists(self.legacy_path):
+                return
+
+            conn.executemany(
+                """
+                INSERT INTO primitive_scores (primitive, count, score_sum, avg_score)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(primitive) DO NOTHING
+                """,
+                [
+                    (p, s["count"], s["avg_score"] * s["count"], s["avg_score"])
+                    for p, s in data.get("primitive_scores", {}).items()
+                ]
+            )
+
+            conn.executemany(
+                "INSERT INTO history (primitives, final_score, user_rating) VALUES (?, ?, ?)",
+                [
+                    (json.dumps(h["primitives"]), h["final_score"], h.get("user_rating"))
+                    for h in history
+                ]
+            )
+
+            # Keep the original for reference; it is not read again
+            os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
 
     # ============================================================
     # RECORD SESSION RESULT
@@ -46,45 +156,85 @@ class AdaptiveLearningEngine:
         user_rating: int = None
     ):
 
-        data = self._load()
-
-        data["history"].append({
-            "primitives": primitives_used,
-            "final_score": final_score,
-            "user_rating": user_rating
-        })
-
-        # Update primitive performance averages
-        for p in primitives_used:
-            if p not in data["primitive_scores"]:
-                data["primitive_scores"][p] = {
-                    "count": 0,
-                    "avg_score": 0
-                }
-
-            entry = data["primitive_scores"][p]
-            entry["count"] += 1
-            entry["avg_score"] = (
-                (entry["avg_score"] * (entry["count"] - 1) + final_score)
-                / entry["count"]
+        with self._connect() as conn:
+
+            # Take the write lock up front so the whole record is atomic
+            conn.execute("BEGIN IMMEDIATE")
+
+            cursor = conn.execute(
+                "INSERT INTO history (primitives, final_score, user_rating) VALUES (?, ?, ?)",
+                (json.dumps(primitives_used), final_score, user_rating)
             )
 
-        self._save(data)
+            # Rolling history: drop rows older than the cap
+            conn.execute(
+                "DELETE FROM history WHERE id <= ?",
+                (cursor.lastrowid - self.history_limit,)
+            )
+
+            # Update primitive performance averages in place
+            conn.executemany(
+                """
+                INSERT INTO primitive_scores (primitive, count, score_sum, avg_score)
+                VALUES (?, 1, ?, ?)
+                ON CONFLICT(primitive) DO UPDATE SET
+                    count = count + 1,
+                    score_sum = score_sum + excluded.score_sum,
+                    avg_score = (score_sum + excluded.score_sum) / (count + 1)
+                """,
+                [(p, final_score, final_score) for p in primitives_used]
+            )
 
     # ============================================================
     # GET PRIMITIVE RANKING
     # ============================================================
 
-    def get_ranked_primitives(self):
+    def get_ranked_primitives(self, limit: Optional[int] = None):
+
+        query = "SELECT primitive, count, avg_score FROM primitive_scores ORDER BY avg_score DESC"
+        params = ()
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [
+            (primitive, {"count": count, "avg_score": avg_score})
+            for primitive, count, avg_score in rows
+        ]
+
+    def get_primitive_score(self, primitive: str) -> Optional[Dict]:
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT count, avg_score FROM primitive_scores WHERE primitive = ?",
+                (primitive,)
+            ).fetchone()
+
+        if row is None:
+            return None
 
-        data = self._load()
+        return {"count": row[0], "avg_score": row[1]}
 
-        scores = data["primitive_scores"]
+    def get_history(self, limit: int = 100) -> List[Dict]:
+        """
+        Most recent sessions first.
+        """
 
-        ranked = sorted(
-            scores.items(),
-            key=lambda x: x[1]["avg_score"],
-            reverse=True
-        )
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT primitives, final_score, user_rating FROM history ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
 
-        return ranked
\ No newline at end of file
+        return [
+            {
+                "primitives": json.loads(primitives),
+                "final_score": final_score,
+                "user_rating": user_rating
+            }
+            for primitives, final_score, user_rating in rows
+        ]
@@ -0,0 +1,509 @@
+"""
+Offline Bulk Evaluation
+=======================
+Scores historical runs and benchmark corpora without going through
+the HTTP API.
+
+Sources:
+    - JSONL file, one record per line
+    - MongoDB `runs` collection (one record per stored iteration)
+    - the TEST_PROMPTS benchmark set in logic_layer/tests/test_all_prompts.py
+
+Each record needs an original prompt; missing optimized prompts are
+produced with SinglePassRefiner, missing responses are generated when
+an LLM provider is configured. Records without optimization metadata
+(task type, selected primitives) get it re-derived from the refiner's
+intent analysis, so primitive metrics are never scored against an
+empty dict.
+
+Records are sharded in chunks across a process pool. Every worker
+loads the models (spaCy, sentence-transformer, judge client) once and
+embeds each chunk in a single batched call.
+
+Output streams to JSONL, or to a directory of Parquet part files.
+Successfully scored record ids are appended to a checkpoint file, so
+an interrupted run resumes where it stopped; failed records (written
+as rows with an "error") are retried on the next run.
+
+Examples:
+    python -m logic_layer.evaluation.bulk_evaluate \\
+        --input requests.jsonl --prompt-field body --id-field request_id \\
+        --output scores.jsonl
+
+    python -m logic_layer.evaluation.bulk_evaluate \\
+        --mongo-url mongodb://localhost:27017 --mongo-db srpp_db \\
+        --output scores_parquet --format parquet \\
+        --llm-provider groq --judge-mode tiered
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+
+# ============================================================
+# RECORD SOURCES
+# ============================================================
+
+def read_jsonl(path: str, prompt_field: str, id_field: Optional[str]) -> Iterator[Dict]:
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+
+            line = line.strip()
+            if not line:
+                continue
+
+            raw = json.loads(line)
+
+            yield normalize_record(
+                raw,
+                prompt_field=prompt_field,
+                record_id=raw.get(id_field) if id_field else None,
+                fallback_id=f"line-{line_number}"
+            )
+
+
+def read_mongo(url: str, db_name: str, collection: str) -> Iterator[Dict]:
+
+    try:
+        from pymongo import MongoClient
+    except ImportError:
+        raise ImportError("pymongo not installed. Run: pip install pymongo")
+
+    client = MongoClient(url)
+
+    try:
+        cursor = client[db_name][collection].find(
+            {},
+            {"original_prompt": 1, "iterations": 1}
+        )
+
+        for run in cursor:
+            for iteration in run.get("iterations", []):
+
+                yield {
+                    "record_id": f"{run['_id']}:{iteration.get('iteration', 1)}",
+                    "original_prompt": run.get("original_prompt"),
+                    "optimized_prompt": iteration.get("optimized_prompt"),
+                    "original_response": iteration.get("original_response"),
+                    "optimized_response": iteration.get("optimized_response"),
+                    # Stored since the pipeline began saving it; older runs re-derive it
+                    "metadata": iteration.get("metadata") or {}
+                }
+    finally:
+        client.close()
+
+
+def read_test_prompts() -> Iterator[Dict]:
+
+    from logic_layer.tests.test_all_prompts import TEST_PROMPTS
+
+    for case in TEST_PROMPTS:
+        yield normalize_record(case, prompt_field="prompt", record_id=case["label"])
+
+
+def normalize_record(
+    raw: Dict,
+    prompt_field: str,
+    record_id=None,
+    fallback_id: str = None
+) -> Dict:
+
+    return {
+        "record_id": str(record_id if record_id is not None else raw.get("record_id", fallback_id)),
+        "original_prompt": raw.get(prompt_field) or raw.get("original_prompt") or raw.get("prompt"),
+        "optimized_prompt": raw.get("optimized_prompt"),
+        "original_response": raw.get("original_response"),
+        "optimized_response": raw.get("optimized_response"),
+        "metadata": raw.get("metadata") or {}
+    }
+
+
+# ============================================================
+# WORKER (one per process)
+# ============================================================
+
+_worker = None
+
+
+class _BulkWorker:
+    """
+    Per-process state: models are loaded once in the pool initializer.
+    """
+
+    def __init__(self, options: Dict):
+
+        from logic_layer.evaluation.evaluator import Evaluator
+        from logic_layer.evaluation.judge_sampling import JudgeSampler
+        from logic_layer.refiner.single_pass_refiner import SinglePassRefiner
+
+        self.llm = None
+        if options["llm_provider"]:
+            from logic_layer.target_llm.llm_factory import get_llm
+            self.llm = get_llm(
+                provider=options["llm_provider"],
+                config=options["llm_config"]
+            )
+
+        self.refiner = SinglePassRefiner()
+
+        self.evaluator = Evaluator(
+            llm=self.llm,
+            enable_semantic=options["semantic"],
+            enable_judge=options["judge"],
+            quality_threshold=options["quality_threshold"],
+            max_workers=options["threads"],
+            judge_mode=options["judge_mode"],
+            judge_sampler=JudgeSampler(options["judge_sample_rate"])
+        )
+
+    def prepare(self, record: Dict) -> Dict:
+
+        if not record.get("original_prompt"):
+            raise ValueError("missing original prompt")
+
+        if not record.get("optimized_prompt") or not record.get("metadata"):
+            optimized_prompt, metadata = self.refiner.refine(record["original_prompt"])
+            # A stored optimized prompt is kept; only its metadata is re-derived
+            record["optimized_prompt"] = record.get("optimized_prompt") or optimized_prompt
+            record["metadata"] = metadata
+
+        for prompt_key, response_key in (
+            ("original_prompt", "original_response"),
+            ("optimized_prompt", "optimized_response")
+        ):
+            if record.get(response_key) is None:
+                if self.llm is None:
+                    raise ValueError(f"missing {response_key} and no --llm-provider set")
+                record[response_key] = self.llm.generate(record[prompt_key])["output"]
+
+        return record
+
+    def run_chunk(self, records: List[Dict]) -> List[Dict]:
+
+        ready, rows = [], []
+
+        for record in records:
+            try:
+                ready.append(self.prepare(record))
+            except Exception as e:
+                rows.append(error_row(record, e))
+
+        if ready:
+            results = self.evaluator.evaluate_many(ready)
+            rows.extend(to_row(record, result) for record, result in zip(ready, results))
+
+        return rows
+
+
+def _init_worker(options: Dict):
+    global _worker
+    _worker = _BulkWorker(options)
+
+
+def _run_chunk(records: List[Dict]) -> List[Dict]:
+    return _worker.run_chunk(records)
+
+
+def to_row(record: Dict, result: Dict) -> Dict:
+
+    aggregation = result["aggregation"]
+
+    return {
+        "record_id": record["record_id"],
+        "original_prompt": record["original_prompt"],
+        "optimized_prompt": record["optimized_prompt"],
+        "final_score": result["final_score"],
+        "should_iterate": result["should_iterate"],
+        "judge_missing": aggregation.get("judge_missing"),
+        **aggregation["component_scores"],
+        "evaluation": result,
+        "error": None
+    }
+
+
+def error_row(record: Dict, error: Exception) -> Dict:
+
+    row = {column: None for column in ROW_COLUMNS}
+    row.update(
+        record_id=record["record_id"],
+        original_prompt=record.get("original_prompt"),
+        optimized_prompt=record.get("optimized_prompt"),
+        error=str(error)
+    )
+
+    return row
+
+
+ROW_COLUMNS = [
+    "record_id",
+    "original_prompt",
+    "optimized_prompt",
+    "final_score",
+    "should_iterate",
+    "judge_missing",
+    "prompt_score",
+    "primitive_score",
+    "response_score",
+    "semantic_score",
+    "judge_score",
+    "evaluation",
+    "error"
+]
+
+
+# ============================================================
+# OUTPUT SINKS
+# ============================================================
+
+class JsonlSink:
+
+    def __init__(self, path: str):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            self.file.write(json.dumps(row, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    One part file per chunk; appending to a single Parquet file is
+    not supported, and part files keep resume simple.
+    """
+
+    def __init__(self, directory: str):
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow not installed. Run: pip install pyarrow")
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.part = len([f for f in os.listdir(directory) if f.endswith(".parquet")])
+
+    def write(self, rows: List[Dict]):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Nested evaluation stored as a JSON string column
+        flat = [
+            {**row, "evaluation": json.dumps(row["evaluation"], default=str) if row["evaluation"] else None}
+            for row in rows
+        ]
+
+        path = os.path.join(self.directory, f"part-{self.part:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(flat, schema=self.schema()), path)
+
+        self.part += 1
+
+    @staticmethod
+    def schema():
+
+        import pyarrow as pa
+
+        # Fixed schema so every part file reads back as one dataset
+        types = {
+            "final_score": pa.float64(),
+            "should_iterate": pa.bool_(),
+            "judge_missing": pa.bool_(),
+            "prompt_score": pa.float64(),
+            "primitive_score": pa.float64(),
+            "response_score": pa.float64(),
+            "semantic_score": pa.float64(),
+            "judge_score": pa.float64(),
+        }
+
+        return pa.schema([(column, types.get(column, pa.string())) for column in ROW_COLUMNS])
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# CHECKPOINTS
+# ============================================================
+
+class Checkpoint:
+    """
+    Append-only list of completed record ids, written after the
+    matching output rows are flushed.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.done = set()
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+        self.file = open(path, "a", encoding="utf-8")
+
+    def mark(self, record_ids: List[str]):
+        self.file.write("".join(f"{record_id}\n" for record_id in record_ids))
+        self.file.flush()
+        self.done.update(record_ids)
+
+    def close(self):
+        self.file.close()
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+
+def chunked(records: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(args) -> Dict:
+
+    if args.input:
+        records = read_jsonl(args.input, args.prompt_field, args.id_field)
+    elif args.test_prompts:
+        records = read_test_prompts()
+    else:
+        records = read_mongo(args.mongo_url, args.mongo_db, args.collection)
+
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output.rstrip(os.sep)}.checkpoint")
+
+    pending = (r for r in records if r["record_id"] not in checkpoint.done)
+
+    sink = ParquetSink(args.output) if args.format == "parquet" else JsonlSink(args.output)
+
+    options = {
+        "llm_provider": args.llm_provider,
+        "llm_config": {
+            "api_key": os.getenv(args.api_key_env),
+            "model_name": args.llm_model
+        },
+        "semantic": not args.no_semantic,
+        "judge": bool(args.llm_provider) and not args.no_judge,
+        "judge_mode": args.judge_mode,
+        "judge_sample_rate": args.judge_sample_rate,
+        "quality_threshold": args.quality_threshold,
+        "threads": args.threads
+    }
+
+    summary = {"skipped": len(checkpoint.done), "scored": 0, "errors": 0}
+
+    # Bounded number of chunks in flight keeps memory flat
+    max_in_flight = args.workers * 2
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(options,)
+        ) as pool:
+
+            chunks = chunked(pending, args.chunk_size)
+            in_flight = set()
+
+            while True:
+
+                for chunk in islice(chunks, max_in_flight - len(in_flight)):
+                    in_flight.add(pool.submit(_run_chunk, chunk))
+
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    rows = future.result()
+
+                    sink.write(rows)
+                    checkpoint.mark([row["record_id"] for row in rows if not row["error"]])
+
+                    errors = sum(1 for row in rows if row["error"])
+                    summary["errors"] += errors
+                    summary["scored"] += len(rows) - errors
+
+                print(
+                    f"scored={summary['scored']} errors={summary['errors']} "
+                    f"skipped={summary['skipped']}",
+                    file=sys.stderr
+                )
+    finally:
+        sink.close()
+        checkpoint.close()
+
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(
+        prog="python -m logic_layer.evaluation.bulk_evaluate",
+        description="Offline bulk evaluation over JSONL corpora or stored runs."
+    )
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of records")
+    source.add_argument("--mongo-url", help="MongoDB URL to read stored runs from")
+    source.add_argument("--test-prompts", action="store_true",
+                        help="Use the TEST_PROMPTS benchmark set")
+
+    parser.add_argument("--mongo-db", default="srpp_db")
+    parser.add_argument("--collection", default="runs")
+
+    parser.add_argument("--prompt-field", default="original_prompt",
+                        help="JSONL field holding the original prompt")
+    parser.add_argument("--id-field", default=None,
+                        help="JSONL field used as record id (default: line number)")
+
+    parser.add_argument("--output", required=True,
+                        help="JSONL file, or directory for --format parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file (default: <output>.checkpoint)")
+
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=2,
+                        help="Evaluator threads per worker process")
+    parser.add_argument("--chunk-size", type=int, default=64)
+
+    parser.add_argument("--llm-provider", default=None,
+                        help="LLM for judging and missing responses (e.g. groq)")
+    parser.add_argument("--llm-model", default="llama-3.1-8b-instant")
+    parser.add_argument("--api-key-env", default="GROQ_API_KEY")
+
+    parser.add_argument("--no-judge", action="store_true")
+    parser.add_argument("--no-semantic", action="store_true")
+    parser.add_argument("--judge-mode", choices=["always", "tiered"], default="tiered")
+    parser.add_argument("--judge-sample-rate", type=float, default=1.0)
+    parser.add_argument("--quality-threshold", type=float, default=0.65)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+
+    args = build_parser().parse_args(argv)
+
+    summary = run(args)
+
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 # Metric Modules
 from .metrics.prompt_metrics import PromptMetrics
@@ -8,7 +11,13 @@ from .metrics.semantic_metrics import SemanticMetrics
 from .metrics.aggregation import AggregationEngine
 
 # Optional LLM Judge
-from .llm_judge import LLMJudge
+from .llm_judge import LLMJudge, JudgeParseError
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round((time.perf_counter() - start) * 1000, 2)
 
 
 class Evaluator:
@@ -21,8 +30,31 @@ class Evaluator:
         - LLM-as-judge scoring
         - Multi-objective aggregation
         - Iteration decision logic
+
+    The judge (a network call) is submitted first to its own thread
+    pool; the deterministic and semantic families run alongside it on
+    a separate bounded pool, so judge calls blocked on the network
+    never hold the workers the CPU metrics need.
+
+    judge_mode:
+        "always" -> judge every evaluation (default)
+        "tiered" -> compute the other families first and call the judge
+                    only if its score range could still flip
+                    should_iterate
+
+    judge_cache (JudgeCache) reuses verdicts for identical judge
+    prompts; judge_sampler (JudgeSampler) judges only a fraction of
+    traffic per task_type. Unjudged results are scored by
+    AggregationEngine with the judge weight redistributed.
     """
 
+    # Pools shared across instances, one per (kind, size)
+    _executors = {}
+    _executors_lock = threading.Lock()
+
+    DEFAULT_METRIC_WORKERS = 4
+    DEFAULT_JUDGE_WORKERS = 8
+
     # ============================================================
     # INITIALIZATION
     # ============================================================
@@ -32,19 +64,76 @@ class Evaluator:
         llm=None,
         enable_semantic: bool = True,
         enable_judge: bool = True,
-        quality_threshold: float = 0.65
+        quality_threshold: float = 0.65,
+        max_workers: Optional[int] = None,
+        judge_workers: Optional[int] = None,
+        judge_mode: str = "always",
+        judge_cache=None,
+        judge_sampler=None
     ):
 
+        if judge_mode not in {"always", "tiered"}:
+            raise ValueError(f"Unsupported judge_mode: {judge_mode}")
+
         self.prompt_metrics = PromptMetrics()
         self.primitive_metrics = PrimitiveMetrics()
         self.response_metrics = ResponseMetrics()
 
         self.semantic_metrics = SemanticMetrics() if enable_semantic else None
-        self.judge = LLMJudge(llm) if (enable_judge and llm) else None
+        self.judge = LLMJudge(llm, cache=judge_cache) if (enable_judge and llm) else None
+        self.judge_sampler = judge_sampler
 
         self.aggregator = AggregationEngine()
 
         self.quality_threshold = quality_threshold
+        self.judge_mode = judge_mode
+
+        self.judge_stats = {
+            "evaluations": 0,
+            "judge_calls": 0,
+            "judge_calls_avoided": 0,
+            "judge_sampled_out": 0
+        }
+        self._stats_lock = threading.Lock()
+
+        self.executor = Evaluator._shared_executor(
+            "evaluator", max_workers or Evaluator.DEFAULT_METRIC_WORKERS
+        )
+        self.judge_executor = Evaluator._shared_executor(
+            "judge", judge_workers or Evaluator.DEFAULT_JUDGE_WORKERS
+        )
+
+    @staticmethod
+    def _shared_executor(kind: str, workers: int) -> ThreadPoolExecutor:
+
+        # Evaluators asking for the same size share one pool
+        with Evaluator._executors_lock:
+            key = (kind, workers)
+
+            if key not in Evaluator._executors:
+                Evaluator._executors[key] = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=f"{kind}-{workers}"
+                )
+
+            return Evaluator._executors[key]
+
+    def _count(self, stat: str):
+        # evaluate() may run on several threads at once
+        with self._stats_lock:
+            self.judge_stats[stat] += 1
+
+    # ============================================================
+    # JUDGE
+    # ============================================================
+
+    def _run_judge(self, prompt: str, response: str) -> Dict:
+
+        # A verdict that cannot be parsed is reported, not scored as 5s
+        try:
+            return self.judge.evaluate(prompt, response)
+        except JudgeParseError as e:
+            return {"error": str(e), "usage": e.usage}
 
     # ============================================================
     # MAIN EVALUATION PIPELINE
@@ -56,71 +145,141 @@ class Evaluator:
         optimized_prompt: str,
         original_response: str,
         optimized_response: str,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embeddings: Optional[Dict] = None
     ) -> Dict:
+        """
+        embeddings (optional): {text: vector} computed upstream with the
+        same sentence-transformer; matching texts are not re-encoded.
+        """
 
         metadata = metadata or {}
 
-        # -------------------------
-        # 1. Prompt Metrics
-        # -------------------------
-        prompt_metrics = self.prompt_metrics.compute(
-            original_prompt,
-            optimized_prompt
-        )
+        start = time.perf_counter()
 
-        # -------------------------
-        # 2. Primitive Metrics
-        # -------------------------
-        primitive_metrics = self.primitive_metrics.compute(metadata)
+        use_judge = self.judge is not None
+        sampled_out = False
 
-        # -------------------------
-        # 3. Response Metrics
-        # -------------------------
-        response_metrics = self.response_metrics.compute(
-            original_prompt,
-            optimized_prompt,
-            original_response,
-            optimized_response
-        )
+        if use_judge and self.judge_sampler is not None:
+            use_judge = self.judge_sampler.should_judge(
+                metadata.get("task_type"),
+                optimized_prompt,
+                optimized_response
+            )
+            sampled_out = not use_judge
+
+        tiered = use_judge and self.judge_mode == "tiered"
 
         # -------------------------
-        # 4. Semantic Metrics
+        # 1. LLM Judge (launched first, slowest)
         # -------------------------
-        semantic_metrics = {}
-        if self.semantic_metrics:
-            semantic_metrics = self.semantic_metrics.compute(
-                original_prompt,
+        judge_future = None
+        if use_judge and not tiered:
+            judge_future = self.judge_executor.submit(
+                _timed,
+                self._run_judge,
                 optimized_prompt,
-                original_response,
                 optimized_response
             )
 
         # -------------------------
-        # 5. LLM Judge
+        # 2. Deterministic + Semantic Metrics
         # -------------------------
-        judge_metrics = {}
-        if self.judge:
-            judge_metrics = self.judge.evaluate(
+        futures = {
+            "prompt_metrics": self.executor.submit(
+                _timed,
+                self.prompt_metrics.compute,
+                original_prompt,
+                optimized_prompt
+            ),
+            "primitive_metrics": self.executor.submit(
+                _timed,
+                self.primitive_metrics.compute,
+                metadata
+            ),
+            "response_metrics": self.executor.submit(
+                _timed,
+                self.response_metrics.compute,
+                original_prompt,
                 optimized_prompt,
+                original_response,
                 optimized_response
+            ),
+        }
+
+        if self.semantic_metrics:
+            futures["semantic_metrics"] = self.executor.submit(
+                _timed,
+                self.semantic_metrics.compute,
+                original_prompt,
+                optimized_prompt,
+                original_response,
+                optimized_response,
+                embeddings=embeddings
             )
 
         # -------------------------
-        # 6. Aggregation
+        # 3. Gather
         # -------------------------
         metrics_bundle = {
-            "prompt_metrics": prompt_metrics,
-            "primitive_metrics": primitive_metrics,
-            "response_metrics": response_metrics,
-            "semantic_metrics": semantic_metrics,
-            "judge_metrics": judge_metrics
+            "prompt_metrics": {},
+            "primitive_metrics": {},
+            "response_metrics": {},
+            "semantic_metrics": {},
+            "judge_metrics": {}
         }
+        timings = {}
+
+        for family, future in futures.items():
+            metrics_bundle[family], timings[family] = future.result()
+
+        judge_decision = {
+            "mode": self.judge_mode,
+            "called": False,
+            "sampled_out": sampled_out
+        }
+
+        if sampled_out:
+            self._count("judge_sampled_out")
+
+        # -------------------------
+        # 3b. Tiered: judge only when the decision is open
+        # -------------------------
+        if tiered:
+            bounds = self.aggregator.score_bounds(metrics_bundle)
+            judge_decision["score_bounds"] = bounds
+
+            decided = (
+                bounds["lower"] >= self.quality_threshold
+                or bounds["upper"] < self.quality_threshold
+            )
+
+            if decided:
+                self._count("judge_calls_avoided")
+            else:
+                judge_future = self.judge_executor.submit(
+                    _timed,
+                    self._run_judge,
+                    optimized_prompt,
+                    optimized_response
+                )
 
+        if judge_future is not None:
+            metrics_bundle["judge_metrics"], timings["judge_metrics"] = judge_future.result()
+            judge_decision["called"] = True
+            self._count("judge_calls")
+
+        self._count("evaluations")
+
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+
+        # -------------------------
+        # 4. Aggregation
+        # -------------------------
         aggregation_result = self.aggregator.compute_final_score(metrics_bundle)
 
         # -------------------------
-        # 7. Iteration Decision
+        # 5. Iteration Decision
         # -------------------------
         final_score = aggregation_result["final_composite_score"]
 
@@ -131,5 +290,63 @@ class Evaluator:
             "aggregation": aggregation_result,
             "final_score": final_score,
             "quality_threshold": self.quality_threshold,
-            "should_iterate": should_iterate
-        }
\ No newline at end of file
+            "should_iterate": should_iterate,
+            "judge_decision": judge_decision,
+            "timings_ms": timings
+        }
+
+    # ============================================================
+    # BULK EVALUATION
+    # ============================================================
+
+    def evaluate_many(self, records: List[Dict]) -> List[Dict]:
+        """
+        records: [{"original_prompt", "optimized_prompt",
+                   "original_response", "optimized_response",
+                   "metadata" (optional)}, ...]
+
+        All texts in the batch are embedded in one encode call
+        before the records are scored. Embeddings already carried in
+        a record's metadata["embeddings"] are reused.
+        """
+
+        embeddings = self.embed_many(records)
+
+        return [
+            self.evaluate(
+                original_prompt=record["original_prompt"],
+                optimized_prompt=record["optimized_prompt"],
+                original_response=record["original_response"],
+                optimized_response=record["optimized_response"],
+                metadata=record.get("metadata"),
+                embeddings=embeddings
+            )
+            for record in records
+        ]
+
+    def embed_many(self, records: List[Dict]) -> Optional[Dict]:
+        """
+        {text: vector} for every text of the records, in one encode
+        call, for evaluate(embeddings=). None without semantic metrics.
+        """
+
+        if not self.semantic_metrics or not records:
+            return None
+
+        precomputed = {}
+        for record in records:
+            precomputed.update((record.get("metadata") or {}).get("embeddings") or {})
+
+        return self.semantic_metrics.encode(
+            [
+                record[field]
+                for record in records
+                for field in (
+                    "original_prompt",
+                    "optimized_prompt",
+                    "original_response",
+                    "optimized_response"
+                )
+            ],
+            precomputed=precomputed
+        )
@@ -1,17 +1,60 @@
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
 
 
 class FeedbackStore:
     """
     Stores user feedback and evaluation outcomes.
     Used for adaptive learning and analysis.
+
+    Storage:
+    - feedback_log.jsonl        append-only, one entry per line
+    - feedback_log.jsonl.stats  running aggregates (count, rating sum,
+                                per-rating histogram) so averages are O(1)
+
+    Writes take an exclusive file lock, so concurrent workers and
+    processes never lose each other's entries. The old JSON array
+    log (feedback_log.json) is migrated on first use.
     """
 
-    def __init__(self, file_path="logic_layer/evaluation/feedback_log.json"):
+    # Rewrite the log (dropping torn lines) and rebuild the
+    # aggregates every this many writes
+    COMPACT_EVERY = 10_000
+
+    _thread_lock = threading.Lock()
+
+    def __init__(
+        self,
+        file_path="logic_layer/evaluation/feedback_log.jsonl",
+        legacy_path: Optional[str] = None,
+        compact_every: Optional[int] = None
+    ):
+        # Callers still pointing at the old JSON log get the JSONL
+        # file next to it, migrated from the old one
+        if file_path.endswith(".json"):
+            legacy_path = legacy_path or file_path
+            file_path = f"{file_path}l"
+
         self.file_path = file_path
+        self.stats_path = f"{file_path}.stats"
+        self.lock_path = f"{file_path}.lock"
+        self.legacy_path = legacy_path or f"{os.path.splitext(file_path)[0]}.json"
+        self.compact_every = compact_every or self.COMPACT_EVERY
+
         self._initialize()
 
     # ---------------------------
@@ -19,9 +62,17 @@ class FeedbackStore:
     # ---------------------------
 
     def _initialize(self):
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, "w") as f:
-                json.dump([], f)
+
+        with self._locked():
+
+            if self.legacy_path != self.file_path:
+                self._migrate_legacy()
+
+            if not os.path.exists(self.file_path):
+                open(self.file_path, "a").close()
+
+            if self._read_stats() is None:
+                self._write_stats(self._rebuild_stats())
 
     # ---------------------------
     # Store Feedback
@@ -32,47 +83,258 @@ class FeedbackStore:
         session_id: str,
         final_score: float,
         user_rating: Optional[int] = None,
-        comment: Optional[str] = None
+        comment: Optional[str] = None,
+        component_scores: Optional[Dict] = None
     ):
 
-        data = self._load()
-
         entry = {
             "session_id": session_id,
             "final_score": final_score,
             "user_rating": user_rating,
             "comment": comment,
+            "component_scores": component_scores,
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        data.append(entry)
+        line = json.dumps(entry) + "\n"
+
+        with self._locked():
+
+            with open(self.file_path, "a+b") as f:
+                # A crash can leave a last line without its newline;
+                # terminate it so this entry starts on its own line
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            stats = self._read_stats() or self._rebuild_stats()
+            self._apply(stats, entry)
+            stats["writes_since_compaction"] += 1
 
-        self._save(data)
+            if stats["writes_since_compaction"] >= self.compact_every:
+                stats = self._compact_locked()
+
+            self._write_stats(stats)
 
     # ---------------------------
     # Retrieval
     # ---------------------------
 
     def get_all(self) -> list:
-        return self._load()
+        return list(self.iter_entries())
+
+    def iter_entries(self) -> Iterator[Dict]:
+
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = self._parse_line(line)
+                if entry is not None:
+                    yield entry
 
     def get_average_user_rating(self) -> float:
-        data = self._load()
-        ratings = [d["user_rating"] for d in data if d["user_rating"]]
 
-        if not ratings:
+        stats = self.get_stats()
+
+        if not stats["rated_count"]:
             return 0.0
 
-        return sum(ratings) / len(ratings)
+        return stats["rating_sum"] / stats["rated_count"]
+
+    def get_stats(self) -> Dict:
+
+        stats = self._read_stats()
+
+        if stats is None:
+            with self._locked():
+                stats = self._rebuild_stats()
+                self._write_stats(stats)
+
+        return stats
+
+    # ---------------------------
+    # Compaction
+    # ---------------------------
+
+    def compact(self) -> Dict:
+        """
+        Rewrites the log without torn or corrupt lines and rebuilds
+        the aggregates from it. Runs automatically every
+        `compact_every` writes.
+        """
+
+        with self._locked():
+            stats = self._compact_locked()
+            self._write_stats(stats)
+
+        return stats
+
+    def _compact_locked(self) -> Dict:
+
+        tmp_path = f"{self.file_path}.tmp"
+        stats = self._empty_stats()
+
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for entry in self.iter_entries():
+                out.write(json.dumps(entry) + "\n")
+                self._apply(stats, entry)
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(tmp_path, self.file_path)
+
+        stats["compacted_at"] = datetime.utcnow().isoformat()
+
+        return stats
+
+    # ---------------------------
+    # Migration (JSON array -> JSONL)
+    # ---------------------------
+
+    def _migrate_legacy(self):
+        """
+        Builds the merged log in a side file, then commits by renaming
+        the legacy file away, then swaps the merged log in. A crash
+        before the commit discards the side file and migrates again;
+        a crash after it just finishes the swap. Legacy entries are
+        never appended twice.
+        """
+
+        migrating_path = f"{self.file_path}.migrating"
+        legacy_exists = os.path.exists(self.legacy_path)
+
+        if not legacy_exists:
+            # Committed before a crash: finish the swap
+            if os.path.exists(migrating_path):
+                os.replace(migrating_path, self.file_path)
+                self._write_stats(self._rebuild_stats())
+            return
+
+        with open(self.legacy_path, "r") as f:
+            try:
+                legacy = json.load(f)
+            except json.JSONDecodeError:
+                legacy = []
+
+        with open(migrating_path, "w", encoding="utf-8") as out:
+            if os.path.exists(self.file_path):
+                for entry in self.iter_entries():
+                    out.write(json.dumps(entry) + "\n")
+            for entry in legacy:
+                out.write(json.dumps(entry) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+        # Commit point. Keep the original for reference; it is not read again
+        os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
+
+        os.replace(migrating_path, self.file_path)
+
+        self._write_stats(self._rebuild_stats())
+
+    # ---------------------------
+    # Aggregates
+    # ---------------------------
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            "count": 0,
+            "rated_count": 0,
+            "rating_sum": 0,
+            "rating_histogram": {},
+            "final_score_sum": 0.0,
+            "writes_since_compaction": 0
+        }
+
+    @staticmethod
+    def _apply(stats: Dict, entry: Dict):
+
+        stats["count"] += 1
+        stats["final_score_sum"] += entry.get("final_score") or 0.0
+
+        rating = entry.get("user_rating")
+        if rating:
+            stats["rated_count"] += 1
+            stats["rating_sum"] += rating
+            key = str(rating)
+            stats["rating_histogram"][key] = stats["rating_histogram"].get(key, 0) + 1
+
+    def _rebuild_stats(self) -> Dict:
+
+        stats = self._empty_stats()
+
+        if os.path.exists(self.file_path):
+            for entry in self.iter_entries():
+                self._apply(stats, entry)
+
+        return stats
+
+    def _read_stats(self) -> Optional[Dict]:
+        try:
+            with open(self.stats_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_stats(self, stats: Dict):
+
+        # Atomic replace: readers never see a half-written sidecar
+        tmp_path = f"{self.stats_path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(stats, f)
+
+        os.replace(tmp_path, self.stats_path)
 
     # ---------------------------
     # Internal
     # ---------------------------
 
-    def _load(self):
-        with open(self.file_path, "r") as f:
-            return json.load(f)
+    @staticmethod
+    def _parse_line(line: str) -> Optional[Dict]:
+
+        line = line.strip()
+        if not line:
+            return None
+
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            # Torn write from a crashed process; dropped on compaction
+            return None
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive lock across threads (in-process) and processes
+        (fcntl on POSIX, msvcrt on Windows).
+        """
+
+        with FeedbackStore._thread_lock:
+
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            with open(self.lock_path, "a+") as lock_file:
+
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
 
-    def _save(self, data):
-        with open(self.file_path, "w") as f:
-            json.dump(data, f, indent=4)
\ No newline at end of file
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    elif msvcrt is not None:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,76 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class JudgeCache:
+    """
+    In-memory LRU cache of parsed judge verdicts.
+
+    Key = sha256(model name + judge prompt), so identical
+    prompt/response pairs judged by the same model are only
+    sent to the LLM once. Shared safely across evaluator threads.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------------------------------
+    # Keys
+    # -------------------------------------------------
+    @staticmethod
+    def make_key(model_name: str, judge_prompt: str) -> str:
+        payload = f"{model_name}\n{judge_prompt}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    # -------------------------------------------------
+    # Lookup / Store
+    # -------------------------------------------------
+    def get(self, key: str) -> Optional[Dict]:
+
+        with self._lock:
+            verdict = self._entries.get(key)
+
+            if verdict is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return copy.deepcopy(verdict)
+
+    def put(self, key: str, verdict: Dict):
+
+        with self._lock:
+            self._entries[key] = copy.deepcopy(verdict)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
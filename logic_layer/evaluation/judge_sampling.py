@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class JudgeSampler:
+    """
+    Decides which evaluations get an LLM judge call.
+
+    - default_rate: fraction of traffic judged (1.0 = everything)
+    - task_rates:   per task_type overrides, e.g. {"code": 1.0, "explanation": 0.2}
+
+    Sampling is stratified by task_type: each stratum is judged at its
+    own rate. The decision is a hash of (task_type, prompt, response),
+    so re-evaluating the same pair always gives the same answer.
+    """
+
+    def __init__(self, default_rate: float = 1.0, task_rates: Optional[Dict[str, float]] = None):
+
+        for rate in [default_rate, *(task_rates or {}).values()]:
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"Sampling rate must be in [0, 1], got {rate}")
+
+        self.default_rate = default_rate
+        self.task_rates = task_rates or {}
+
+        self._lock = threading.Lock()
+        self._seen = defaultdict(int)
+        self._judged = defaultdict(int)
+
+    def rate_for(self, task_type: Optional[str]) -> float:
+        return self.task_rates.get(task_type or "general", self.default_rate)
+
+    def should_judge(self, task_type: Optional[str], prompt: str, response: str) -> bool:
+
+        task_type = task_type or "general"
+        rate = self.rate_for(task_type)
+
+        if rate >= 1.0:
+            selected = True
+        elif rate <= 0.0:
+            selected = False
+        else:
+            digest = hashlib.sha256(
+                f"{task_type}\n{prompt}\n{response}".encode("utf-8")
+            ).digest()
+
+            # Uniform in [0, 1) from the first 8 bytes
+            selected = int.from_bytes(digest[:8], "big") / 2 ** 64 < rate
+
+        with self._lock:
+            self._seen[task_type] += 1
+            if selected:
+                self._judged[task_type] += 1
+
+        return selected
+
+    def stats(self) -> Dict:
+
+        with self._lock:
+            return {
+                task_type: {
+                    "rate": self.rate_for(task_type),
+                    "seen": seen,
+                    "judged": self._judged[task_type]
+                }
+                for task_type, seen in self._seen.items()
+            }
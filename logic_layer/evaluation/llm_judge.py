@@ -1,6 +1,20 @@
 
+import inspect
 import json
+import random
 import re
+from typing import Dict, Optional
+
+
+class JudgeParseError(ValueError):
+    """
+    Raised when the judge output cannot be parsed into scores,
+    even after retries. `usage` records the calls already spent.
+    """
+
+    def __init__(self, message: str = "", usage: Optional[Dict] = None):
+        super().__init__(message)
+        self.usage = usage
 
 
 class LLMJudge:
@@ -15,10 +29,48 @@ class LLMJudge:
     - Overall quality
 
     Returns structured numeric scores.
+
+    Modes:
+    - evaluate()          -> one response, one call
+    - evaluate_pairwise() -> two responses in one call, shown in random
+                             order to limit position bias, plus a winner
+
+    JSON-mode output is requested when the backend supports it.
+    Unparseable output is retried, then raises JudgeParseError.
+    An optional JudgeCache returns stored verdicts for judge prompts
+    already sent to the same model.
+
+    Every verdict carries "usage": {"attempts", "tokens"}, with the
+    backend-reported tokens_used of each call (None where the backend
+    does not report it), so callers can charge what retries cost.
     """
 
-    def __init__(self, llm):
+    CRITERIA = [
+        "clarity",
+        "relevance",
+        "completeness",
+        "factual_reliability",
+        "overall_quality"
+    ]
+
+    def __init__(
+        self,
+        llm,
+        json_mode: Optional[bool] = None,
+        max_retries: int = 2,
+        rng: Optional[random.Random] = None,
+        cache=None
+    ):
         self.llm = llm
+        self.cache = cache
+
+        # Auto-detect: only backends whose generate() takes json_mode
+        if json_mode is None:
+            json_mode = self._supports_json_mode(llm)
+
+        self.json_mode = json_mode
+        self.max_retries = max_retries
+        self.rng = rng or random.Random()
 
     # ----------------------------------------------------------
     # Public API
@@ -28,13 +80,117 @@ class LLMJudge:
 
         judge_prompt = self._build_judge_prompt(prompt, response)
 
-        result = self.llm.generate(judge_prompt)
+        return self._generate_parsed(judge_prompt, self._parse_output)
 
-        raw_output = result["output"]
+    def evaluate_pairwise(self, prompt: str, response_a: str, response_b: str) -> Dict:
+        """
+        Scores both responses in a single judge call.
 
-        parsed = self._parse_output(raw_output)
+        Returns:
+        {
+            "A": {criterion: score, ...},
+            "B": {criterion: score, ...},
+            "winner": "A" | "B" | "Tie",
+            "order": ["A", "B"] or ["B", "A"]  (as shown to the judge),
+            "feedback": str
+        }
+        """
 
-        return parsed
+        order = ["A", "B"]
+        if self.rng.random() < 0.5:
+            order.reverse()
+
+        shown = {"A": response_a, "B": response_b}
+
+        judge_prompt = self._build_pairwise_prompt(
+            prompt,
+            shown[order[0]],
+            shown[order[1]]
+        )
+
+        parsed = self._generate_parsed(judge_prompt, self._parse_pairwise_output)
+
+        # Map "Response 1"/"Response 2" back to A/B
+        winner = parsed["winner"]
+        if winner in ("1", "2"):
+            winner = order[int(winner) - 1]
+
+        verdict = {
+            order[0]: parsed["response_1"],
+            order[1]: parsed["response_2"],
+            "winner": winner,
+            "order": order,
+            "feedback": parsed["feedback"],
+            "usage": parsed["usage"]
+        }
+
+        if parsed.get("cached"):
+            verdict["cached"] = True
+
+        return verdict
+
+    # ----------------------------------------------------------
+    # Call + Retry
+    # ----------------------------------------------------------
+
+    def _generate_parsed(self, judge_prompt: str, parser):
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self._model_name(), judge_prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                cached["usage"] = {"attempts": 0, "tokens": []}
+                return cached
+
+        options = {"json_mode": True} if self.json_mode else {}
+
+        usage = {"attempts": 0, "tokens": []}
+        last_error = None
+
+        for _ in range(self.max_retries + 1):
+
+            result = self.llm.generate(judge_prompt, **options)
+
+            usage["attempts"] += 1
+            usage["tokens"].append(result.get("tokens_used"))
+
+            try:
+                parsed = parser(result["output"])
+            except JudgeParseError as e:
+                last_error = e
+                continue
+
+            if cache_key is not None:
+                self.cache.put(cache_key, parsed)
+
+            parsed["usage"] = usage
+
+            return parsed
+
+        raise JudgeParseError(
+            f"Judge output unparseable after {self.max_retries + 1} attempts: {last_error}",
+            usage=usage
+        )
+
+    def _model_name(self) -> str:
+        return (
+            getattr(self.llm, "model_name", None)
+            or getattr(self.llm, "model_id", None)
+            or type(self.llm).__name__
+        )
+
+    @staticmethod
+    def _supports_json_mode(llm) -> bool:
+
+        if llm is None:
+            return False
+
+        try:
+            return "json_mode" in inspect.signature(llm.generate).parameters
+        except (TypeError, ValueError, AttributeError):
+            return False
 
     # ----------------------------------------------------------
     # Judge Prompt Builder
@@ -71,6 +227,54 @@ Prompt:
 
 Response:
 {response}
+"""
+
+    def _build_pairwise_prompt(self, prompt: str, response_1: str, response_2: str):
+
+        return f"""
+You are an expert AI evaluator.
+
+Two responses to the same prompt are shown below. Evaluate each one
+independently on the following criteria, then pick the better one.
+Give each score from 1 to 10. The order of the responses is random
+and must not influence your judgement.
+
+Criteria:
+1. Clarity
+2. Relevance to prompt
+3. Completeness
+4. Factual reliability
+5. Overall quality
+
+Return ONLY a valid JSON object in this format:
+
+{{
+  "response_1": {{
+    "clarity": <number>,
+    "relevance": <number>,
+    "completeness": <number>,
+    "factual_reliability": <number>,
+    "overall_quality": <number>
+  }},
+  "response_2": {{
+    "clarity": <number>,
+    "relevance": <number>,
+    "completeness": <number>,
+    "factual_reliability": <number>,
+    "overall_quality": <number>
+  }},
+  "winner": "1" | "2" | "tie",
+  "feedback": "<brief feedback>"
+}}
+
+Prompt:
+{prompt}
+
+Response 1:
+{response_1}
+
+Response 2:
+{response_2}
 """
 
     # ----------------------------------------------------------
@@ -79,23 +283,68 @@ Response:
 
     def _parse_output(self, text: str):
 
+        parsed = self._extract_json(text)
+
+        scores = self._validate_scores(parsed)
+        scores["feedback"] = str(parsed.get("feedback", ""))
+
+        return scores
+
+    def _parse_pairwise_output(self, text: str):
+
+        parsed = self._extract_json(text)
+
+        response_1 = self._validate_scores(parsed.get("response_1"))
+        response_2 = self._validate_scores(parsed.get("response_2"))
+
+        winner = str(parsed.get("winner", "")).strip().lower()
+        winner = winner.replace("response", "").strip()
+
+        if winner not in ("1", "2", "tie"):
+            raise JudgeParseError(f"Invalid winner: {parsed.get('winner')!r}")
+
+        return {
+            "response_1": response_1,
+            "response_2": response_2,
+            "winner": "Tie" if winner == "tie" else winner,
+            "feedback": str(parsed.get("feedback", ""))
+        }
+
+    @staticmethod
+    def _extract_json(text: str) -> Dict:
+
+        # Extract JSON block from text
+        json_match = re.search(r"\{.*\}", text or "", re.DOTALL)
+
+        if not json_match:
+            raise JudgeParseError("No JSON detected")
+
         try:
-            # Extract JSON block from text
-            json_match = re.search(r"\{.*\}", text, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-            else:
-                raise ValueError("No JSON detected")
-
-        except Exception:
-            # Fallback default
-            parsed = {
-                "clarity": 5,
-                "relevance": 5,
-                "completeness": 5,
-                "factual_reliability": 5,
-                "overall_quality": 5,
-                "feedback": "Parsing failed. Default scores applied."
-            }
-
-        return parsed
\ No newline at end of file
+            parsed = json.loads(json_match.group())
+        except json.JSONDecodeError as e:
+            raise JudgeParseError(f"Invalid JSON: {e}") from e
+
+        if not isinstance(parsed, dict):
+            raise JudgeParseError("Judge output is not a JSON object")
+
+        return parsed
+
+    def _validate_scores(self, block) -> Dict:
+
+        if not isinstance(block, dict):
+            raise JudgeParseError("Missing score block")
+
+        scores = {}
+
+        for criterion in self.CRITERIA:
+            try:
+                value = float(block[criterion])
+            except (KeyError, TypeError, ValueError):
+                raise JudgeParseError(f"Missing or non-numeric score: {criterion}")
+
+            if not 1 <= value <= 10:
+                raise JudgeParseError(f"Score out of range for {criterion}: {value}")
+
+            scores[criterion] = value
+
+        return scores
@@ -1,5 +1,43 @@
+import json
+import math
+import os
 from typing import Dict, Optional
 
+import numpy as np
+
+
+# Versioned weight artifacts written by evaluation/weight_fitting.py
+WEIGHTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "weights")
+
+# Optional explicit artifact path (overrides the latest version)
+WEIGHTS_PATH_ENV = "SRPP_AGGREGATION_WEIGHTS"
+
+
+def weights_artifact_versions(weights_dir: str = WEIGHTS_DIR) -> Dict[int, str]:
+    """
+    {version: path} for aggregation_weights.v<N>.json files.
+    """
+
+    if not os.path.isdir(weights_dir):
+        return {}
+
+    versions = {}
+    for name in os.listdir(weights_dir):
+        if name.startswith("aggregation_weights.v") and name.endswith(".json"):
+            try:
+                versions[int(name.split(".")[1][1:])] = os.path.join(weights_dir, name)
+            except ValueError:
+                continue
+
+    return versions
+
+
+def latest_weights_artifact(weights_dir: str = WEIGHTS_DIR) -> Optional[str]:
+
+    versions = weights_artifact_versions(weights_dir)
+
+    return versions[max(versions)] if versions else None
+
 
 class AggregationEngine:
     """
@@ -15,22 +53,99 @@ class AggregationEngine:
     Produces:
     - Normalized component scores
     - Final composite score
+
+    Without explicit weights, the latest fitted weights artifact
+    (see weight_fitting.py) is used when present, else the defaults.
+    It is read once per process; reload_weights() re-reads it. An
+    unreadable or invalid artifact is reported and the defaults kept.
     """
 
+    DEFAULT_WEIGHTS = {
+        "prompt": 0.20,
+        "primitive": 0.15,
+        "response": 0.25,
+        "semantic": 0.20,
+        "judge": 0.20
+    }
+
+    _fitted = None          # {"version", "weights", ...} or None
+    _fitted_loaded = False
+
     # ============================================================
     # INITIALIZATION
     # ============================================================
 
     def __init__(self, weights: Optional[Dict] = None):
 
-        # Default weights (can tune experimentally)
-        self.weights = weights or {
-            "prompt": 0.20,
-            "primitive": 0.15,
-            "response": 0.25,
-            "semantic": 0.20,
-            "judge": 0.20
-        }
+        self.weights = weights or self.startup_weights()
+
+    # ============================================================
+    # FITTED WEIGHTS
+    # ============================================================
+
+    @classmethod
+    def reload_weights(cls) -> Optional[Dict]:
+
+        path = os.getenv(WEIGHTS_PATH_ENV) or latest_weights_artifact()
+
+        cls._fitted = None
+        if path:
+            try:
+                with open(path, "r") as f:
+                    fitted = json.load(f)
+                cls._validate_artifact(fitted)
+                cls._fitted = fitted
+            except (OSError, json.JSONDecodeError, ValueError) as e:
+                print(f"⚠️ Ignoring aggregation weights artifact {path}: {e}. Using default weights.")
+
+        cls._fitted_loaded = True
+
+        return cls._fitted
+
+    @classmethod
+    def _validate_artifact(cls, fitted) -> None:
+
+        if not isinstance(fitted, dict) or not isinstance(fitted.get("weights"), dict):
+            raise ValueError("missing weights")
+
+        if not isinstance(fitted.get("version"), int):
+            raise ValueError("missing version")
+
+        weights = fitted["weights"]
+
+        if set(weights) != set(cls.DEFAULT_WEIGHTS):
+            raise ValueError(f"expected weights for {sorted(cls.DEFAULT_WEIGHTS)}, got {sorted(weights)}")
+
+        for name, value in weights.items():
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or not math.isfinite(value)
+                or value < 0
+            ):
+                raise ValueError(f"invalid weight for {name}: {value!r}")
+
+        if sum(weights.values()) <= 0:
+            raise ValueError("weights sum to zero")
+
+    @classmethod
+    def startup_weights(cls) -> Dict:
+
+        if not cls._fitted_loaded:
+            cls.reload_weights()
+
+        weights = cls._fitted["weights"] if cls._fitted else cls.DEFAULT_WEIGHTS
+
+        # Copy: callers such as PolicyUpdater mutate their weights
+        return dict(weights)
+
+    @classmethod
+    def weights_version(cls) -> Optional[int]:
+
+        if not cls._fitted_loaded:
+            cls.reload_weights()
+
+        return cls._fitted["version"] if cls._fitted else None
 
     # ============================================================
     # PUBLIC ENTRY
@@ -54,25 +169,96 @@ class AggregationEngine:
         semantic_score = self._score_semantic(metrics_bundle.get("semantic_metrics", {}))
         judge_score = self._score_judge(metrics_bundle.get("judge_metrics", {}))
 
-        final_score = (
+        weighted_sum = (
             self.weights["prompt"] * prompt_score +
             self.weights["primitive"] * primitive_score +
             self.weights["response"] * response_score +
-            self.weights["semantic"] * semantic_score +
-            self.weights["judge"] * judge_score
+            self.weights["semantic"] * semantic_score
         )
 
+        judge_missing = judge_score is None
+
+        if judge_missing:
+            # Not judged (judge disabled, sampled out, parse error):
+            # rescale so the remaining weights carry the full score
+            remaining = sum(w for name, w in self.weights.items() if name != "judge")
+            total = remaining + self.weights["judge"]
+            final_score = weighted_sum * total / remaining if remaining > 0 else 0.0
+        else:
+            final_score = weighted_sum + self.weights["judge"] * judge_score
+
         return {
             "component_scores": {
                 "prompt_score": round(prompt_score, 4),
                 "primitive_score": round(primitive_score, 4),
                 "response_score": round(response_score, 4),
                 "semantic_score": round(semantic_score, 4),
-                "judge_score": round(judge_score, 4)
+                "judge_score": None if judge_missing else round(judge_score, 4)
             },
+            "judge_missing": judge_missing,
             "final_composite_score": round(final_score, 4)
         }
 
+    # ============================================================
+    # VECTORIZED RE-SCORING
+    # ============================================================
+
+    # Column order of component matrices
+    COMPONENTS = ["prompt", "primitive", "response", "semantic", "judge"]
+
+    def rescore_matrix(self, components: np.ndarray) -> np.ndarray:
+        """
+        Final scores for many stored evaluations at once.
+
+        components: (n, 5) array of component scores in COMPONENTS
+        order, with NaN in the judge column where no verdict exists.
+        Matches compute_final_score, including the judge-missing
+        rescaling.
+        """
+
+        weights = np.array([self.weights[name] for name in self.COMPONENTS], dtype=np.float64)
+
+        judge_missing = np.isnan(components[:, -1])
+
+        scores = np.nan_to_num(components, nan=0.0) @ weights
+
+        remaining = weights[:-1].sum()
+        if remaining > 0:
+            scores[judge_missing] *= weights.sum() / remaining
+        else:
+            scores[judge_missing] = 0.0
+
+        return np.round(scores, 4)
+
+    # ============================================================
+    # SCORE BOUNDS (JUDGE PENDING)
+    # ============================================================
+
+    # Range a judge verdict can map to
+    JUDGE_SCORE_RANGE = (0.0, 1.0)
+
+    def score_bounds(self, metrics_bundle: Dict) -> Dict:
+        """
+        Bounds on the final composite score before the judge has run.
+
+        The deterministic and semantic components are fixed; only the
+        judge term can still move the score, within its weight.
+        """
+
+        partial_score = (
+            self.weights["prompt"] * self._score_prompt(metrics_bundle.get("prompt_metrics", {})) +
+            self.weights["primitive"] * self._score_primitive(metrics_bundle.get("primitive_metrics", {})) +
+            self.weights["response"] * self._score_response(metrics_bundle.get("response_metrics", {})) +
+            self.weights["semantic"] * self._score_semantic(metrics_bundle.get("semantic_metrics", {}))
+        )
+
+        low, high = self.JUDGE_SCORE_RANGE
+
+        return {
+            "lower": round(partial_score + self.weights["judge"] * low, 4),
+            "upper": round(partial_score + self.weights["judge"] * high, 4)
+        }
+
     # ============================================================
     # PROMPT SCORE
     # ============================================================
@@ -132,9 +318,10 @@ class AggregationEngine:
     # JUDGE SCORE
     # ============================================================
 
-    def _score_judge(self, judge_metrics: Dict) -> float:
+    def _score_judge(self, judge_metrics: Dict) -> Optional[float]:
 
+        # None = no verdict; handled by renormalizing the weights
         if not judge_metrics or "overall_quality" not in judge_metrics:
-            return 0
+            return None
 
         return min(judge_metrics["overall_quality"] / 10, 1.0)
\ No newline at end of file
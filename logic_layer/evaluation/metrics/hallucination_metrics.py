@@ -1,6 +1,7 @@
-import re
 from typing import Dict
 
+from .lexical_scanner import scan, count_markers, OVERCONFIDENCE_MARKERS
+
 
 class HallucinationMetrics:
     """
@@ -9,24 +10,16 @@ class HallucinationMetrics:
 
     def compute(self, response: str) -> Dict:
 
-        overconfidence_markers = [
-            "definitely", "always", "guaranteed",
-            "never fails", "proven fact"
-        ]
+        response_scan = scan(response)
 
-        marker_count = sum(
-            1 for m in overconfidence_markers
-            if m in response.lower()
-        )
+        marker_count = count_markers(response_scan, OVERCONFIDENCE_MARKERS)
 
         numeric_density = (
-            len(re.findall(r"\d+", response))
-            / max(len(response.split()), 1)
+            response_scan["number_count"]
+            / max(response_scan["word_count"], 1)
         )
 
-        citation_presence = bool(
-            re.search(r"\[\w+,\s*\d{4}\]", response)
-        )
+        citation_presence = response_scan["citation_detected"]
 
         hallucination_risk_score = (
             marker_count * 0.3
@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+from typing import Dict
+
+
+# ============================================================
+# MARKER VOCABULARIES (shared by the metric classes)
+# ============================================================
+
+INSTRUCTION_VERBS = (
+    "explain", "describe", "list", "analyze",
+    "compare", "generate", "create", "summarize"
+)
+
+CONSTRAINT_MARKERS = (
+    "must", "only", "strictly", "limit",
+    "format", "do not", "avoid", "ensure"
+)
+
+CONDITIONAL_WORDS = ("if", "when", "unless")
+
+# ResponseMetrics hallucination proxies
+RESPONSE_OVERCONFIDENCE_MARKERS = (
+    "definitely", "always", "guaranteed", "proven"
+)
+
+# HallucinationMetrics
+OVERCONFIDENCE_MARKERS = (
+    "definitely", "always", "guaranteed",
+    "never fails", "proven fact"
+)
+
+TRANSITION_PHRASES = (
+    "however", "therefore", "in addition",
+    "for example", "on the other hand"
+)
+
+ALL_MARKERS = tuple(dict.fromkeys(
+    INSTRUCTION_VERBS
+    + CONSTRAINT_MARKERS
+    + CONDITIONAL_WORDS
+    + RESPONSE_OVERCONFIDENCE_MARKERS
+    + OVERCONFIDENCE_MARKERS
+    + TRANSITION_PHRASES
+))
+
+
+# ============================================================
+# COMPILED PATTERNS
+# ============================================================
+
+# One pass for every structural / numeric feature. Groups:
+#   1 digits of a numbered line "\n12."   2 bullet "\n- "   3 star "\n*"
+#   4 any other digit run "12"           5 its trailing "." if present
+#   6 code fence "```"
+# Every maximal digit run is captured exactly once (group 1 or 4), so
+# the two together equal len(re.findall(r"\d+", text)). The leading
+# lookahead lets positions that cannot start a feature fail fast.
+STRUCTURE_PATTERN = re.compile(
+    r"(?=[\n\d`])(?:\n(?:(\d+)\.|(- )|(\*))|(\d+)(\.?)|(```))"
+)
+
+SENTENCE_SPLIT = re.compile(r"[.!?]")
+
+CITATION_PATTERN = re.compile(r"\[\w+,\s*\d{4}\]")
+
+
+# ============================================================
+# SCANNER
+# ============================================================
+
+@lru_cache(maxsize=512)
+def scan(text: str) -> Dict:
+    """
+    Lexical features of `text`, computed once and shared by
+    PromptMetrics, ResponseMetrics and HallucinationMetrics.
+
+    Results are cached per text (the same prompt is scanned by
+    several metric families); treat the returned dict as read-only.
+
+    Marker presence uses the same substring semantics as before
+    ("if" matches inside "different"), checked against a single
+    lowercased copy of the text.
+    """
+
+    lower = text.lower()
+    words = lower.split()
+
+    matches = STRUCTURE_PATTERN.findall(text)
+
+    if matches:
+        # Column-wise counts of non-empty captures (no per-match Python work)
+        line_nums, bullets, stars, nums, dots, fences = (
+            len(column) - column.count("") for column in zip(*matches)
+        )
+    else:
+        line_nums = bullets = stars = nums = dots = fences = 0
+
+    sentence_count = 0
+    sentence_words = 0
+
+    for sentence in SENTENCE_SPLIT.split(text):
+        if sentence.strip():
+            sentence_count += 1
+            sentence_words += len(sentence.split())
+
+    return {
+        "markers": frozenset(m for m in ALL_MARKERS if m in lower),
+        "word_count": len(words),
+        "word_set": frozenset(words),
+        "newline_count": text.count("\n"),
+
+        # "\n12." (numbered list lines)
+        "numbered_line_markers": line_nums,
+        # "12." anywhere, including list lines
+        "numbered_markers": line_nums + dots,
+        # every digit run
+        "number_count": line_nums + nums,
+
+        "bullet_markers": bullets,
+        "star_markers": stars,
+        "code_fences": fences,
+        "list_markers": line_nums + bullets + stars,
+
+        "sentence_count": sentence_count,
+        "sentence_word_count": sentence_words,
+
+        "citation_detected": bool(CITATION_PATTERN.search(text))
+    }
+
+
+def count_markers(text_scan: Dict, markers) -> int:
+    present = text_scan["markers"]
+    return sum(1 for m in markers if m in present)
@@ -1,6 +1,13 @@
-import difflib
-import re
-from typing import Dict
+from typing import Dict, Optional
+
+from .lexical_scanner import (
+    scan,
+    count_markers,
+    INSTRUCTION_VERBS,
+    CONSTRAINT_MARKERS,
+    CONDITIONAL_WORDS
+)
+from .similarity import SimilarityEngine, get_similarity_engine
 
 
 class PromptMetrics:
@@ -11,8 +18,19 @@ class PromptMetrics:
     This module focuses ONLY on prompt-level changes.
     No LLM dependency.
     Deterministic + fast.
+
+    Lexical features come from the shared single-pass scanner.
+
+    Similarity between the prompts is computed once per pair by a
+    pluggable engine (see similarity.py). The default "difflib" is the
+    character ratio the 0.3/0.5 risk thresholds were set against;
+    "char" and "token" (bit-parallel LCS) are faster but score
+    differently, so they are opt-in.
     """
 
+    def __init__(self, similarity: str = "difflib", engine: Optional[SimilarityEngine] = None):
+        self.similarity_engine = engine or get_similarity_engine(similarity)
+
     # ============================================================
     # PUBLIC ENTRY POINT
     # ============================================================
@@ -22,14 +40,16 @@ class PromptMetrics:
         Returns structured prompt evaluation metrics.
         """
 
+        similarity = self.similarity_engine.ratio(original, optimized)
+
         return {
             "length_metrics": self._length_metrics(original, optimized),
-            "structural_metrics": self._structural_metrics(original, optimized),
+            "structural_metrics": self._structural_metrics(original, optimized, similarity),
             "instruction_metrics": self._instruction_metrics(original, optimized),
             "constraint_metrics": self._constraint_metrics(original, optimized),
             "formatting_metrics": self._formatting_metrics(original, optimized),
             "specificity_metrics": self._specificity_metrics(original, optimized),
-            "over_modification_risk": self._over_modification_score(original, optimized)
+            "over_modification_risk": self._over_modification_score(original, optimized, similarity)
         }
 
     # ============================================================
@@ -37,8 +57,8 @@ class PromptMetrics:
     # ============================================================
 
     def _length_metrics(self, original: str, optimized: str) -> Dict:
-        orig_len = len(original.split())
-        opt_len = len(optimized.split())
+        orig_len = scan(original)["word_count"]
+        opt_len = scan(optimized)["word_count"]
 
         return {
             "original_word_count": orig_len,
@@ -51,13 +71,16 @@ class PromptMetrics:
     # STRUCTURAL TRANSFORMATION
     # ============================================================
 
-    def _structural_metrics(self, original: str, optimized: str) -> Dict:
-        similarity = difflib.SequenceMatcher(None, original, optimized).ratio()
+    def _structural_metrics(self, original: str, optimized: str, similarity: Optional[float] = None) -> Dict:
+
+        if similarity is None:
+            similarity = self.similarity_engine.ratio(original, optimized)
 
         return {
             "similarity_ratio": round(similarity, 4),
+            "similarity_engine": self.similarity_engine.name,
             "structural_change_score": round(1 - similarity, 4),
-            "line_count_change": optimized.count("\n") - original.count("\n")
+            "line_count_change": scan(optimized)["newline_count"] - scan(original)["newline_count"]
         }
 
     # ============================================================
@@ -65,13 +88,9 @@ class PromptMetrics:
     # ============================================================
 
     def _instruction_metrics(self, original: str, optimized: str) -> Dict:
-        instruction_verbs = [
-            "explain", "describe", "list", "analyze",
-            "compare", "generate", "create", "summarize"
-        ]
 
         def count_verbs(text):
-            return sum(1 for v in instruction_verbs if v in text.lower())
+            return count_markers(scan(text), INSTRUCTION_VERBS)
 
         return {
             "original_instruction_count": count_verbs(original),
@@ -85,13 +104,9 @@ class PromptMetrics:
     # ============================================================
 
     def _constraint_metrics(self, original: str, optimized: str) -> Dict:
-        constraint_markers = [
-            "must", "only", "strictly", "limit",
-            "format", "do not", "avoid", "ensure"
-        ]
 
         def count_constraints(text):
-            return sum(1 for c in constraint_markers if c in text.lower())
+            return count_markers(scan(text), CONSTRAINT_MARKERS)
 
         return {
             "original_constraint_count": count_constraints(original),
@@ -105,15 +120,11 @@ class PromptMetrics:
     # ============================================================
 
     def _formatting_metrics(self, original: str, optimized: str) -> Dict:
-        formatting_patterns = [
-            r"\n\d+\.",   # numbered lists
-            r"\n- ",      # bullet points
-            r"\n\*",      # star bullets
-            r"```",       # code blocks
-        ]
 
+        # numbered lists, bullet points, star bullets, code blocks
         def count_format_patterns(text):
-            return sum(len(re.findall(p, text)) for p in formatting_patterns)
+            text_scan = scan(text)
+            return text_scan["list_markers"] + text_scan["code_fences"]
 
         return {
             "original_format_markers": count_format_patterns(original),
@@ -135,10 +146,10 @@ class PromptMetrics:
         """
 
         def count_numbers(text):
-            return len(re.findall(r"\d+", text))
+            return scan(text)["number_count"]
 
         def count_conditionals(text):
-            return sum(1 for w in ["if", "when", "unless"] if w in text.lower())
+            return count_markers(scan(text), CONDITIONAL_WORDS)
 
         return {
             "number_delta": count_numbers(optimized) - count_numbers(original),
@@ -150,13 +161,14 @@ class PromptMetrics:
     # OVER-MODIFICATION DETECTION
     # ============================================================
 
-    def _over_modification_score(self, original: str, optimized: str) -> float:
+    def _over_modification_score(self, original: str, optimized: str, similarity: Optional[float] = None) -> float:
         """
         If similarity drops too low, we risk changing intent.
         This flags aggressive transformations.
         """
 
-        similarity = difflib.SequenceMatcher(None, original, optimized).ratio()
+        if similarity is None:
+            similarity = self.similarity_engine.ratio(original, optimized)
 
         if similarity < 0.3:
             return 1.0  # High risk
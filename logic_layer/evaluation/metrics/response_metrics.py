@@ -1,6 +1,13 @@
-import re
 from typing import Dict
 
+from .lexical_scanner import (
+    scan,
+    count_markers,
+    INSTRUCTION_VERBS,
+    RESPONSE_OVERCONFIDENCE_MARKERS,
+    TRANSITION_PHRASES
+)
+
 
 class ResponseMetrics:
     """
@@ -8,6 +15,8 @@ class ResponseMetrics:
     original and optimized responses.
 
     Deterministic evaluation only.
+
+    Lexical features come from the shared single-pass scanner.
     """
 
     # ============================================================
@@ -38,8 +47,8 @@ class ResponseMetrics:
 
     def _length_metrics(self, original: str, optimized: str) -> Dict:
 
-        orig_len = len(original.split())
-        opt_len = len(optimized.split())
+        orig_len = scan(original)["word_count"]
+        opt_len = scan(optimized)["word_count"]
 
         return {
             "original_word_count": orig_len,
@@ -53,13 +62,13 @@ class ResponseMetrics:
 
     def _structure_metrics(self, original: str, optimized: str) -> Dict:
 
-        def count_lists(text):
-            return len(re.findall(r"\n\d+\.|\n- |\n\*", text))
+        original_scan = scan(original)
+        optimized_scan = scan(optimized)
 
         return {
-            "paragraph_delta": optimized.count("\n") - original.count("\n"),
-            "list_structure_delta": count_lists(optimized) - count_lists(original),
-            "code_block_presence": "```" in optimized
+            "paragraph_delta": optimized_scan["newline_count"] - original_scan["newline_count"],
+            "list_structure_delta": optimized_scan["list_markers"] - original_scan["list_markers"],
+            "code_block_presence": optimized_scan["code_fences"] > 0
         }
 
     # ============================================================
@@ -68,8 +77,8 @@ class ResponseMetrics:
 
     def _relevance_metrics(self, prompt: str, response: str) -> Dict:
 
-        prompt_words = set(prompt.lower().split())
-        response_words = set(response.lower().split())
+        prompt_words = scan(prompt)["word_set"]
+        response_words = scan(response)["word_set"]
 
         overlap = prompt_words.intersection(response_words)
 
@@ -85,17 +94,15 @@ class ResponseMetrics:
 
     def _instruction_adherence(self, prompt: str, response: str) -> Dict:
 
-        instruction_verbs = [
-            "explain", "describe", "list", "analyze",
-            "compare", "generate", "create", "summarize"
-        ]
+        prompt_markers = scan(prompt)["markers"]
+        response_markers = scan(response)["markers"]
 
         prompt_instructions = [
-            v for v in instruction_verbs if v in prompt.lower()
+            v for v in INSTRUCTION_VERBS if v in prompt_markers
         ]
 
         adherence_hits = sum(
-            1 for v in prompt_instructions if v in response.lower()
+            1 for v in prompt_instructions if v in response_markers
         )
 
         adherence_score = (
@@ -117,17 +124,17 @@ class ResponseMetrics:
         Estimates whether structured subtasks were addressed.
         """
 
-        numbered_tasks = re.findall(r"\d+\.", prompt)
+        numbered_tasks = scan(prompt)["numbered_markers"]
 
         if not numbered_tasks:
             return {"task_completion_estimate": None}
 
-        completed_sections = len(re.findall(r"\n\d+\.", response))
+        completed_sections = scan(response)["numbered_line_markers"]
 
-        completion_ratio = completed_sections / len(numbered_tasks)
+        completion_ratio = completed_sections / numbered_tasks
 
         return {
-            "expected_sections": len(numbered_tasks),
+            "expected_sections": numbered_tasks,
             "detected_sections": completed_sections,
             "task_completion_estimate": round(completion_ratio, 4)
         }
@@ -138,18 +145,13 @@ class ResponseMetrics:
 
     def _hallucination_proxies(self, response: str) -> Dict:
 
-        overconfidence_markers = [
-            "definitely", "always", "guaranteed", "proven"
-        ]
+        response_scan = scan(response)
 
-        marker_count = sum(
-            1 for m in overconfidence_markers
-            if m in response.lower()
-        )
+        marker_count = count_markers(response_scan, RESPONSE_OVERCONFIDENCE_MARKERS)
 
         numeric_density = (
-            len(re.findall(r"\d+", response)) /
-            max(len(response.split()), 1)
+            response_scan["number_count"] /
+            max(response_scan["word_count"], 1)
         )
 
         return {
@@ -163,15 +165,7 @@ class ResponseMetrics:
 
     def _coherence_indicators(self, response: str) -> Dict:
 
-        transitional_phrases = [
-            "however", "therefore", "in addition",
-            "for example", "on the other hand"
-        ]
-
-        transition_count = sum(
-            1 for t in transitional_phrases
-            if t in response.lower()
-        )
+        transition_count = count_markers(scan(response), TRANSITION_PHRASES)
 
         avg_sentence_length = self._avg_sentence_length(response)
 
@@ -182,12 +176,9 @@ class ResponseMetrics:
 
     def _avg_sentence_length(self, text: str) -> float:
 
-        sentences = re.split(r"[.!?]", text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        text_scan = scan(text)
 
-        if not sentences:
+        if not text_scan["sentence_count"]:
             return 0
 
-        total_words = sum(len(s.split()) for s in sentences)
-
-        return total_words / len(sentences)
\ No newline at end of file
+        return text_scan["sentence_word_count"] / text_scan["sentence_count"]
\ No newline at end of file
@@ -1,4 +1,6 @@
-from typing import Dict
+import threading
+from typing import Dict, List, Optional
+
 import numpy as np
 
 try:
@@ -16,15 +18,22 @@ class SemanticMetrics:
     - Response improvement
     - Prompt-response alignment
     - Semantic drift detection
+
+    All distinct texts are encoded in a single batched call with
+    normalized embeddings, so cosine similarity is a dot product.
+    Embeddings computed upstream can be passed in (keyed by text)
+    and are not re-encoded.
     """
 
-    _model = None  # shared across instances
+    # Loaded models shared across instances, one per model name
+    _models = {}
+    _models_lock = threading.Lock()
 
     # ============================================================
     # INITIALIZATION
     # ============================================================
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 64):
 
         if SentenceTransformer is None:
             raise ImportError(
@@ -32,10 +41,14 @@ class SemanticMetrics:
                 "Run: pip install sentence-transformers"
             )
 
-        if SemanticMetrics._model is None:
-            SemanticMetrics._model = SentenceTransformer(model_name)
+        with SemanticMetrics._models_lock:
+            if model_name not in SemanticMetrics._models:
+                SemanticMetrics._models[model_name] = SentenceTransformer(model_name)
+
+            self.model = SemanticMetrics._models[model_name]
 
-        self.model = SemanticMetrics._model
+        self.model_name = model_name
+        self.batch_size = batch_size
 
     # ============================================================
     # PUBLIC ENTRY
@@ -46,42 +59,127 @@ class SemanticMetrics:
         original_prompt: str,
         optimized_prompt: str,
         original_response: str,
-        optimized_response: str
+        optimized_response: str,
+        embeddings: Optional[Dict[str, object]] = None
     ) -> Dict:
 
-        prompt_similarity = self._cosine(original_prompt, optimized_prompt)
-        response_similarity = self._cosine(original_response, optimized_response)
+        vectors = self.encode(
+            [original_prompt, optimized_prompt, original_response, optimized_response],
+            precomputed=embeddings
+        )
+
+        prompt_similarity = self._cosine(vectors[original_prompt], vectors[optimized_prompt])
+        response_similarity = self._cosine(vectors[original_response], vectors[optimized_response])
 
         prompt_response_alignment = self._cosine(
-            optimized_prompt,
-            optimized_response
+            vectors[optimized_prompt],
+            vectors[optimized_response]
         )
 
-        semantic_drift = 1 - prompt_similarity
+        return self._format(prompt_similarity, response_similarity, prompt_response_alignment)
 
-        return {
-            "prompt_semantic_similarity": round(prompt_similarity, 4),
-            "response_semantic_similarity": round(response_similarity, 4),
-            "prompt_response_alignment": round(prompt_response_alignment, 4),
-            "semantic_drift_score": round(semantic_drift, 4)
+    def compute_many(self, records: List[Dict]) -> List[Dict]:
+        """
+        Vectorized bulk evaluation.
+
+        records: [{"original_prompt", "optimized_prompt",
+                   "original_response", "optimized_response"}, ...]
+
+        Every distinct text across all records is encoded once.
+        """
+
+        if not records:
+            return []
+
+        fields = ["original_prompt", "optimized_prompt", "original_response", "optimized_response"]
+
+        vectors = self.encode([r[f] for r in records for f in fields])
+
+        texts = list(vectors)
+        index = {text: i for i, text in enumerate(texts)}
+        matrix = np.stack([vectors[text] for text in texts])
+
+        def rows(field):
+            return matrix[[index[r[field]] for r in records]]
+
+        original_prompts = rows("original_prompt")
+        optimized_prompts = rows("optimized_prompt")
+        original_responses = rows("original_response")
+        optimized_responses = rows("optimized_response")
+
+        prompt_similarity = np.einsum("ij,ij->i", original_prompts, optimized_prompts)
+        response_similarity = np.einsum("ij,ij->i", original_responses, optimized_responses)
+        alignment = np.einsum("ij,ij->i", optimized_prompts, optimized_responses)
+
+        return [
+            self._format(float(p), float(r), float(a))
+            for p, r, a in zip(prompt_similarity, response_similarity, alignment)
+        ]
+
+    # ============================================================
+    # BATCHED ENCODING
+    # ============================================================
+
+    def encode(
+        self,
+        texts: List[str],
+        precomputed: Optional[Dict[str, object]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns {text: unit-length embedding} for every distinct text.
+        Only texts missing from `precomputed` are sent to the model.
+        """
+
+        precomputed = precomputed or {}
+        distinct = list(dict.fromkeys(texts))
+
+        vectors = {
+            text: self._normalize(precomputed[text])
+            for text in distinct
+            if text in precomputed
         }
 
+        missing = [text for text in distinct if text not in vectors]
+
+        if missing:
+            encoded = self.model.encode(
+                missing,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            )
+            vectors.update(zip(missing, encoded))
+
+        return vectors
+
     # ============================================================
     # COSINE SIMILARITY
     # ============================================================
 
-    def _cosine(self, text_a: str, text_b: str) -> float:
+    def _cosine(self, vec_a: np.ndarray, vec_b: np.ndarray) -> float:
+        # Inputs are unit length (or zero); dot product is the cosine
+        return float(np.dot(vec_a, vec_b))
 
-        embeddings = self.model.encode([text_a, text_b])
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
 
-        vec_a, vec_b = embeddings[0], embeddings[1]
+        # Accept torch tensors produced with convert_to_tensor=True
+        if hasattr(vector, "detach"):
+            vector = vector.detach().cpu().numpy()
 
-        numerator = np.dot(vec_a, vec_b)
-        denominator = (
-            np.linalg.norm(vec_a) * np.linalg.norm(vec_b)
-        )
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+
+        return vector / norm if norm else vector
 
-        if denominator == 0:
-            return 0.0
+    @staticmethod
+    def _format(prompt_similarity: float, response_similarity: float, alignment: float) -> Dict:
 
-        return float(numerator / denominator)
\ No newline at end of file
+        semantic_drift = 1 - prompt_similarity
+
+        return {
+            "prompt_semantic_similarity": round(prompt_similarity, 4),
+            "response_semantic_similarity": round(response_similarity, 4),
+            "prompt_response_alignment": round(alignment, 4),
+            "semantic_drift_score": round(semantic_drift, 4)
+        }
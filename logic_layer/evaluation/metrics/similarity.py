@@ -0,0 +1,156 @@
+import difflib
+import re
+from collections import Counter
+from typing import List, Sequence
+
+
+class SimilarityEngine:
+    """
+    Pluggable sequence similarity for prompt comparison.
+
+    ratio()       -> similarity in [0, 1]
+    upper_bound() -> cheap O(n) bound, ratio() <= upper_bound()
+    at_least()    -> threshold test that skips the exact computation
+                     when the bound already rules it out
+    """
+
+    name = "base"
+
+    def ratio(self, a: str, b: str) -> float:
+        raise NotImplementedError
+
+    def upper_bound(self, a: str, b: str) -> float:
+        # Length bound: no sequence pair can match more than the shorter one
+        total = len(a) + len(b)
+        return 2 * min(len(a), len(b)) / total if total else 1.0
+
+    def at_least(self, a: str, b: str, threshold: float) -> bool:
+        if self.upper_bound(a, b) < threshold:
+            return False
+        return self.ratio(a, b) >= threshold
+
+
+class DifflibSimilarity(SimilarityEngine):
+    """
+    Legacy character-level difflib ratio (worst-case quadratic).
+    """
+
+    name = "difflib"
+
+    def ratio(self, a: str, b: str) -> float:
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+    def upper_bound(self, a: str, b: str) -> float:
+        return difflib.SequenceMatcher(None, a, b).real_quick_ratio()
+
+
+class BitParallelLCSSimilarity(SimilarityEngine):
+    """
+    Token-level (or character-level) LCS similarity:
+
+        ratio = 2 * LCS(a, b) / (len(a) + len(b))
+
+    LCS length uses the bit-parallel algorithm of Allison-Dix / Hyyrö:
+    one row of the DP table is held in a single integer, so each
+    token of `a` costs a handful of big-int operations over len(b)
+    bits - O(len(a) * len(b) / word size) with no Python-level
+    inner loop.
+
+    The upper bound is the multiset overlap of tokens, since a
+    common subsequence can use each token at most min(count) times.
+    """
+
+    TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+    def __init__(self, level: str = "token"):
+
+        if level not in {"token", "char"}:
+            raise ValueError(f"Unsupported level: {level}")
+
+        self.level = level
+        self.name = f"bitparallel-{level}"
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def ratio(self, a: str, b: str) -> float:
+
+        if a == b:
+            return 1.0
+
+        tokens_a, tokens_b = self.tokenize(a), self.tokenize(b)
+
+        total = len(tokens_a) + len(tokens_b)
+        if not total:
+            return 1.0
+
+        return 2 * self.lcs_length(tokens_a, tokens_b) / total
+
+    def upper_bound(self, a: str, b: str) -> float:
+
+        tokens_a, tokens_b = self.tokenize(a), self.tokenize(b)
+
+        total = len(tokens_a) + len(tokens_b)
+        if not total:
+            return 1.0
+
+        overlap = sum((Counter(tokens_a) & Counter(tokens_b)).values())
+
+        return 2 * overlap / total
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def tokenize(self, text: str) -> Sequence[str]:
+        if self.level == "char":
+            return text
+        return self.TOKEN_PATTERN.findall(text)
+
+    @staticmethod
+    def lcs_length(a: Sequence, b: Sequence) -> int:
+
+        # Iterate over the longer sequence, keep the shorter as bits
+        if len(a) < len(b):
+            a, b = b, a
+
+        if not b:
+            return 0
+
+        # Bit j of masks[token] is set where b[j] == token
+        masks = {}
+        for j, token in enumerate(b):
+            masks[token] = masks.get(token, 0) | (1 << j)
+
+        full = (1 << len(b)) - 1
+        row = full
+
+        for token in a:
+            match = masks.get(token)
+            if match is None:
+                continue
+            u = row & match
+            row = ((row + u) | (row - u)) & full
+
+        # Zero bits in the final row = LCS length
+        return len(b) - bin(row).count("1")
+
+
+ENGINES = {
+    "difflib": DifflibSimilarity,
+    "token": lambda: BitParallelLCSSimilarity("token"),
+    "char": lambda: BitParallelLCSSimilarity("char"),
+}
+
+
+def get_similarity_engine(name: str = "difflib") -> SimilarityEngine:
+
+    if name not in ENGINES:
+        raise ValueError(f"Unknown similarity engine: {name}. Choose from {sorted(ENGINES)}")
+
+    return ENGINES[name]()
+
+
+def available_engines() -> List[str]:
+    return sorted(ENGINES)
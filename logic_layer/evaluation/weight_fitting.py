@@ -0,0 +1,305 @@
+"""
+Offline Aggregation Weight Fitting
+==================================
+Fits AggregationEngine weights to user ratings from FeedbackStore.
+
+Each feedback entry (session_id, user_rating) is joined with the
+component scores of the same evaluation, taken from:
+    - the entry itself (FeedbackStore.store(..., component_scores=...))
+    - a bulk_evaluate JSONL output (record_id == session_id)
+    - stored Mongo runs (run _id == session_id, last iteration)
+
+Weights are fitted by vectorized least squares over a grid on the
+simplex (non-negative, summing to 1): every candidate weight vector is
+scored against all samples in a single matrix product. Ratings (1-5)
+are mapped to [0, 1] so fitted scores stay on the composite scale.
+
+K-fold cross-validation reports the Pearson correlation of fitted and
+current weights with held-out ratings. The fitted weights are written
+as a versioned JSON artifact which AggregationEngine loads at startup.
+
+Example:
+    python -m logic_layer.evaluation.weight_fitting \\
+        --scores scores.jsonl --folds 5 --step 0.05
+"""
+
+import argparse
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .feedback_store import FeedbackStore
+from .metrics.aggregation import AggregationEngine, WEIGHTS_DIR, weights_artifact_versions
+
+
+COMPONENTS = AggregationEngine.COMPONENTS
+SCORE_KEYS = [f"{name}_score" for name in COMPONENTS]
+
+
+# ============================================================
+# DATASET
+# ============================================================
+
+def load_component_scores(scores_path: Optional[str] = None,
+                          mongo_url: Optional[str] = None,
+                          mongo_db: str = "srpp_db") -> Dict[str, Dict]:
+    """
+    Returns {session_id: component_scores (+ "judge_missing")}.
+    """
+
+    scores = {}
+
+    if scores_path:
+        with open(scores_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                row = json.loads(line)
+                if row.get("error"):
+                    continue
+
+                scores[str(row["record_id"])] = {
+                    **{key: row.get(key) for key in SCORE_KEYS},
+                    "judge_missing": row.get("judge_missing")
+                }
+
+    if mongo_url:
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            raise ImportError("pymongo not installed. Run: pip install pymongo")
+
+        client = MongoClient(mongo_url)
+
+        try:
+            cursor = client[mongo_db].runs.find(
+                {"iterations.evaluation.aggregation.component_scores": {"$exists": True}},
+                {"iterations.evaluation.aggregation": 1}
+            )
+
+            for run in cursor:
+                aggregation = run["iterations"][-1].get("evaluation", {}).get("aggregation", {})
+                scores[str(run["_id"])] = {
+                    **aggregation.get("component_scores", {}),
+                    "judge_missing": aggregation.get("judge_missing")
+                }
+        finally:
+            client.close()
+
+    return scores
+
+
+def build_dataset(feedback: List[Dict], scores: Dict[str, Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    X: (n, 5) component matrix, NaN judge where no verdict exists
+    y: (n,)   ratings mapped from 1-5 to [0, 1]
+    """
+
+    rows, targets = [], []
+
+    for entry in feedback:
+
+        rating = entry.get("user_rating")
+        if not rating:
+            continue
+
+        components = entry.get("component_scores") or scores.get(str(entry.get("session_id")))
+        if not components:
+            continue
+
+        row = [float(components.get(key) or 0.0) for key in SCORE_KEYS]
+
+        if components.get("judge_score") is None or components.get("judge_missing"):
+            row[-1] = math.nan
+
+        rows.append(row)
+        targets.append((rating - 1) / 4)
+
+    return np.array(rows, dtype=np.float64).reshape(-1, len(COMPONENTS)), np.array(targets, dtype=np.float64)
+
+
+# ============================================================
+# FITTING
+# ============================================================
+
+def simplex_grid(step: float, dims: int = len(COMPONENTS)) -> np.ndarray:
+    """
+    All weight vectors with entries in multiples of `step` that sum to 1.
+    """
+
+    units = int(round(1 / step))
+
+    def compositions(total, parts):
+        if parts == 1:
+            yield (total,)
+            return
+        for first in range(total + 1):
+            for rest in compositions(total - first, parts - 1):
+                yield (first,) + rest
+
+    return np.array(list(compositions(units, dims)), dtype=np.float64) / units
+
+
+def predict(X: np.ndarray, W: np.ndarray) -> np.ndarray:
+    """
+    Composite scores for every sample under every weight vector.
+
+    X: (n, 5), W: (k, 5) -> (n, k). Rows with a missing judge use the
+    same rescaling as AggregationEngine.compute_final_score.
+    """
+
+    judge_missing = np.isnan(X[:, -1])
+
+    scores = np.nan_to_num(X, nan=0.0) @ W.T
+
+    remaining = W[:, :-1].sum(axis=1)
+    scale = np.divide(W.sum(axis=1), remaining, out=np.zeros_like(remaining), where=remaining > 0)
+
+    scores[judge_missing] *= scale
+
+    return scores
+
+
+def fit_weights(X: np.ndarray, y: np.ndarray, grid: np.ndarray,
+                max_cells: int = 20_000_000) -> np.ndarray:
+    """
+    Least squares over the simplex grid: (n, k) matrix products, then
+    the column with the lowest mean squared error. The grid is split
+    into column blocks so memory stays under max_cells floats.
+    """
+
+    block = max(1, max_cells // max(len(y), 1))
+
+    errors = np.concatenate([
+        ((predict(X, grid[i:i + block]) - y[:, None]) ** 2).mean(axis=0)
+        for i in range(0, len(grid), block)
+    ])
+
+    return grid[int(np.argmin(errors))]
+
+
+def pearson(a: np.ndarray, b: np.ndarray) -> float:
+
+    if len(a) < 2 or np.std(a) == 0 or np.std(b) == 0:
+        return 0.0
+
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def cross_validate(X: np.ndarray, y: np.ndarray, grid: np.ndarray,
+                   baseline: np.ndarray, folds: int = 5, seed: int = 0) -> Dict:
+
+    order = np.random.default_rng(seed).permutation(len(y))
+    splits = np.array_split(order, folds)
+
+    fitted_r, baseline_r = [], []
+
+    for i, test in enumerate(splits):
+
+        train = np.concatenate([split for j, split in enumerate(splits) if j != i])
+
+        if len(test) < 2 or len(train) == 0:
+            continue
+
+        weights = fit_weights(X[train], y[train], grid)
+
+        fitted_r.append(pearson(predict(X[test], weights[None, :])[:, 0], y[test]))
+        baseline_r.append(pearson(predict(X[test], baseline[None, :])[:, 0], y[test]))
+
+    return {
+        "folds": folds,
+        "fitted_pearson_mean": round(float(np.mean(fitted_r)), 4) if fitted_r else None,
+        "fitted_pearson_per_fold": [round(r, 4) for r in fitted_r],
+        "baseline_pearson_mean": round(float(np.mean(baseline_r)), 4) if baseline_r else None
+    }
+
+
+# ============================================================
+# ARTIFACT
+# ============================================================
+
+def save_artifact(weights: Dict[str, float], report: Dict, weights_dir: str = WEIGHTS_DIR) -> str:
+
+    os.makedirs(weights_dir, exist_ok=True)
+
+    version = max(weights_artifact_versions(weights_dir), default=0) + 1
+
+    path = os.path.join(weights_dir, f"aggregation_weights.v{version}.json")
+
+    # Write then rename, so a crash never leaves a partial artifact
+    # under a name AggregationEngine would load
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "weights": weights,
+            **report
+        }, f, indent=4)
+
+    os.replace(f"{path}.tmp", path)
+
+    return path
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None):
+
+    parser = argparse.ArgumentParser(
+        prog="python -m logic_layer.evaluation.weight_fitting",
+        description="Fit aggregation weights to user feedback."
+    )
+    parser.add_argument("--feedback", default="logic_layer/evaluation/feedback_log.jsonl",
+                        help="FeedbackStore file")
+    parser.add_argument("--scores", default=None, help="bulk_evaluate JSONL output")
+    parser.add_argument("--mongo-url", default=None, help="Read component scores from stored runs")
+    parser.add_argument("--mongo-db", default="srpp_db")
+    parser.add_argument("--step", type=float, default=0.05, help="Simplex grid resolution")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--weights-dir", default=WEIGHTS_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Report only, do not save")
+
+    args = parser.parse_args(argv)
+
+    feedback = FeedbackStore(args.feedback).get_all()
+    scores = load_component_scores(args.scores, args.mongo_url, args.mongo_db)
+
+    X, y = build_dataset(feedback, scores)
+
+    if len(y) < args.min_samples:
+        raise SystemExit(f"Only {len(y)} rated samples with component scores (need {args.min_samples}).")
+
+    grid = simplex_grid(args.step)
+    baseline_weights = AggregationEngine().weights
+    baseline = np.array([baseline_weights[name] for name in COMPONENTS])
+
+    cv = cross_validate(X, y, grid, baseline, folds=args.folds, seed=args.seed)
+
+    fitted = fit_weights(X, y, grid)
+    weights = {name: round(float(w), 4) for name, w in zip(COMPONENTS, fitted)}
+
+    report = {
+        "method": "simplex_grid_least_squares",
+        "grid_step": args.step,
+        "n_samples": int(len(y)),
+        "baseline_weights": baseline_weights,
+        "cross_validation": cv
+    }
+
+    print(json.dumps({"weights": weights, **report}, indent=2))
+
+    if not args.dry_run:
+        print("Saved:", save_artifact(weights, report, args.weights_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ Improvements:
 - Better proportional behavior for short prompts
 """
 
-from typing import Dict
+from typing import Dict, List, Optional
 import spacy
 from sentence_transformers import SentenceTransformer, util
 
@@ -110,10 +110,47 @@ class IntentAnalyzer:
     # -------------------------------------------------
     # Main analysis
     # -------------------------------------------------
-    def analyze(self, prompt: str) -> Dict:
+    def analyze(self, prompt: str, original_prompt: Optional[str] = None) -> Dict:
+        """
+        original_prompt: the user's text before abstraction, if it
+        differs. It is encoded in the same call so the evaluator can
+        reuse its vector (see "embeddings" in the result).
+        """
+
+        return self.analyze_many([prompt], [original_prompt])[0]
+
+    def analyze_many(
+        self,
+        prompts: List[str],
+        original_prompts: Optional[List[Optional[str]]] = None,
+        batch_size: int = 64
+    ) -> List[Dict]:
+        """
+        Same result as analyze() per prompt, with one nlp.pipe pass
+        and one batched encode call for the whole list.
+        """
+
+        if not prompts:
+            return []
+
+        originals = original_prompts or [None] * len(prompts)
+
+        docs = nlp.pipe(prompts, batch_size=batch_size)
+
+        texts = list(dict.fromkeys(
+            [*prompts, *(o for o in originals if o is not None)]
+        ))
+        vectors = dict(zip(texts, embedder.encode(texts, batch_size=batch_size, convert_to_tensor=True)))
+
+        return [
+            self._analyze(
+                prompt, doc, vectors[prompt],
+                {text: vectors[text] for text in (prompt, original) if text is not None}
+            )
+            for prompt, original, doc in zip(prompts, originals, docs)
+        ]
 
-        doc = nlp(prompt)
-        prompt_embedding = embedder.encode(prompt, convert_to_tensor=True)
+    def _analyze(self, prompt: str, doc, prompt_embedding, embeddings: Optional[Dict] = None) -> Dict:
 
         # ---------- Task Type ----------
         task_type, semantic_scores = self._detect_task_type(prompt, prompt_embedding)
@@ -203,5 +240,10 @@ class IntentAnalyzer:
             "reasoning": reasoning,
             "risk": risk,
             "semantic_scores": semantic_scores,
-            "linguistic": linguistic
+            "linguistic": linguistic,
+            "prompt_embedding": prompt_embedding,
+            # {text: vector} for the prompt and the user's original
+            # text, same model as SemanticMetrics; lets the evaluator
+            # skip re-encoding them
+            "embeddings": embeddings or {prompt: prompt_embedding}
         }
@@ -10,5 +10,13 @@ class SinglePassRefiner:
 
     def refine(self, prompt: str):
         abstracted = self.abstractor.abstract(prompt)
-        return self.controller.optimize(abstracted)
+        # The evaluator scores against the raw prompt: embed that too
+        return self.controller.optimize(abstracted, original_prompt=prompt)
 
+    def refine_many(self, prompts):
+        """
+        refine() for a list of prompts; spaCy parsing and intent
+        embeddings run batched across the list.
+        """
+        abstracted = self.abstractor.abstract_many(prompts)
+        return self.controller.optimize_many(abstracted, original_prompts=prompts)
@@ -12,5 +12,8 @@ class BaseLLM(ABC):
             "latency": float,
             "tokens_used": int
         }
+
+        Implementations may add "completion_tokens" and
+        "finish_reason" when the backend reports them.
         """
         pass
\ No newline at end of file
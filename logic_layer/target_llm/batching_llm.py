@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+from .base_llm import BaseLLM
+
+
+class _PendingRequest:
+
+    def __init__(self, prompt: str, temperature: float, top_p: float, stop: Optional[List[str]]):
+        self.prompt = prompt
+        self.temperature = temperature
+        self.top_p = top_p
+        self.stop = stop
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[BaseException] = None
+        self.batch_size = 0
+
+
+class BatchingLLM(BaseLLM):
+    """
+    Dynamic Micro-Batching Front for HFLocalLLM
+    -------------------------------------------
+    - Concurrent generate() calls are queued
+    - A worker thread waits up to max_wait_ms to fill a batch
+    - One left-padded model.generate per batch
+    - Results are scattered back to the waiting callers
+
+    Requests with different sampling parameters or stop sequences never
+    share a batch, since they apply to the whole generate call.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        llm,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0
+    ):
+
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.llm = llm
+        self.model_name = getattr(llm, "model_name", None)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._closed = False
+
+        self._worker = threading.Thread(
+            target=self._run,
+            name="batching-llm-worker",
+            daemon=True
+        )
+        self._worker.start()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None
+    ):
+
+        if self._closed:
+            raise RuntimeError("BatchingLLM is closed")
+
+        start_time = time.time()
+
+        request = _PendingRequest(prompt, temperature, top_p, stop)
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+
+        result = dict(request.result)
+
+        # Caller-observed latency includes the time spent queued
+        result["latency"] = time.time() - start_time
+        result["batch_size"] = request.batch_size
+
+        return result
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._worker.join()
+
+    # -------------------------------------------------
+    # Batch Collection
+    # -------------------------------------------------
+    def _collect_batch(self) -> List:
+
+        first = self._queue.get()
+        if first is self._STOP:
+            return [first]
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            batch.append(item)
+            if item is self._STOP:
+                break
+
+        return batch
+
+    # -------------------------------------------------
+    # Worker Loop
+    # -------------------------------------------------
+    def _run(self):
+
+        while True:
+            batch = self._collect_batch()
+
+            shutdown = any(item is self._STOP for item in batch)
+            requests = [item for item in batch if item is not self._STOP]
+
+            groups: Dict[tuple, List[_PendingRequest]] = {}
+            for request in requests:
+                stop = tuple(request.stop) if request.stop is not None else None
+                key = (request.temperature, request.top_p, stop)
+                groups.setdefault(key, []).append(request)
+
+            for (temperature, top_p, stop), group in groups.items():
+                self._execute(group, temperature, top_p, stop)
+
+            if shutdown:
+                return
+
+    def _execute(
+        self,
+        group: List[_PendingRequest],
+        temperature: float,
+        top_p: float,
+        stop: Optional[tuple]
+    ):
+
+        try:
+            results = self.llm.generate_batch(
+                [request.prompt for request in group],
+                temperature=temperature,
+                top_p=top_p,
+                stop=list(stop) if stop is not None else None
+            )
+            for request, result in zip(group, results):
+                request.result = result
+                request.batch_size = len(group)
+
+        except Exception as exc:
+            for request in group:
+                request.error = exc
+
+        finally:
+            for request in group:
+                request.done.set()
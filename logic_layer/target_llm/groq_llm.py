@@ -1,4 +1,5 @@
 import time
+from typing import List, Optional
 from groq import Groq
 from .base_llm import BaseLLM
 
@@ -9,16 +10,33 @@ class GroqLLM(BaseLLM):
         self.client = Groq(api_key=api_key)
         self.model_name = model_name
 
-    def generate(self, prompt: str, temperature: float = 0.7):
+    def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        json_mode: bool = False
+    ):
 
         start_time = time.time()
 
+        request_options = {}
+        if max_tokens is not None:
+            request_options["max_tokens"] = max_tokens
+        if stop:
+            request_options["stop"] = stop
+        if json_mode:
+            # The prompt itself must also ask for JSON
+            request_options["response_format"] = {"type": "json_object"}
+
         response = self.client.chat.completions.create(
             model=self.model_name,
             messages=[
                 {"role": "user", "content": prompt}
             ],
-            temperature=temperature
+            temperature=temperature,
+            **request_options
         )
 
         latency = time.time() - start_time
@@ -28,5 +46,7 @@ class GroqLLM(BaseLLM):
         return {
             "output": output_text,
             "latency": latency,
-            "tokens_used": response.usage.total_tokens
+            "tokens_used": response.usage.total_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "finish_reason": response.choices[0].finish_reason
         }
\ No newline at end of file
@@ -1,7 +1,61 @@
+import copy
 import time
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from typing import Dict, List, Optional
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    DynamicCache,
+    StoppingCriteria,
+    StoppingCriteriaList
+)
 from .base_llm import BaseLLM
+from .prefix_cache import PrefixKVCache
+
+
+class StopOnSequences(StoppingCriteria):
+    """
+    Stops a row once its generated text contains any stop sequence.
+    Only the tail of the generated ids is decoded on each step.
+    """
+
+    def __init__(self, tokenizer, stop_sequences: List[str], prompt_length: int):
+        self.tokenizer = tokenizer
+        self.stop_sequences = stop_sequences
+        self.prompt_length = prompt_length
+
+        # Enough trailing tokens to cover the longest stop sequence
+        self.window = max(len(tokenizer.encode(s, add_special_tokens=False)) for s in stop_sequences) + 2
+
+    def __call__(self, input_ids, scores, **kwargs):
+
+        done = []
+        for row in input_ids:
+            tail = self.tokenizer.decode(
+                row[self.prompt_length:][-self.window:],
+                skip_special_tokens=True
+            )
+            done.append(any(stop in tail for stop in self.stop_sequences))
+
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
+def _truncate_at_stop(text: str, stop_sequences: List[str]) -> str:
+
+    cut = len(text)
+    for stop in stop_sequences:
+        index = text.find(stop)
+        if index != -1:
+            cut = min(cut, index)
+
+    return text[:cut]
+
+
+def _cpu_supports_bf16() -> bool:
+    capability = ""
+    if hasattr(torch.backends, "cpu"):
+        capability = torch.backends.cpu.get_cpu_capability()
+    return "AVX512" in capability or "AMX" in capability
 
 
 class HFLocalLLM(BaseLLM):
@@ -10,33 +64,111 @@ class HFLocalLLM(BaseLLM):
         self,
         model_name: str = "microsoft/phi-2",
         device: str = None,
-        max_new_tokens: int = 512
+        max_new_tokens: int = 512,
+        prefix_cache_mb: float = 0,
+        cpu_mode: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        num_interop_threads: Optional[int] = None,
+        stop_sequences: Optional[List[str]] = None
     ):
+        """
+        cpu_mode (CPU only):
+            None   -> fp32 (previous behaviour)
+            "int8" -> dynamic int8 quantization of Linear layers
+            "bf16" -> bfloat16 weights, falls back to fp32 when the
+                      CPU has no native bf16 support
+        """
+
+        if cpu_mode not in {None, "int8", "bf16"}:
+            raise ValueError(f"Unsupported cpu_mode: {cpu_mode}")
 
         self.model_name = model_name
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.max_new_tokens = max_new_tokens
+        self.stop_sequences = stop_sequences or []
+
+        # -----------------------------
+        # Thread Budget
+        # -----------------------------
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        if num_interop_threads:
+            try:
+                torch.set_num_interop_threads(num_interop_threads)
+            except RuntimeError:
+                # Can only be set once, before any inter-op work starts
+                print("Inter-op thread count already fixed; keeping current value.")
+
+        # -----------------------------
+        # Precision
+        # -----------------------------
+        if self.device == "cuda":
+            torch_dtype = torch.float16
+        elif cpu_mode == "bf16" and _cpu_supports_bf16():
+            torch_dtype = torch.bfloat16
+        else:
+            if cpu_mode == "bf16":
+                print("CPU has no native bf16 support; loading in fp32.")
+            torch_dtype = torch.float32
+
+        self.cpu_mode = cpu_mode if self.device == "cpu" else None
 
         print(f"Loading model {model_name} on {self.device}...")
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        # Batched generation needs a pad token and left padding so that
+        # every prompt ends at the same position before decoding starts.
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+
         self.model = AutoModelForCausalLM.from_pretrained(
             model_name,
-            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+            torch_dtype=torch_dtype
         ).to(self.device)
 
         self.model.eval()
 
+        if self.cpu_mode == "int8":
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+
+        # Optional LRU of prompt-prefix KV caches (disabled when 0)
+        self.prefix_cache = (
+            PrefixKVCache(max_bytes=int(prefix_cache_mb * 1024 * 1024))
+            if prefix_cache_mb > 0 else None
+        )
+
     def generate(
         self,
         prompt: str,
         temperature: float = 0.7,
-        top_p: float = 0.9
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None
     ):
 
         start_time = time.time()
 
+        stop_sequences = stop if stop is not None else self.stop_sequences
+
         inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+        prompt_length = inputs["input_ids"].shape[1]
+
+        generate_kwargs = {}
+        if self.prefix_cache is not None:
+            generate_kwargs["past_key_values"] = self._prefill_with_cache(
+                inputs["input_ids"]
+            )
+
+        if stop_sequences:
+            generate_kwargs["stopping_criteria"] = StoppingCriteriaList([
+                StopOnSequences(self.tokenizer, stop_sequences, prompt_length)
+            ])
 
         with torch.no_grad():
             outputs = self.model.generate(
@@ -44,20 +176,143 @@ class HFLocalLLM(BaseLLM):
                 max_new_tokens=self.max_new_tokens,
                 temperature=temperature,
                 top_p=top_p,
-                do_sample=True
+                do_sample=True,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **generate_kwargs
             )
 
         latency = time.time() - start_time
 
+        # Decode only the generated ids; the prompt is never re-decoded
+        generated_ids = outputs[0][prompt_length:]
+
         generated_text = self.tokenizer.decode(
-            outputs[0],
+            generated_ids,
             skip_special_tokens=True
         )
 
+        if stop_sequences:
+            generated_text = _truncate_at_stop(generated_text, stop_sequences)
+
         tokens_used = outputs[0].shape[0]
 
         return {
-            "output": generated_text[len(prompt):].strip(),
+            "output": generated_text.strip(),
             "latency": latency,
-            "tokens_used": tokens_used
-        }
\ No newline at end of file
+            "tokens_used": tokens_used,
+            "completion_tokens": generated_ids.shape[0]
+        }
+
+    # -------------------------------------------------
+    # Prefix KV-Cache Reuse
+    # -------------------------------------------------
+    def _prefill_with_cache(self, input_ids):
+        """
+        Builds the KV cache for all prompt tokens except the last one,
+        reusing the longest cached prefix and running prefill only for
+        the remaining suffix. generate() then processes the final
+        prompt token itself and continues decoding from there.
+        """
+
+        token_ids = input_ids[0].tolist()
+        prefill_end = len(token_ids) - 1
+
+        cache, prefix_length = self.prefix_cache.lookup(token_ids, max_prefix=prefill_end)
+
+        if cache is None:
+            cache = DynamicCache()
+
+        if prefill_end > prefix_length:
+            with torch.no_grad():
+                prefill = self.model(
+                    input_ids=input_ids[:, prefix_length:prefill_end],
+                    past_key_values=cache,
+                    use_cache=True
+                )
+            cache = prefill.past_key_values
+
+        if prefill_end > 0:
+            # generate() extends the cache in place, so store a copy
+            self.prefix_cache.store(token_ids[:prefill_end], copy.deepcopy(cache))
+
+        return cache
+
+    def cache_stats(self) -> Dict:
+        if self.prefix_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.prefix_cache.stats()}
+
+    # -------------------------------------------------
+    # Batched Generation (left-padded)
+    # -------------------------------------------------
+    def generate_batch(
+        self,
+        prompts: List[str],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Runs a single model.generate over all prompts.
+
+        Prompts are left-padded to a common length, so the generated
+        tokens for every row start at the same offset and can be
+        sliced off without re-decoding the prompt. The prefix cache
+        is not consulted here; padded rows do not share offsets.
+        """
+
+        start_time = time.time()
+
+        stop_sequences = stop if stop is not None else self.stop_sequences
+
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True
+        ).to(self.device)
+
+        prompt_length = inputs["input_ids"].shape[1]
+        pad_token_id = self.tokenizer.pad_token_id
+
+        generate_kwargs = {}
+        if stop_sequences:
+            generate_kwargs["stopping_criteria"] = StoppingCriteriaList([
+                StopOnSequences(self.tokenizer, stop_sequences, prompt_length)
+            ])
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                do_sample=True,
+                pad_token_id=pad_token_id,
+                **generate_kwargs
+            )
+
+        latency = time.time() - start_time
+
+        results = []
+        for i in range(len(prompts)):
+            generated_ids = outputs[i][prompt_length:]
+
+            output_text = self.tokenizer.decode(
+                generated_ids,
+                skip_special_tokens=True
+            )
+
+            if stop_sequences:
+                output_text = _truncate_at_stop(output_text, stop_sequences)
+
+            prompt_tokens = int(inputs["attention_mask"][i].sum())
+            completion_tokens = int((generated_ids != pad_token_id).sum())
+
+            results.append({
+                "output": output_text.strip(),
+                "latency": latency,
+                "tokens_used": prompt_tokens + completion_tokens,
+                "completion_tokens": completion_tokens
+            })
+
+        return results
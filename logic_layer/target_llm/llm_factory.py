@@ -9,4 +9,30 @@ def get_llm(provider: str, config: dict):
             model_name=config.get("model_name", "llama3-8b-8192")
         )
 
-    raise ValueError(f"Unsupported provider: {provider}")
\ No newline at end of file
+    if provider == "hf_local":
+        # Imported lazily so the Groq path does not require torch
+        from .hf_local_llm import HFLocalLLM
+
+        llm = HFLocalLLM(
+            model_name=config.get("model_name", "microsoft/phi-2"),
+            device=config.get("device"),
+            max_new_tokens=config.get("max_new_tokens", 512),
+            prefix_cache_mb=config.get("prefix_cache_mb", 0),
+            cpu_mode=config.get("cpu_mode"),
+            num_threads=config.get("num_threads"),
+            num_interop_threads=config.get("num_interop_threads"),
+            stop_sequences=config.get("stop_sequences")
+        )
+
+        if config.get("batching", False):
+            from .batching_llm import BatchingLLM
+
+            return BatchingLLM(
+                llm,
+                max_batch_size=config.get("max_batch_size", 8),
+                max_wait_ms=config.get("max_wait_ms", 10.0)
+            )
+
+        return llm
+
+    raise ValueError(f"Unsupported provider: {provider}")
@@ -0,0 +1,153 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def _cache_nbytes(cache) -> int:
+    """
+    Size of a transformers KV cache in bytes.
+    Handles both the layered Cache API and the older key/value lists.
+    """
+
+    if hasattr(cache, "layers"):
+        return sum(
+            layer.keys.nbytes + layer.values.nbytes
+            for layer in cache.layers
+            if getattr(layer, "keys", None) is not None
+        )
+
+    if hasattr(cache, "key_cache"):
+        return sum(
+            k.nbytes + v.nbytes
+            for k, v in zip(cache.key_cache, cache.value_cache)
+        )
+
+    # Legacy tuple-of-tuples format
+    return sum(t.nbytes for layer in cache for t in layer)
+
+
+def _common_prefix_length(a: Tuple[int, ...], b: List[int]) -> int:
+
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class PrefixKVCache:
+    """
+    LRU Prefix Key/Value Cache
+    --------------------------
+    - Keyed by prompt token ids
+    - Lookup returns the longest shared token prefix
+    - Cached state is cropped to that prefix, so a prompt only
+      needs prefill for its new suffix
+    - Total memory is capped; least recently used entries are evicted
+    - Thread-safe: the index is guarded by a lock, while the copy and
+      crop of a hit happen outside it. Stored caches are never mutated,
+      so a copy taken after eviction is still valid
+    """
+
+    def __init__(self, max_bytes: int, min_prefix_tokens: int = 8):
+        self.max_bytes = max_bytes
+        self.min_prefix_tokens = min_prefix_tokens
+
+        self._entries: "OrderedDict[Tuple[int, ...], Tuple[object, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+        self.prefill_tokens = 0
+
+    # -------------------------------------------------
+    # Lookup
+    # -------------------------------------------------
+    def lookup(self, token_ids: List[int], max_prefix: int) -> Tuple[Optional[object], int]:
+        """
+        Returns (cache, prefix_length).
+
+        The returned cache is a private copy cropped to prefix_length,
+        so the caller may extend it in place. prefix_length never
+        exceeds max_prefix.
+        """
+
+        with self._lock:
+
+            best_key = None
+            best_length = 0
+
+            for key in self._entries:
+                length = _common_prefix_length(key, token_ids)
+                if length > best_length:
+                    best_key, best_length = key, length
+
+            best_length = min(best_length, max_prefix)
+
+            if best_key is None or best_length < self.min_prefix_tokens:
+                self.misses += 1
+                self.prefill_tokens += max_prefix
+                return None, 0
+
+            self._entries.move_to_end(best_key)
+            entry = self._entries[best_key][0]
+
+            self.hits += 1
+            self.reused_tokens += best_length
+            self.prefill_tokens += max_prefix - best_length
+
+        cache = copy.deepcopy(entry)
+        cache.crop(best_length)
+
+        return cache, best_length
+
+    # -------------------------------------------------
+    # Store
+    # -------------------------------------------------
+    def store(self, token_ids: List[int], cache):
+
+        key = tuple(token_ids)
+        nbytes = _cache_nbytes(cache)
+
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (cache, nbytes)
+            self._total_bytes += nbytes
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+
+    # -------------------------------------------------
+    # Reporting
+    # -------------------------------------------------
+    def stats(self) -> Dict:
+
+        with self._lock:
+
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "reused_tokens": self.reused_tokens,
+                "prefill_tokens": self.prefill_tokens
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logic_layer.target_llm.hf_local_llm import HFLocalLLM
+from logic_layer.target_llm.batching_llm import BatchingLLM
+
+
+PROMPTS = [
+    "Explain recursion.",
+    "Define eventual consistency in distributed systems.",
+    "Compare REST and GraphQL for building a mobile API.",
+    "Summarize the key differences between SQL and NoSQL databases.",
+    "Explain how garbage collection works in Java.",
+    "Describe the CAP theorem.",
+    "Explain how OAuth 2.0 authentication works.",
+    "Describe the differences between TCP and UDP.",
+]
+
+
+def run_load(llm, total_requests: int, concurrency: int):
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(total_requests)]
+
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(llm.generate, prompts))
+
+    elapsed = time.time() - start
+    tokens = sum(r["tokens_used"] for r in results)
+
+    return elapsed, tokens, results
+
+
+def run_benchmark():
+
+    model_name = os.getenv("HF_BENCH_MODEL", "microsoft/phi-2")
+    total_requests = int(os.getenv("HF_BENCH_REQUESTS", "16"))
+
+    base_llm = HFLocalLLM(model_name=model_name, max_new_tokens=64)
+
+    print("\n" + "=" * 80)
+    print(f"MICRO-BATCHING THROUGHPUT ({model_name}, {total_requests} requests)")
+    print("=" * 80)
+
+    # Baseline: unbatched, requests serialize on the model
+    elapsed, tokens, _ = run_load(base_llm, total_requests, concurrency=1)
+    print(
+        f"\nunbatched      | {elapsed:7.2f}s | "
+        f"{total_requests / elapsed:6.2f} req/s | {tokens / elapsed:8.1f} tok/s"
+    )
+
+    for batch_size in [1, 2, 4, 8]:
+
+        llm = BatchingLLM(base_llm, max_batch_size=batch_size, max_wait_ms=20)
+
+        elapsed, tokens, results = run_load(
+            llm,
+            total_requests,
+            concurrency=batch_size
+        )
+
+        avg_batch = sum(r["batch_size"] for r in results) / len(results)
+
+        print(
+            f"batch_size={batch_size:<3} | {elapsed:7.2f}s | "
+            f"{total_requests / elapsed:6.2f} req/s | {tokens / elapsed:8.1f} tok/s | "
+            f"avg batch {avg_batch:.2f}"
+        )
+
+        llm.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
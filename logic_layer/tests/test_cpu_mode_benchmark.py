@@ -0,0 +1,85 @@
+import os
+import resource
+import sys
+import time
+import multiprocessing as mp
+
+
+PROMPTS = [
+    "Explain recursion.",
+    "Describe the CAP theorem.",
+    "Compare REST and GraphQL for building a mobile API.",
+    "Explain how garbage collection works in Java.",
+]
+
+CONFIGURATIONS = [
+    {"label": "current (fp32)"},
+    {"label": "fp32 + threads", "num_threads": os.cpu_count(), "num_interop_threads": 1},
+    {"label": "int8 dynamic", "cpu_mode": "int8", "num_threads": os.cpu_count(), "num_interop_threads": 1},
+    {"label": "bf16", "cpu_mode": "bf16", "num_threads": os.cpu_count(), "num_interop_threads": 1},
+    {"label": "int8 + stop", "cpu_mode": "int8", "num_threads": os.cpu_count(), "stop_sequences": ["\n\n\n"]},
+]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_configuration(model_name, config, results):
+
+    from logic_layer.target_llm.hf_local_llm import HFLocalLLM
+
+    options = {k: v for k, v in config.items() if k != "label"}
+
+    llm = HFLocalLLM(model_name=model_name, device="cpu", max_new_tokens=64, **options)
+
+    # Warm-up (allocator, kernels)
+    llm.generate(PROMPTS[0])
+
+    start = time.time()
+    completion_tokens = 0
+    for prompt in PROMPTS:
+        completion_tokens += llm.generate(prompt)["completion_tokens"]
+    elapsed = time.time() - start
+
+    results.put({
+        "label": config["label"],
+        "tokens_per_sec": completion_tokens / elapsed,
+        "elapsed": elapsed,
+        "peak_rss_mb": _peak_rss_mb()
+    })
+
+
+def run_benchmark():
+
+    model_name = os.getenv("HF_BENCH_MODEL", "microsoft/phi-2")
+
+    print("\n" + "=" * 80)
+    print(f"CPU GENERATION MODES ({model_name})")
+    print("=" * 80)
+
+    # Each configuration runs in a fresh process so peak RSS and the
+    # (set-once) inter-op thread pool are measured independently.
+    ctx = mp.get_context("spawn")
+
+    for config in CONFIGURATIONS:
+        results = ctx.Queue()
+        process = ctx.Process(target=_run_configuration, args=(model_name, config, results))
+        process.start()
+        process.join()
+
+        if process.exitcode != 0:
+            print(f"{config['label']:<16} | failed (exit code {process.exitcode})")
+            continue
+
+        r = results.get()
+        print(
+            f"{r['label']:<16} | {r['tokens_per_sec']:7.2f} tok/s | "
+            f"{r['elapsed']:6.2f}s | peak RSS {r['peak_rss_mb']:8.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,117 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+
+from logic_layer.evaluation.adaptive_learning import AdaptiveLearningEngine
+
+
+THREADS = 4
+PROCESSES = 3
+RECORDS = 40
+
+# Every worker records the same sessions, so the totals are known
+SESSIONS = [
+    (["clarify", "constrain_output"], 0.8),
+    (["decompose"], 0.5),
+    (["clarify"], 0.2),
+]
+
+
+def record_sessions(storage_path: str):
+    engine = AdaptiveLearningEngine(storage_path=storage_path, history_limit=500)
+    for i in range(RECORDS):
+        primitives, score = SESSIONS[i % len(SESSIONS)]
+        engine.record(primitives, score, user_rating=4)
+
+
+def expected_scores(workers: int):
+
+    totals = {}
+
+    for i in range(RECORDS):
+        primitives, score = SESSIONS[i % len(SESSIONS)]
+        for primitive in primitives:
+            count, score_sum = totals.get(primitive, (0, 0.0))
+            totals[primitive] = (count + workers, score_sum + score * workers)
+
+    return {p: (count, score_sum / count) for p, (count, score_sum) in totals.items()}
+
+
+def run_concurrent_records(directory: str):
+
+    print("\n" + "=" * 100)
+    print("ADAPTIVE LEARNING: CONCURRENT RECORDS")
+    print("=" * 100)
+
+    storage_path = os.path.join(directory, "learning_log.db")
+    AdaptiveLearningEngine(storage_path=storage_path)
+
+    spawn = multiprocessing.get_context("spawn")
+
+    threads = [threading.Thread(target=record_sessions, args=(storage_path,)) for _ in range(THREADS)]
+    processes = [spawn.Process(target=record_sessions, args=(storage_path,)) for _ in range(PROCESSES)]
+
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join()
+
+    assert all(p.exitcode == 0 for p in processes)
+
+    engine = AdaptiveLearningEngine(storage_path=storage_path, history_limit=500)
+    workers = THREADS + PROCESSES
+
+    expected = expected_scores(workers)
+
+    for primitive, (count, avg_score) in expected.items():
+        stored = engine.get_primitive_score(primitive)
+        assert stored["count"] == count, (primitive, stored)
+        assert abs(stored["avg_score"] - avg_score) < 1e-9, (primitive, stored)
+
+    ranked = [primitive for primitive, _ in engine.get_ranked_primitives()]
+    assert ranked == sorted(expected, key=lambda p: expected[p][1], reverse=True)
+
+    # History keeps every record, up to the cap
+    assert len(engine.get_history(limit=1_000)) == min(workers * RECORDS, 500)
+
+    for primitive, stats in engine.get_ranked_primitives():
+        print(f"  {primitive:<18} count={stats['count']:<4} avg={stats['avg_score']:.4f}")
+
+
+def run_legacy_import(directory: str):
+
+    print("\n" + "=" * 100)
+    print("ADAPTIVE LEARNING: LEGACY JSON IMPORT")
+    print("=" * 100)
+
+    legacy_path = os.path.join(directory, "learning_log.json")
+
+    with open(legacy_path, "w") as f:
+        json.dump({
+            "primitive_scores": {"clarify": {"count": 4, "avg_score": 0.5}},
+            "history": [{"primitives": ["clarify"], "final_score": 0.5}] * 4
+        }, f)
+
+    engine = AdaptiveLearningEngine(storage_path=legacy_path)
+    engine.record(["clarify"], 1.0)
+
+    # Reopening does not import again
+    engine = AdaptiveLearningEngine(storage_path=legacy_path)
+
+    assert engine.get_primitive_score("clarify") == {"count": 5, "avg_score": 0.6}
+    assert len(engine.get_history()) == 5
+    assert os.path.exists(f"{legacy_path}.migrated")
+
+    print("Imported:", engine.get_primitive_score("clarify"))
+
+
+def run_adaptive_learning_tests():
+    for check in [run_concurrent_records, run_legacy_import]:
+        with tempfile.TemporaryDirectory() as directory:
+            check(directory)
+
+
+if __name__ == "__main__":
+    run_adaptive_learning_tests()
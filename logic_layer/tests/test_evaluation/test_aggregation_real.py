@@ -26,6 +26,15 @@ def run_aggregation_test():
     result = agg.compute_final_score(mock_metrics)
     pprint(result)
 
+    print("\n" + "=" * 100)
+    print("AGGREGATION TEST (JUDGE MISSING)")
+    print("=" * 100)
+
+    unjudged = dict(mock_metrics, judge_metrics={})
+
+    result = agg.compute_final_score(unjudged)
+    pprint(result)
+
 
 if __name__ == "__main__":
     run_aggregation_test()
\ No newline at end of file
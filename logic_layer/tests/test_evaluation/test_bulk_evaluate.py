@@ -0,0 +1,197 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from logic_layer.evaluation import bulk_evaluate
+from logic_layer.evaluation.bulk_evaluate import ROW_COLUMNS
+
+
+# ============================================================
+# Stand-ins for the per-process models
+# ============================================================
+
+class FakeRefiner:
+    def refine(self, prompt):
+        return f"{prompt} Answer in 50-80 words.", {"task_type": "explanation", "selected_primitives": ["clarify"]}
+
+
+class FakeEvaluator:
+    """
+    Scores each record by its number; raises on the record named in
+    `crash_on`, as an interrupted run would stop.
+    """
+
+    evaluated = []
+    crash_on = None
+
+    def evaluate_many(self, records):
+
+        results = []
+
+        for record in records:
+            if record["record_id"] == FakeEvaluator.crash_on:
+                raise KeyboardInterrupt
+
+            FakeEvaluator.evaluated.append(record["record_id"])
+
+            score = int(record["record_id"].split("-")[1]) / 100
+            results.append({
+                "final_score": score,
+                "should_iterate": score < 0.65,
+                "aggregation": {
+                    "component_scores": {
+                        "prompt_score": score, "primitive_score": 0.5, "response_score": 0.5,
+                        "semantic_score": 0.5, "judge_score": None
+                    },
+                    "judge_missing": True,
+                    "final_composite_score": score
+                },
+                "metadata": record["metadata"]
+            })
+
+        return results
+
+
+class FakeWorker(bulk_evaluate._BulkWorker):
+    """
+    The real prepare/run_chunk with stub models and no LLM.
+    """
+
+    options = None
+
+    def __init__(self, options):
+        FakeWorker.options = options
+        self.llm = None
+        self.refiner = FakeRefiner()
+        self.evaluator = FakeEvaluator()
+
+
+def write_records(path, n):
+
+    with open(path, "w") as f:
+        for i in range(n):
+            record = {
+                "request_id": f"r-{i}",
+                "body": f"Explain topic {i}",
+                "original_response": f"Topic {i} is ...",
+                "optimized_response": f"Topic {i}, in short, is ..."
+            }
+            if i % 2:
+                # Stored runs: optimized prompt and metadata kept as is
+                record["optimized_prompt"] = f"Explain topic {i} briefly."
+                record["metadata"] = {"task_type": "stored"}
+            if i == 7:
+                del record["body"]
+            f.write(json.dumps(record) + "\n")
+
+
+def read_rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+# ============================================================
+# Checks
+# ============================================================
+
+def run_checkpoint_resume(directory: str):
+
+    print("\n" + "=" * 100)
+    print("BULK EVALUATE: INTERRUPT AND RESUME")
+    print("=" * 100)
+
+    # Chunks run in this process; the driver is unchanged
+    bulk_evaluate.ProcessPoolExecutor = ThreadPoolExecutor
+    bulk_evaluate._BulkWorker = FakeWorker
+
+    input_path = os.path.join(directory, "records.jsonl")
+    output_path = os.path.join(directory, "scores.jsonl")
+
+    write_records(input_path, 20)
+
+    argv = [
+        "--input", input_path, "--prompt-field", "body", "--id-field", "request_id",
+        "--output", output_path, "--workers", "1", "--chunk-size", "4"
+    ]
+
+    # -------------------------
+    # First run stops in the fourth chunk
+    # -------------------------
+    FakeEvaluator.crash_on = "r-13"
+
+    try:
+        bulk_evaluate.run(bulk_evaluate.build_parser().parse_args(argv))
+        raise AssertionError("run was not interrupted")
+    except KeyboardInterrupt:
+        pass
+
+    # Judge off without an LLM provider
+    assert FakeWorker.options["judge"] is False and FakeWorker.options["llm_provider"] is None
+
+    with open(f"{output_path}.checkpoint") as f:
+        checkpointed = [line.strip() for line in f]
+
+    first_rows = read_rows(output_path)
+
+    # Only flushed chunks are checkpointed; r-7 has no prompt
+    assert checkpointed == [f"r-{i}" for i in range(12) if i != 7]
+    assert sorted(row["record_id"] for row in first_rows) == sorted(f"r-{i}" for i in range(12))
+
+    print("Checkpointed before the interrupt:", len(checkpointed))
+
+    # -------------------------
+    # Resume skips every finished record
+    # -------------------------
+    FakeEvaluator.crash_on = None
+    FakeEvaluator.evaluated.clear()
+
+    summary = bulk_evaluate.run(bulk_evaluate.build_parser().parse_args(argv))
+
+    assert not set(FakeEvaluator.evaluated) & set(checkpointed)
+    assert sorted(FakeEvaluator.evaluated) == sorted(f"r-{i}" for i in range(12, 20))
+    assert summary == {"skipped": 11, "scored": 8, "errors": 1}
+
+    rows = read_rows(output_path)
+    scored = [row for row in rows if not row["error"]]
+
+    # Each record scored exactly once across both runs
+    assert sorted(row["record_id"] for row in scored) == sorted(f"r-{i}" for i in range(20) if i != 7)
+
+    # -------------------------
+    # Output rows
+    # -------------------------
+    for row in rows:
+        assert set(row) == set(ROW_COLUMNS)
+
+    errors = [row for row in rows if row["error"]]
+    assert [row["record_id"] for row in errors] == ["r-7", "r-7"]
+    assert errors[0]["error"] == "missing original prompt" and errors[0]["final_score"] is None
+
+    by_id = {row["record_id"]: row for row in scored}
+
+    assert by_id["r-15"]["final_score"] == 0.15 and by_id["r-15"]["should_iterate"] is True
+    assert by_id["r-15"]["prompt_score"] == 0.15 and by_id["r-15"]["judge_missing"] is True
+
+    # Refiner fills in missing prompts and metadata; stored ones are kept
+    assert by_id["r-2"]["optimized_prompt"] == "Explain topic 2 Answer in 50-80 words."
+    assert by_id["r-2"]["evaluation"]["metadata"]["selected_primitives"] == ["clarify"]
+    assert by_id["r-3"]["optimized_prompt"] == "Explain topic 3 briefly."
+    assert by_id["r-3"]["evaluation"]["metadata"] == {"task_type": "stored"}
+
+    print("Resumed:", summary, "| rows written:", len(rows))
+
+
+def run_bulk_evaluate_tests():
+
+    process_pool, worker = bulk_evaluate.ProcessPoolExecutor, bulk_evaluate._BulkWorker
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            run_checkpoint_resume(directory)
+    finally:
+        bulk_evaluate.ProcessPoolExecutor, bulk_evaluate._BulkWorker = process_pool, worker
+
+
+if __name__ == "__main__":
+    run_bulk_evaluate_tests()
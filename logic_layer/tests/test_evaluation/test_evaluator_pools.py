@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logic_layer.evaluation.evaluator import Evaluator
+
+
+PRIMITIVES = ["clarify", "constrain_output", "decompose", "add_example", "format_enforce"]
+
+JUDGE_SECONDS = 0.05
+
+
+class FakeJudge:
+    """
+    A network-bound judge: sleeps, then returns a verdict derived from
+    the response. Tracks how many calls are in flight at once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+
+    def evaluate(self, prompt, response):
+
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.threads.add(threading.current_thread().name)
+
+        time.sleep(JUDGE_SECONDS)
+
+        with self.lock:
+            self.active -= 1
+
+        return {"overall_quality": len(response) % 10 + 1}
+
+
+def random_records(rng, n):
+
+    records = []
+
+    for _ in range(n):
+        topic = rng.choice(["caching", "recursion", "OAuth 2.0", "consensus", "sharding"])
+        bullets = "\n".join(f"- point {j}" for j in range(rng.randint(0, 4)))
+
+        records.append({
+            "original_prompt": f"Explain {topic}.",
+            "optimized_prompt": f"Explain {topic} in {rng.randint(2, 5)} bullet points. Do not exceed 120 words.",
+            "original_response": f"{topic} is a technique. " * rng.randint(1, 5),
+            "optimized_response": f"{topic}:\n{bullets}",
+            "metadata": {
+                "task_type": "explanation",
+                "selected_primitives": rng.sample(PRIMITIVES, rng.randint(1, 3))
+            }
+        })
+
+    return records
+
+
+def serial_evaluate(evaluator, record):
+    """
+    The pre-pool path: every family computed in turn on this thread.
+    """
+
+    bundle = {
+        "prompt_metrics": evaluator.prompt_metrics.compute(record["original_prompt"], record["optimized_prompt"]),
+        "primitive_metrics": evaluator.primitive_metrics.compute(record["metadata"]),
+        "response_metrics": evaluator.response_metrics.compute(
+            record["original_prompt"], record["optimized_prompt"],
+            record["original_response"], record["optimized_response"]
+        ),
+        "semantic_metrics": {},
+        "judge_metrics": evaluator.judge.evaluate(record["optimized_prompt"], record["optimized_response"])
+    }
+
+    aggregation = evaluator.aggregator.compute_final_score(bundle)
+
+    return bundle, aggregation
+
+
+def run_equivalence_under_load():
+
+    print("\n" + "=" * 100)
+    print("EVALUATOR POOLS: CONCURRENT vs SERIAL")
+    print("=" * 100)
+
+    rng = random.Random(2)
+    records = random_records(rng, 64)
+
+    # Two instances of the same size share one metric and one judge pool
+    evaluators = [Evaluator(enable_semantic=False, enable_judge=False, max_workers=2, judge_workers=4) for _ in range(2)]
+
+    judge = FakeJudge()
+    for evaluator in evaluators:
+        evaluator.judge = judge
+
+    assert evaluators[0].executor is evaluators[1].executor
+    assert evaluators[0].judge_executor is evaluators[1].judge_executor
+    assert evaluators[0].executor is not evaluators[0].judge_executor
+
+    expected = [serial_evaluate(evaluators[0], record) for record in records]
+
+    judge.peak = 0
+    judge.threads.clear()
+    start = time.perf_counter()
+
+    # 16 callers at once, as concurrent API requests would
+    with ThreadPoolExecutor(max_workers=16) as callers:
+        results = list(callers.map(
+            lambda pair: evaluators[pair[0] % 2].evaluate(**pair[1]),
+            enumerate(records)
+        ))
+
+    elapsed = time.perf_counter() - start
+
+    for result, (bundle, aggregation) in zip(results, expected):
+        assert result["metrics"] == bundle
+        assert result["aggregation"] == aggregation
+        assert result["should_iterate"] == (aggregation["final_composite_score"] < 0.65)
+
+    # Judge calls run on the judge pool only, at most its size at once
+    assert all(name.startswith("judge-4") for name in judge.threads) and len(judge.threads) <= 4
+    assert judge.peak == 4
+
+    # Judge calls waiting on the network never hold the metric workers:
+    # the run takes about as long as the judge pool alone needs
+    judge_bound = len(records) / 4 * JUDGE_SECONDS
+    assert elapsed < judge_bound * 1.5, elapsed
+
+    assert evaluators[0].judge_stats["evaluations"] + evaluators[1].judge_stats["evaluations"] == len(records)
+    assert evaluators[0].judge_stats["judge_calls"] + evaluators[1].judge_stats["judge_calls"] == len(records)
+
+    print(f"{len(records)} evaluations identical to the serial path")
+    print(f"Peak concurrent judge calls: {judge.peak} | wall time {elapsed:.2f}s "
+          f"(judge pool alone: {judge_bound:.2f}s, serial judging: {len(records) * JUDGE_SECONDS:.2f}s)")
+
+
+def run_evaluator_pool_tests():
+    run_equivalence_under_load()
+
+
+if __name__ == "__main__":
+    run_evaluator_pool_tests()
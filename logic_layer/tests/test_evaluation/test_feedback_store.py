@@ -0,0 +1,148 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+
+from logic_layer.evaluation.feedback_store import FeedbackStore
+
+
+THREADS = 4
+PROCESSES = 3
+WRITES = 50
+
+
+def write_entries(file_path: str, worker: str, rating: int):
+    store = FeedbackStore(file_path=file_path)
+    for i in range(WRITES):
+        store.store(f"{worker}-{i}", final_score=0.5, user_rating=rating)
+
+
+def run_concurrent_appends(directory: str):
+
+    print("\n" + "=" * 100)
+    print("FEEDBACK STORE: CONCURRENT APPENDS")
+    print("=" * 100)
+
+    file_path = os.path.join(directory, "feedback_log.jsonl")
+    FeedbackStore(file_path=file_path)
+
+    # Threads share the in-process lock, processes only the file lock.
+    # Spawn, so no child inherits the in-process lock held by a thread
+    spawn = multiprocessing.get_context("spawn")
+
+    threads = [
+        threading.Thread(target=write_entries, args=(file_path, f"t{i}", 4))
+        for i in range(THREADS)
+    ]
+    processes = [
+        spawn.Process(target=write_entries, args=(file_path, f"p{i}", 2))
+        for i in range(PROCESSES)
+    ]
+
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join()
+
+    assert all(p.exitcode == 0 for p in processes)
+
+    store = FeedbackStore(file_path=file_path)
+    entries = store.get_all()
+    stats = store.get_stats()
+
+    total = (THREADS + PROCESSES) * WRITES
+    expected_average = (THREADS * 4 + PROCESSES * 2) / (THREADS + PROCESSES)
+
+    assert len(entries) == total
+    assert len({entry["session_id"] for entry in entries}) == total
+    assert stats["count"] == stats["rated_count"] == total
+    assert stats["rating_histogram"] == {"4": THREADS * WRITES, "2": PROCESSES * WRITES}
+    assert abs(store.get_average_user_rating() - expected_average) < 1e-9
+
+    print("Entries:", len(entries), "| average rating:", round(store.get_average_user_rating(), 4))
+
+
+def run_legacy_migration(directory: str):
+
+    print("\n" + "=" * 100)
+    print("FEEDBACK STORE: LEGACY JSON MIGRATION")
+    print("=" * 100)
+
+    legacy_path = os.path.join(directory, "feedback_log.json")
+    legacy = [
+        {"session_id": f"old-{i}", "final_score": 0.7, "user_rating": 5}
+        for i in range(3)
+    ]
+
+    with open(legacy_path, "w") as f:
+        json.dump(legacy, f)
+
+    # Callers passing the old path get the JSONL file next to it
+    store = FeedbackStore(file_path=legacy_path)
+    store.store("new-0", final_score=0.4, user_rating=1)
+
+    assert store.file_path == f"{legacy_path}l"
+    assert not os.path.exists(legacy_path) and os.path.exists(f"{legacy_path}.migrated")
+
+    # A second open does not migrate again
+    store = FeedbackStore(file_path=legacy_path)
+
+    session_ids = [entry["session_id"] for entry in store.get_all()]
+    assert session_ids == ["old-0", "old-1", "old-2", "new-0"]
+    assert store.get_stats()["count"] == 4 and store.get_average_user_rating() == 4.0
+
+    print("Migrated entries:", session_ids)
+
+
+def run_compaction(directory: str):
+
+    print("\n" + "=" * 100)
+    print("FEEDBACK STORE: TORN LINES AND COMPACTION")
+    print("=" * 100)
+
+    file_path = os.path.join(directory, "compact_log.jsonl")
+    store = FeedbackStore(file_path=file_path, compact_every=5)
+
+    store.store("s-0", final_score=0.9, user_rating=3)
+
+    # A crashed writer left half a line without its newline
+    with open(file_path, "a") as f:
+        f.write('{"session_id": "torn", "final_sc')
+
+    for i in range(1, 4):
+        store.store(f"s-{i}", final_score=0.9, user_rating=3)
+
+    # The torn line is skipped on read but still counted until compaction
+    assert [e["session_id"] for e in store.get_all()] == ["s-0", "s-1", "s-2", "s-3"]
+
+    with open(file_path) as f:
+        assert len(f.readlines()) == 5
+
+    # Fifth write triggers automatic compaction
+    store.store("s-4", final_score=0.9, user_rating=3)
+
+    with open(file_path) as f:
+        lines = f.readlines()
+
+    stats = store.get_stats()
+
+    assert len(lines) == 5 and all(json.loads(line) for line in lines)
+    assert stats["count"] == 5 and stats["writes_since_compaction"] == 0
+    assert "compacted_at" in stats
+
+    # Losing the sidecar rebuilds it from the log
+    os.remove(store.stats_path)
+    assert FeedbackStore(file_path=file_path).get_stats()["rating_sum"] == 15
+
+    print("Lines after compaction:", len(lines))
+
+
+def run_feedback_store_tests():
+    for check in [run_concurrent_appends, run_legacy_migration, run_compaction]:
+        with tempfile.TemporaryDirectory() as directory:
+            check(directory)
+
+
+if __name__ == "__main__":
+    run_feedback_store_tests()
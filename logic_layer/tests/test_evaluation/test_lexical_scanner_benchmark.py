@@ -0,0 +1,139 @@
+import random
+import re
+import time
+
+from logic_layer.evaluation.metrics import lexical_scanner
+from logic_layer.evaluation.metrics.lexical_scanner import (
+    INSTRUCTION_VERBS,
+    CONSTRAINT_MARKERS,
+    CONDITIONAL_WORDS,
+    RESPONSE_OVERCONFIDENCE_MARKERS,
+    OVERCONFIDENCE_MARKERS,
+    TRANSITION_PHRASES
+)
+
+
+# Uncached scan, so every call does the full work
+scan = lexical_scanner.scan.__wrapped__
+
+
+def legacy_features(text: str) -> dict:
+    """
+    The same features computed the way the metric classes did before:
+    one .lower() per marker and a separate regex pass per feature.
+    """
+
+    def count(markers):
+        return sum(1 for m in markers if m in text.lower())
+
+    sentences = [s.strip() for s in re.split(r"[.!?]", text) if s.strip()]
+
+    return {
+        "instruction": count(INSTRUCTION_VERBS),
+        "constraint": count(CONSTRAINT_MARKERS),
+        "conditional": count(CONDITIONAL_WORDS),
+        "response_overconfidence": count(RESPONSE_OVERCONFIDENCE_MARKERS),
+        "overconfidence": count(OVERCONFIDENCE_MARKERS),
+        "transition": count(TRANSITION_PHRASES),
+        "word_count": len(text.split()),
+        "word_set": set(text.lower().split()),
+        "newline_count": text.count("\n"),
+        "numbered_line_markers": len(re.findall(r"\n\d+\.", text)),
+        "numbered_markers": len(re.findall(r"\d+\.", text)),
+        "number_count": len(re.findall(r"\d+", text)),
+        "list_markers": len(re.findall(r"\n\d+\.|\n- |\n\*", text)),
+        "format_markers": sum(len(re.findall(p, text)) for p in [r"\n\d+\.", r"\n- ", r"\n\*", r"```"]),
+        "code_block": "```" in text,
+        "sentence_count": len(sentences),
+        "sentence_word_count": sum(len(s.split()) for s in sentences),
+        "citation": bool(re.search(r"\[\w+,\s*\d{4}\]", text))
+    }
+
+
+def scanner_features(text: str) -> dict:
+
+    result = scan(text)
+
+    def count(markers):
+        return lexical_scanner.count_markers(result, markers)
+
+    return {
+        "instruction": count(INSTRUCTION_VERBS),
+        "constraint": count(CONSTRAINT_MARKERS),
+        "conditional": count(CONDITIONAL_WORDS),
+        "response_overconfidence": count(RESPONSE_OVERCONFIDENCE_MARKERS),
+        "overconfidence": count(OVERCONFIDENCE_MARKERS),
+        "transition": count(TRANSITION_PHRASES),
+        "word_count": result["word_count"],
+        "word_set": set(result["word_set"]),
+        "newline_count": result["newline_count"],
+        "numbered_line_markers": result["numbered_line_markers"],
+        "numbered_markers": result["numbered_markers"],
+        "number_count": result["number_count"],
+        "list_markers": result["list_markers"],
+        "format_markers": result["list_markers"] + result["code_fences"],
+        "code_block": result["code_fences"] > 0,
+        "sentence_count": result["sentence_count"],
+        "sentence_word_count": result["sentence_word_count"],
+        "citation": result["citation_detected"]
+    }
+
+
+FRAGMENTS = [
+    "However, the model is definitely faster.", "It is a proven fact that caching helps.",
+    "\n1. Explain the setup.", "\n2. Compare both options", "\n- must be short", "\n* avoid jargon",
+    "\n```python\nprint(42)\n```", "For example, 3.14 and 2024 are numbers.", "Unless noted, ensure 10ms.",
+    "This never fails [Smith, 2021].", "On the other hand, results differ!", "What if it breaks?",
+    "In addition, summarize 12.5.3 steps", "\n\n", "Always   list\tthe items.", "Only create 5 files..."
+]
+
+
+def make_text(rng: random.Random, target_chars: int) -> str:
+    parts = []
+    while sum(len(p) for p in parts) < target_chars:
+        parts.append(rng.choice(FRAGMENTS))
+    return " ".join(parts)
+
+
+def run_scanner_benchmark():
+
+    rng = random.Random(7)
+
+    # -------------------------
+    # Equivalence
+    # -------------------------
+    checked = 0
+    for _ in range(500):
+        text = make_text(rng, rng.randint(10, 3000))
+        assert scanner_features(text) == legacy_features(text), text
+        checked += 1
+
+    print("\n" + "=" * 100)
+    print("LEXICAL SCANNER EQUIVALENCE:", checked, "texts identical")
+    print("=" * 100)
+
+    # -------------------------
+    # Timing on multi-kilobyte responses
+    # -------------------------
+    for size in [2_000, 8_000, 32_000]:
+
+        texts = [make_text(rng, size) for _ in range(50)]
+
+        start = time.perf_counter()
+        for text in texts:
+            legacy_features(text)
+        legacy_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+        start = time.perf_counter()
+        for text in texts:
+            scanner_features(text)
+        scanner_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+        print(
+            f"{size:>6} chars | legacy {legacy_ms:7.3f} ms | scanner {scanner_ms:7.3f} ms "
+            f"| speedup x{legacy_ms / scanner_ms:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    run_scanner_benchmark()
@@ -3,6 +3,7 @@ from pprint import pprint
 
 from logic_layer.target_llm.llm_factory import get_llm
 from logic_layer.evaluation.llm_judge import LLMJudge
+from logic_layer.evaluation.ab_testing import ABTestingEngine
 
 
 def run_llm_judge_test():
@@ -47,6 +48,24 @@ soil erosion, and disruption of water cycles.
 
     print("\nOverall Quality Score:", result["overall_quality"])
 
+    # -------------------------------------------------
+    # Pairwise: both responses, one judge call
+    # -------------------------------------------------
+
+    weaker_response = "Deforestation is when trees are cut down."
+
+    print("\n" + "=" * 100)
+    print("PAIRWISE JUDGE TEST")
+    print("=" * 100)
+
+    pairwise = judge.evaluate_pairwise(prompt, response, weaker_response)
+
+    print("\nPAIRWISE SCORES:\n")
+    pprint(pairwise)
+
+    print("\nA/B RESULT:\n")
+    pprint(ABTestingEngine().compare_pairwise(pairwise))
+
 
 if __name__ == "__main__":
     run_llm_judge_test()
\ No newline at end of file
@@ -75,6 +75,22 @@ def run_test_cases():
 
         display_clean_metrics(result)
 
+    # ----------------------------------------------------------
+    # Bulk (vectorized) path must match per-pair results
+    # ----------------------------------------------------------
+    print_section("🧪 BULK: compute_many vs compute")
+
+    bulk_results = sm.compute_many(test_cases)
+
+    for case, bulk in zip(test_cases, bulk_results):
+        single = sm.compute(
+            case["original_prompt"],
+            case["optimized_prompt"],
+            case["original_response"],
+            case["optimized_response"]
+        )
+        print(f"{case['name']:<35} match={single == bulk}")
+
 
 if __name__ == "__main__":
     run_test_cases()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import difflib
+import random
+import time
+
+from logic_layer.evaluation.metrics.prompt_metrics import PromptMetrics
+from logic_layer.evaluation.metrics.similarity import get_similarity_engine
+
+
+TASKS = [
+    "Explain how transformers work in NLP, covering attention, positional encoding and training objectives.",
+    "Compare BERT and GPT architectures in a table with at least five rows.",
+    "Write Python code to load a pretrained BERT model using HuggingFace and run a sample sentence.",
+    "Summarize the trade-offs of fine-tuning versus prompting for a production system.",
+    "List three common failure modes of large language models and how to detect them.",
+    "Describe how to evaluate a retrieval-augmented generation pipeline end to end.",
+]
+
+CONSTRAINTS = [
+    "Keep each answer under 150 words.",
+    "Use bullet points where possible.",
+    "Do not include marketing language.",
+    "Cite sources where claims are made.",
+]
+
+
+def decomposed_prompt(rng: random.Random, n_tasks: int) -> str:
+    """
+    Mimics a decomposed multi-task prompt produced by the controller.
+    """
+
+    lines = ["You are an expert assistant. Complete every task below.\n"]
+
+    for i in range(n_tasks):
+        lines.append(f"Task {i + 1}: {rng.choice(TASKS)}")
+        lines.append(f"Constraint: {rng.choice(CONSTRAINTS)}\n")
+
+    lines.append("Format the output with one section per task.")
+
+    return "\n".join(lines)
+
+
+def original_from(prompt: str, rng: random.Random) -> str:
+    # A shorter, un-decomposed version of the same request
+    sentences = [line for line in prompt.splitlines() if line.startswith("Task")]
+    return " Then ".join(s.split(": ", 1)[1] for s in rng.sample(sentences, max(1, len(sentences) // 2)))
+
+
+def time_engine(engine, pairs):
+
+    start = time.perf_counter()
+    values = [engine.ratio(a, b) for a, b in pairs]
+    elapsed = (time.perf_counter() - start) * 1000 / len(pairs)
+
+    return elapsed, values
+
+
+def run_similarity_benchmark():
+
+    rng = random.Random(3)
+
+    engines = {name: get_similarity_engine(name) for name in ["difflib", "char", "token"]}
+
+    print("\n" + "=" * 100)
+    print("PROMPT SIMILARITY BENCHMARK (decomposed multi-task prompts)")
+    print("=" * 100)
+
+    for n_tasks in [3, 10, 30, 60]:
+
+        pairs = []
+        for _ in range(10):
+            optimized = decomposed_prompt(rng, n_tasks)
+            pairs.append((original_from(optimized, rng), optimized))
+
+        chars = sum(len(b) for _, b in pairs) // len(pairs)
+
+        print(f"\n{n_tasks} tasks (~{chars} chars optimized prompt)")
+
+        for name, engine in engines.items():
+            ms, values = time_engine(engine, pairs)
+            mean_value = sum(values) / len(values)
+            print(f"  {name:<8} {ms:9.3f} ms/pair | mean ratio {mean_value:.4f}")
+
+        # Upper bound must never be below the exact value
+        token = engines["token"]
+        for a, b in pairs:
+            assert token.ratio(a, b) <= token.upper_bound(a, b) + 1e-12
+
+        start = time.perf_counter()
+        for a, b in pairs:
+            token.upper_bound(a, b)
+        print(f"  {'bound':<8} {(time.perf_counter() - start) * 1000 / len(pairs):9.3f} ms/pair (token precheck)")
+
+        # Default metrics keep the legacy character ratio the risk
+        # thresholds were calibrated against
+        metrics = PromptMetrics()
+        for a, b in pairs:
+            expected = round(difflib.SequenceMatcher(None, a, b).ratio(), 4)
+            assert metrics.compute(a, b)["structural_metrics"]["similarity_ratio"] == expected
+
+
+if __name__ == "__main__":
+    run_similarity_benchmark()
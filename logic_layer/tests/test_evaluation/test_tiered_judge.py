@@ -0,0 +1,80 @@
+import os
+
+from logic_layer.refiner.single_pass_refiner import SinglePassRefiner
+from logic_layer.target_llm.llm_factory import get_llm
+from logic_layer.evaluation.evaluator import Evaluator
+
+
+PROMPTS = [
+    "Explain the effects of deforestation.",
+    "Compare REST and GraphQL for building a mobile API.",
+    "Write a Python function that reverses a linked list.",
+    "Summarize the causes of the French Revolution in no more than 100 words.",
+    "What is recursion?",
+    "List the pros and cons of remote work.",
+]
+
+
+def run_tiered_judge_comparison():
+
+    groq_key = os.getenv("GROQ_API_KEY")
+
+    if not groq_key:
+        raise ValueError("GROQ_API_KEY not set.")
+
+    llm = get_llm(
+        provider="groq",
+        config={
+            "api_key": groq_key,
+            "model_name": "llama-3.1-8b-instant"
+        }
+    )
+
+    refiner = SinglePassRefiner()
+
+    always = Evaluator(llm=llm, judge_mode="always")
+    tiered = Evaluator(llm=llm, judge_mode="tiered")
+
+    disagreements = 0
+    drifts = []
+
+    for prompt in PROMPTS:
+
+        optimized_prompt, metadata = refiner.refine(prompt)
+
+        original_response = llm.generate(prompt)["output"]
+        optimized_response = llm.generate(optimized_prompt)["output"]
+
+        args = (prompt, optimized_prompt, original_response, optimized_response, metadata)
+
+        baseline = always.evaluate(*args)
+        candidate = tiered.evaluate(*args)
+
+        drift = abs(baseline["final_score"] - candidate["final_score"])
+        drifts.append(drift)
+
+        if baseline["should_iterate"] != candidate["should_iterate"]:
+            disagreements += 1
+
+        print("\n" + "=" * 100)
+        print("PROMPT:", prompt)
+        print("Always  -> score:", baseline["final_score"], "| iterate:", baseline["should_iterate"])
+        print("Tiered  -> score:", candidate["final_score"], "| iterate:", candidate["should_iterate"])
+        print("Decision:", candidate["judge_decision"])
+
+    print("\n" + "=" * 100)
+    print("TIERED JUDGE SUMMARY")
+    print("=" * 100)
+
+    stats = tiered.judge_stats
+
+    print("Evaluations:", stats["evaluations"])
+    print("Judge calls (always):", always.judge_stats["judge_calls"])
+    print("Judge calls (tiered):", stats["judge_calls"])
+    print("Judge calls avoided:", stats["judge_calls_avoided"])
+    print("should_iterate disagreements:", disagreements)
+    print("Mean |score drift|:", round(sum(drifts) / len(drifts), 4))
+
+
+if __name__ == "__main__":
+    run_tiered_judge_comparison()
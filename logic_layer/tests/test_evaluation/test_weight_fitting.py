@@ -0,0 +1,175 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from logic_layer.evaluation import weight_fitting
+from logic_layer.evaluation.feedback_store import FeedbackStore
+from logic_layer.evaluation.metrics import aggregation
+from logic_layer.evaluation.metrics.aggregation import AggregationEngine
+from logic_layer.evaluation.weight_fitting import (
+    COMPONENTS,
+    cross_validate,
+    fit_weights,
+    predict,
+    simplex_grid
+)
+
+
+# Multiples of the grid step, so the exact vector is a grid point
+PLANTED = np.array([0.10, 0.15, 0.35, 0.10, 0.30])
+
+
+def synthetic(rng, n, weights, noise=0.0, judge_missing=0.2):
+    """
+    Random component rows, some without a judge verdict, scored with
+    the given weights.
+    """
+
+    X = rng.random((n, len(COMPONENTS)))
+    X[rng.random(n) < judge_missing, -1] = np.nan
+
+    y = predict(X, weights[None, :])[:, 0] + rng.normal(0, noise, n)
+
+    return X, y
+
+
+def run_grid_and_predict():
+
+    print("\n" + "=" * 100)
+    print("WEIGHT FITTING: GRID AND PREDICTION")
+    print("=" * 100)
+
+    grid = simplex_grid(0.05)
+
+    # C(20 + 4, 4) compositions of 20 units into 5 parts
+    assert grid.shape == (10_626, 5)
+    assert np.allclose(grid.sum(axis=1), 1.0) and (grid >= 0).all()
+    assert len({tuple(row) for row in np.round(grid, 6)}) == len(grid)
+
+    # predict matches compute_final_score's judge-missing rescaling
+    engine = AggregationEngine(weights=dict(zip(COMPONENTS, PLANTED.tolist())))
+    X = np.array([[0.2, 0.4, 0.6, 0.8, 0.5], [0.2, 0.4, 0.6, 0.8, np.nan]])
+
+    assert np.allclose(predict(X, PLANTED[None, :])[:, 0], engine.rescore_matrix(X), atol=1e-4)
+
+    # No weight outside the judge: judge-missing rows score 0
+    judge_only = np.array([[0, 0, 0, 0, 1.0]])
+    assert predict(X, judge_only)[1, 0] == 0.0
+
+    print("Grid points at step 0.05:", len(grid))
+
+
+def run_recovery():
+
+    print("\n" + "=" * 100)
+    print("WEIGHT FITTING: PLANTED WEIGHTS RECOVERED")
+    print("=" * 100)
+
+    rng = np.random.default_rng(11)
+    grid = simplex_grid(0.05)
+
+    X, y = synthetic(rng, 2_000, PLANTED)
+    assert np.allclose(fit_weights(X, y, grid), PLANTED)
+
+    # Small blocks give the same answer as one product
+    assert np.allclose(fit_weights(X, y, grid, max_cells=50_000), PLANTED)
+
+    # With noise, every weight lands within one grid step
+    X, y = synthetic(rng, 2_000, PLANTED, noise=0.02)
+    fitted = fit_weights(X, y, grid)
+    assert np.abs(fitted - PLANTED).max() <= 0.05 + 1e-9
+
+    baseline = np.array([AggregationEngine.DEFAULT_WEIGHTS[name] for name in COMPONENTS])
+    cv = cross_validate(X, y, grid, baseline, folds=5, seed=0)
+
+    assert len(cv["fitted_pearson_per_fold"]) == 5
+    assert cv["fitted_pearson_mean"] > cv["baseline_pearson_mean"]
+    assert cv["fitted_pearson_mean"] > 0.9
+
+    print("Fitted:", dict(zip(COMPONENTS, fitted.round(2).tolist())))
+    print("CV:", cv)
+
+
+def run_artifact_round_trip(directory: str):
+
+    print("\n" + "=" * 100)
+    print("WEIGHT FITTING: SAVE / LOAD ROUND TRIP")
+    print("=" * 100)
+
+    rng = np.random.default_rng(5)
+    X, y = synthetic(rng, 400, PLANTED, judge_missing=0.0)
+
+    # Feedback entries carrying their component scores, rated 1-5
+    store = FeedbackStore(file_path=os.path.join(directory, "feedback_log.jsonl"))
+    for i, (row, score) in enumerate(zip(X, y)):
+        store.store(
+            f"s-{i}",
+            final_score=float(score),
+            user_rating=int(round(1 + 4 * score)),
+            component_scores={f"{name}_score": float(v) for name, v in zip(COMPONENTS, row)}
+        )
+
+    weights_dir = os.path.join(directory, "weights")
+    args = ["--feedback", store.file_path, "--weights-dir", weights_dir, "--step", "0.05", "--folds", "3"]
+
+    # v1 and v2 from the CLI; a stray file and a v10 written by hand
+    # check that versions are compared as numbers
+    weight_fitting.main(args)
+    weight_fitting.main(args)
+
+    with open(os.path.join(weights_dir, "aggregation_weights.vX.json"), "w") as f:
+        f.write("{}")
+
+    with open(os.path.join(weights_dir, "aggregation_weights.v2.json")) as f:
+        v2 = json.load(f)
+
+    assert v2["version"] == 2 and v2["n_samples"] == 400
+    assert abs(sum(v2["weights"].values()) - 1.0) < 1e-6
+
+    fitted = np.array([v2["weights"][name] for name in COMPONENTS])
+    assert np.abs(fitted - PLANTED).max() <= 0.1 + 1e-9
+
+    newest = dict(v2, version=10, weights=dict(zip(COMPONENTS, PLANTED.tolist())))
+    with open(os.path.join(weights_dir, "aggregation_weights.v10.json"), "w") as f:
+        json.dump(newest, f)
+
+    assert sorted(aggregation.weights_artifact_versions(weights_dir)) == [1, 2, 10]
+
+    # The engine loads the newest artifact at startup
+    latest = aggregation.latest_weights_artifact
+    aggregation.latest_weights_artifact = lambda: latest(weights_dir)
+
+    try:
+        AggregationEngine.reload_weights()
+
+        assert AggregationEngine.weights_version() == 10
+        assert AggregationEngine().weights == newest["weights"]
+
+        # An invalid newest artifact falls back to the defaults
+        with open(os.path.join(weights_dir, "aggregation_weights.v11.json"), "w") as f:
+            json.dump({"version": 11, "weights": {"prompt": 1.0}}, f)
+
+        AggregationEngine.reload_weights()
+
+        assert AggregationEngine.weights_version() is None
+        assert AggregationEngine().weights == AggregationEngine.DEFAULT_WEIGHTS
+    finally:
+        aggregation.latest_weights_artifact = latest
+        AggregationEngine.reload_weights()
+
+    print("Versions on disk:", sorted(aggregation.weights_artifact_versions(weights_dir)))
+
+
+def run_weight_fitting_tests():
+
+    run_grid_and_predict()
+    run_recovery()
+
+    with tempfile.TemporaryDirectory() as directory:
+        run_artifact_round_trip(directory)
+
+
+if __name__ == "__main__":
+    run_weight_fitting_tests()
@@ -0,0 +1,31 @@
+from logic_layer.controller.policy_controller import PolicyController
+from logic_layer.controller.output_budget import OutputBudgetPlanner
+
+controller = PolicyController()
+planner = OutputBudgetPlanner()
+
+prompts = [
+
+    # 1️⃣ Short explanation (scope + example, no length constraint)
+    "Explain recursion.",
+
+    # 2️⃣ Comparison (constrain / format primitives)
+    "Compare REST and GraphQL for building a mobile API.",
+
+    # 3️⃣ Multi-intent (decompose + constrain)
+    """Explain how transformers work in NLP. Then compare BERT and GPT architectures.
+    Also write Python code to load a pretrained BERT model using HuggingFace.""",
+
+    # 4️⃣ Explicit user limit
+    "Summarize the causes of the French Revolution in no more than 100 words.",
+]
+
+for prompt in prompts:
+    optimized, metadata = controller.optimize(prompt)
+    budget = planner.plan(optimized, metadata)
+
+    print("\n" + "=" * 100)
+    print("ORIGINAL:\n", prompt)
+    print("\nOPTIMIZED:\n", optimized)
+    print("\nAPPLIED:", metadata["applied_primitives"])
+    print("\nBUDGET:\n", budget)
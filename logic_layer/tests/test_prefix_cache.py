@@ -0,0 +1,131 @@
+import os
+import random
+import threading
+import time
+from pprint import pprint
+
+from logic_layer.target_llm.hf_local_llm import HFLocalLLM
+from logic_layer.target_llm.prefix_cache import PrefixKVCache
+from logic_layer.evaluation.llm_judge import LLMJudge
+
+
+CASES = [
+    ("Explain recursion.", "Recursion is when a function calls itself."),
+    ("Describe the CAP theorem.", "CAP states a distributed store picks two of three guarantees."),
+    ("Explain how OAuth 2.0 works.", "OAuth 2.0 delegates authorization using access tokens."),
+    ("Define eventual consistency.", "Replicas converge to the same value given no new writes."),
+]
+
+
+def run_pass(llm, judge, label):
+
+    start = time.time()
+
+    for prompt, response in CASES:
+        llm.generate(judge._build_judge_prompt(prompt, response))
+
+    elapsed = time.time() - start
+
+    print(f"\n{label}: {elapsed:.2f}s for {len(CASES)} judge prompts")
+
+
+class Bytes(bytearray):
+    @property
+    def nbytes(self):
+        return len(self)
+
+
+class FakeLayer:
+    """
+    Stand-in for one layer of a KV cache: token ids instead of tensors.
+    """
+
+    def __init__(self, tokens):
+        self.keys = Bytes(tokens)
+        self.values = Bytes(tokens)
+
+    def crop(self, length):
+        del self.keys[length:]
+        del self.values[length:]
+
+
+class FakeCache:
+
+    def __init__(self, tokens):
+        self.layers = [FakeLayer(tokens) for _ in range(2)]
+
+    def crop(self, length):
+        for layer in self.layers:
+            layer.crop(length)
+
+
+def run_thread_safety_check(threads: int = 8, rounds: int = 300):
+    """
+    Concurrent lookups and stores against a small cache: every hit must
+    be a private copy of the stored prefix, and the byte accounting
+    must match the entries left at the end.
+    """
+
+    print("\n" + "=" * 80)
+    print("PREFIX KV-CACHE UNDER CONCURRENT LOOKUP / STORE")
+    print("=" * 80)
+
+    cache = PrefixKVCache(max_bytes=4 * 40 * 6, min_prefix_tokens=4)
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(rounds):
+                head = rng.randrange(4)
+                tokens = [head] * 8 + [rng.randrange(200) for _ in range(32)]
+
+                hit, length = cache.lookup(tokens, max_prefix=len(tokens) - 1)
+                if hit is not None:
+                    # Cropped private copy whose prefix matches this prompt
+                    assert all(len(layer.keys) == length for layer in hit.layers)
+                    assert list(hit.layers[0].keys) == tokens[:length]
+                    hit.layers[0].keys.extend(b"\x00" * 4)
+
+                cache.store(tokens, FakeCache(tokens))
+        except Exception as e:
+            errors.append(repr(e))
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    stats = cache.stats()
+
+    assert not errors, errors[:3]
+    assert stats["hits"] + stats["misses"] == threads * rounds
+    assert stats["memory_bytes"] == sum(nbytes for _, nbytes in cache._entries.values())
+    assert stats["memory_bytes"] <= stats["max_bytes"]
+
+    pprint(stats)
+
+
+def run_test():
+
+    model_name = os.getenv("HF_BENCH_MODEL", "microsoft/phi-2")
+
+    print("\n" + "=" * 80)
+    print("PREFIX KV-CACHE REUSE (shared judge preamble)")
+    print("=" * 80)
+
+    baseline = HFLocalLLM(model_name=model_name, max_new_tokens=16)
+    run_pass(baseline, LLMJudge(baseline), "no prefix cache")
+
+    cached = HFLocalLLM(model_name=model_name, max_new_tokens=16, prefix_cache_mb=256)
+    run_pass(cached, LLMJudge(cached), "prefix cache (cold)")
+    run_pass(cached, LLMJudge(cached), "prefix cache (warm)")
+
+    print("\nCACHE STATS:")
+    pprint(cached.cache_stats())
+
+
+if __name__ == "__main__":
+    run_thread_safety_check()
+    run_test()